@@ -3,13 +3,20 @@ import logging
 import os
 import sys
 from datetime import datetime
+from typing import Optional
 
 import click
 import dramatiq
 
+from mev_inspect.block import DEFAULT_RPC_BATCH_SIZE, create_from_block_numbers
 from mev_inspect.concurrency import coro
 from mev_inspect.crud.prices import write_prices
-from mev_inspect.db import get_inspect_session, get_trace_session
+from mev_inspect.db import (
+    get_inspect_session,
+    get_trace_session,
+    get_trace_sessionmaker,
+)
+from mev_inspect.decode_cache import DEFAULT_DECODE_CACHE_SIZE
 from mev_inspect.inspector import MEVInspector
 from mev_inspect.prices import fetch_prices, fetch_prices_range
 from mev_inspect.queue.broker import connect_broker
@@ -20,6 +27,8 @@ from mev_inspect.queue.tasks import (
     inspect_many_blocks_task,
 )
 from mev_inspect.s3_export import export_block
+from mev_inspect.trace_archive import write_trace_archive
+from mev_inspect.trace_cache import warm_trace_cache
 
 RPC_URL_ENV = "RPC_URL"
 
@@ -78,6 +87,78 @@ async def fetch_block_command(block_number: int, rpc: str):
 @click.option(
     "--request-timeout", type=int, help="timeout for requests to nodes", default=500
 )
+@click.option(
+    "--adaptive-concurrency",
+    is_flag=True,
+    help="adjust concurrency to node latency and errors, starting from --max-concurrency",
+    default=False,
+)
+@click.option(
+    "--rpc-batch-size",
+    type=int,
+    help="number of blocks to fetch per JSON-RPC batch request",
+    default=None,
+)
+@click.option(
+    "--prefetch-depth",
+    type=int,
+    help="number of blocks (or RPC batches) to fetch ahead while analysing",
+    default=0,
+)
+@click.option(
+    "--hedge-percentile",
+    type=int,
+    help="resend trace_block requests slower than this percentile of recent ones",
+    default=None,
+)
+@click.option(
+    "--write-trace-cache",
+    is_flag=True,
+    help="save blocks fetched from the node to the trace DB",
+    default=False,
+)
+@click.option(
+    "--use-block-store",
+    is_flag=True,
+    help="read and save raw blocks in the on-disk block store under ./cache",
+    default=False,
+)
+@click.option(
+    "--trace-archive",
+    type=click.Path(exists=True, dir_okay=False),
+    help="read blocks from a trace archive segment written by convert-trace-archive",
+    default=None,
+)
+@click.option(
+    "--async-trace-db",
+    is_flag=True,
+    help="query the trace DB over a pool of async connections, alongside RPC fetches",
+    default=False,
+)
+@click.option(
+    "--lazy-inputs",
+    is_flag=True,
+    help="only decode the inputs of calls no detector reads once they're written",
+    default=False,
+)
+@click.option(
+    "--decode-cache-size",
+    type=int,
+    help="number of decoded calldata to reuse across blocks, 0 to turn off",
+    default=DEFAULT_DECODE_CACHE_SIZE,
+)
+@click.option(
+    "--analysis-workers",
+    type=int,
+    help="number of processes to classify and analyse blocks on, 0 to analyse in-process",
+    default=0,
+)
+@click.option(
+    "--analysis-chunk-size",
+    type=int,
+    help="number of blocks sent to an analysis process at a time",
+    default=1,
+)
 @coro
 async def inspect_many_blocks_command(
     after_block: int,
@@ -85,6 +166,18 @@ async def inspect_many_blocks_command(
     rpc: str,
     max_concurrency: int,
     request_timeout: int,
+    adaptive_concurrency: bool,
+    rpc_batch_size: Optional[int],
+    prefetch_depth: int,
+    hedge_percentile: Optional[int],
+    write_trace_cache: bool,
+    use_block_store: bool,
+    trace_archive: Optional[str],
+    async_trace_db: bool,
+    lazy_inputs: bool,
+    decode_cache_size: int,
+    analysis_workers: int,
+    analysis_chunk_size: int,
 ):
     inspect_db_session = get_inspect_session()
     trace_db_session = get_trace_session()
@@ -93,6 +186,18 @@ async def inspect_many_blocks_command(
         rpc,
         max_concurrency=max_concurrency,
         request_timeout=request_timeout,
+        rpc_batch_size=rpc_batch_size,
+        adaptive_concurrency=adaptive_concurrency,
+        prefetch_depth=prefetch_depth,
+        hedge_percentile=hedge_percentile,
+        write_trace_cache=write_trace_cache,
+        use_block_store=use_block_store,
+        trace_archive_path=trace_archive,
+        async_trace_db=async_trace_db,
+        lazy_inputs=lazy_inputs,
+        decode_cache_size=decode_cache_size,
+        analysis_workers=analysis_workers,
+        analysis_chunk_size=analysis_chunk_size,
     )
     await inspector.inspect_many_blocks(
         inspect_db_session=inspect_db_session,
@@ -102,6 +207,98 @@ async def inspect_many_blocks_command(
     )
 
 
+@cli.command()
+@click.argument("after_block", type=int)
+@click.argument("before_block", type=int)
+@click.option("--rpc", default=lambda: os.environ.get(RPC_URL_ENV, ""))
+@click.option(
+    "--max-concurrency",
+    type=int,
+    help="maximum number of concurrent RPC batches",
+    default=5,
+)
+@click.option(
+    "--request-timeout", type=int, help="timeout for requests to nodes", default=500
+)
+@click.option(
+    "--rpc-batch-size",
+    type=int,
+    help="number of blocks to fetch per JSON-RPC batch request",
+    default=DEFAULT_RPC_BATCH_SIZE,
+)
+@coro
+async def warm_trace_cache_command(
+    after_block: int,
+    before_block: int,
+    rpc: str,
+    max_concurrency: int,
+    request_timeout: int,
+    rpc_batch_size: int,
+):
+    trace_db_sessionmaker = get_trace_sessionmaker()
+    if trace_db_sessionmaker is None:
+        raise click.UsageError("Missing trace DB environment variables")
+
+    inspector = MEVInspector(
+        rpc,
+        max_concurrency=max_concurrency,
+        request_timeout=request_timeout,
+    )
+    trace_db_session = trace_db_sessionmaker()
+
+    try:
+        failed_blocks = await warm_trace_cache(
+            inspector.w3,
+            trace_db_session,
+            trace_db_sessionmaker,
+            after_block,
+            before_block,
+            max_concurrency=max_concurrency,
+            rpc_batch_size=rpc_batch_size,
+        )
+    finally:
+        trace_db_session.close()
+
+    if failed_blocks > 0:
+        raise click.ClickException(
+            f"Failed to write {failed_blocks} blocks to the trace DB, rerun to retry them"
+        )
+
+
+@cli.command()
+@click.argument("after_block", type=int)
+@click.argument("before_block", type=int)
+@click.argument("path", type=click.Path(dir_okay=False))
+@click.option("--rpc", default=lambda: os.environ.get(RPC_URL_ENV, ""))
+@click.option(
+    "--rpc-batch-size",
+    type=int,
+    help="number of blocks to fetch per JSON-RPC batch request",
+    default=DEFAULT_RPC_BATCH_SIZE,
+)
+@coro
+async def convert_trace_archive_command(
+    after_block: int,
+    before_block: int,
+    path: str,
+    rpc: str,
+    rpc_batch_size: int,
+):
+    trace_db_session = get_trace_session()
+    inspector = MEVInspector(rpc)
+
+    # blocks missing from the trace DB come from the node
+    blocks = await create_from_block_numbers(
+        inspector.w3,
+        list(range(after_block, before_block)),
+        trace_db_session,
+        rpc_batch_size=rpc_batch_size,
+    )
+
+    logger.info(f"Writing {len(blocks)} blocks to {path}")
+    write_trace_archive(path, blocks)
+
+
 @cli.command()
 def enqueue_block_list_command():
     broker = connect_broker()
@@ -1,19 +1,17 @@
-import asyncio
 import logging
 import os
 
 import dramatiq
 from aiohttp_retry import ExponentialRetry, RetryClient
 
-from mev_inspect.block import get_latest_block_number
 from mev_inspect.concurrency import coro
 from mev_inspect.crud.latest_block_update import (
     find_latest_block_update,
     update_latest_block,
 )
 from mev_inspect.db import get_inspect_session, get_trace_session
+from mev_inspect.heads import PollingHeadSource, SubscriptionHeadSource
 from mev_inspect.inspector import MEVInspector
-from mev_inspect.provider import get_base_provider
 from mev_inspect.queue.broker import connect_broker
 from mev_inspect.queue.tasks import (
     HIGH_PRIORITY,
@@ -36,6 +34,7 @@ async def run():
         raise RuntimeError("Missing environment variable RPC_URL")
 
     healthcheck_url = os.getenv("LISTENER_HEALTHCHECK_URL")
+    ws_rpc = os.getenv("RPC_WS_URL")
 
     logger.info("Starting...")
 
@@ -53,18 +52,27 @@ async def run():
     )
 
     inspector = MEVInspector(rpc)
-    base_provider = get_base_provider(rpc)
+    base_provider = inspector.w3.provider
+
+    if ws_rpc:
+        head_source = SubscriptionHeadSource(ws_rpc, base_provider)
+    else:
+        head_source = PollingHeadSource(base_provider)
+
+    await head_source.start()
 
     while not killer.kill_now:
         await inspect_next_block(
             inspector,
             inspect_db_session,
             trace_db_session,
-            base_provider,
+            head_source,
             healthcheck_url,
             export_actor,
         )
 
+    await head_source.stop()
+
     logger.info("Stopping...")
 
 
@@ -72,12 +80,12 @@ async def inspect_next_block(
     inspector: MEVInspector,
     inspect_db_session,
     trace_db_session,
-    base_provider,
+    head_source,
     healthcheck_url,
     export_actor,
 ):
 
-    latest_block_number = await get_latest_block_number(base_provider)
+    latest_block_number = await head_source.get_latest_block_number()
     last_written_block = find_latest_block_update(inspect_db_session)
 
     logger.info(f"Latest block: {latest_block_number}")
@@ -106,7 +114,7 @@ async def inspect_next_block(
         if healthcheck_url:
             await ping_healthcheck_url(healthcheck_url)
     else:
-        await asyncio.sleep(5)
+        await head_source.wait_for_new_head()
 
 
 async def ping_healthcheck_url(url):
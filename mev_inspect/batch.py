@@ -0,0 +1,122 @@
+import asyncio
+import json
+import logging
+import random
+from typing import Any, Dict, List, Tuple
+
+from web3 import Web3
+from web3.middleware import async_combine_middlewares
+from web3.types import RPCEndpoint, RPCResponse
+
+from mev_inspect.methods import BATCH_METHOD
+from mev_inspect.raw_rpc import post_request
+
+logger = logging.getLogger(__name__)
+
+RPCRequest = Tuple[RPCEndpoint, Any]
+
+
+async def make_batch_request(
+    w3: Web3,
+    requests: List[RPCRequest],
+    retries: int = 5,
+    backoff_time_seconds: float = 0.1,
+) -> List[Any]:
+    """
+    Sends all requests to the node as a single JSON-RPC batch
+    and returns their results in the order they were requested.
+
+    The batch goes through the provider's middlewares as a single
+    BATCH_METHOD request, so retries, rate limits, the circuit breaker,
+    the concurrency limiter and hedging all apply to it.
+
+    Any sub-request that fails is retried on its own,
+    without resending the rest of the batch
+    """
+
+    make_request = await async_combine_middlewares(
+        middlewares=w3.provider.middlewares,
+        web3=w3,
+        provider_request_fn=lambda method, params: _post_batch(w3.provider, params),
+    )
+
+    response = await make_request(BATCH_METHOD, requests)  # type: ignore
+
+    results = _get_results_by_id(response.get("result"))
+    failed_request_ids = [
+        request_id for request_id in range(len(requests)) if request_id not in results
+    ]
+
+    if len(failed_request_ids) > 0:
+        logger.info(
+            f"Retrying {len(failed_request_ids)}/{len(requests)} failed batch requests"
+        )
+
+        retried_results = await asyncio.gather(
+            *[
+                _retry_request(
+                    w3,
+                    requests[request_id],
+                    retries,
+                    backoff_time_seconds,
+                )
+                for request_id in failed_request_ids
+            ]
+        )
+
+        results.update(zip(failed_request_ids, retried_results))
+
+    return [results[request_id] for request_id in range(len(requests))]
+
+
+async def _post_batch(base_provider, requests: List[RPCRequest]) -> RPCResponse:
+    payload = json.dumps(
+        [
+            {"jsonrpc": "2.0", "method": method, "params": params, "id": request_id}
+            for request_id, (method, params) in enumerate(requests)
+        ]
+    )
+
+    responses = await post_request(base_provider, payload.encode("utf-8"))
+
+    # a rejected batch comes back as a single error response
+    if not isinstance(responses, list):
+        return responses
+
+    return {"jsonrpc": "2.0", "id": 0, "result": responses}
+
+
+def _get_results_by_id(responses: Any) -> Dict[int, Any]:
+    if not isinstance(responses, list):
+        return {}
+
+    return {
+        response["id"]: response["result"]
+        for response in responses
+        if "error" not in response and "result" in response
+    }
+
+
+async def _retry_request(
+    w3: Web3,
+    request: RPCRequest,
+    retries: int,
+    backoff_time_seconds: float,
+) -> Any:
+    method, params = request
+    make_request = await w3.provider.request_func(w3, w3.middleware_onion)  # type: ignore
+
+    for i in range(retries):
+        response: RPCResponse = await make_request(method, params)
+
+        if "error" not in response:
+            return response["result"]
+
+        logger.error(
+            f"Batch request for method {method}, params: {params}, retrying: {i}/{retries}"
+        )
+
+        if i < (retries - 1):
+            await asyncio.sleep(backoff_time_seconds * (random.uniform(5, 10) ** i))
+
+    raise ValueError(response["error"])
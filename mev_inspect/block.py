@@ -1,18 +1,31 @@
 import asyncio
 import logging
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Set
 
 from sqlalchemy import orm
+from sqlalchemy.engine import Row
 from web3 import Web3
-
-from mev_inspect.fees import fetch_base_fee_per_gas
+from web3.types import RPCEndpoint
+
+from mev_inspect.batch import make_batch_request
+from mev_inspect.fees import fetch_base_fee_per_gas, fetch_base_fees_per_gas
+from mev_inspect.raw_rpc import (
+    fetch_raw_block_receipts,
+    fetch_raw_block_traces,
+    parse_receipts,
+    parse_traces,
+)
 from mev_inspect.schemas.blocks import Block
 from mev_inspect.schemas.receipts import Receipt
 from mev_inspect.schemas.traces import Trace, TraceType
+from mev_inspect.trace_db import TRACE_DB_STREAM_SIZE, TraceDBReader
 from mev_inspect.utils import hex_to_int
 
 logger = logging.getLogger(__name__)
 
+# number of blocks fetched per JSON-RPC batch
+DEFAULT_RPC_BATCH_SIZE = 10
+
 
 async def get_latest_block_number(base_provider) -> int:
     latest_block = await base_provider.make_request(
@@ -27,12 +40,27 @@ async def create_from_block_number(
     w3: Web3,
     block_number: int,
     trace_db_session: Optional[orm.Session],
+    base_fees_per_gas: Optional[Dict[int, int]] = None,
+    trace_db_reader: Optional[TraceDBReader] = None,
 ) -> Block:
+    """
+    trace_db_reader, if given, is used for trace DB lookups
+    in place of trace_db_session, so they don't block the event loop
+    """
+
     block_timestamp, receipts, traces, base_fee_per_gas = await asyncio.gather(
-        _find_or_fetch_block_timestamp(w3, block_number, trace_db_session),
-        _find_or_fetch_block_receipts(w3, block_number, trace_db_session),
-        _find_or_fetch_block_traces(w3, block_number, trace_db_session),
-        _find_or_fetch_base_fee_per_gas(w3, block_number, trace_db_session),
+        _find_or_fetch_block_timestamp(
+            w3, block_number, trace_db_session, trace_db_reader
+        ),
+        _find_or_fetch_block_receipts(
+            w3, block_number, trace_db_session, trace_db_reader
+        ),
+        _find_or_fetch_block_traces(
+            w3, block_number, trace_db_session, trace_db_reader
+        ),
+        _find_or_fetch_base_fee_per_gas(
+            w3, block_number, trace_db_session, trace_db_reader, base_fees_per_gas
+        ),
     )
 
     miner_address = _get_miner_address_from_traces(traces)
@@ -47,12 +75,260 @@ async def create_from_block_number(
     )
 
 
+async def create_from_block_numbers(
+    w3: Web3,
+    block_numbers: List[int],
+    trace_db_session: Optional[orm.Session],
+    rpc_batch_size: int = DEFAULT_RPC_BATCH_SIZE,
+) -> List[Block]:
+    blocks_by_number: Dict[int, Block] = {}
+
+    if trace_db_session is not None and len(block_numbers) > 0:
+        blocks_by_number = find_blocks(
+            trace_db_session,
+            min(block_numbers),
+            max(block_numbers) + 1,
+        )
+
+    missing_block_numbers = [
+        block_number
+        for block_number in block_numbers
+        if block_number not in blocks_by_number
+    ]
+
+    if len(missing_block_numbers) == 0:
+        return [blocks_by_number[block_number] for block_number in block_numbers]
+
+    base_fees_per_gas = await fetch_base_fees_per_gas(
+        w3,
+        min(missing_block_numbers),
+        max(missing_block_numbers) + 1,
+    )
+
+    for batch_start in range(0, len(missing_block_numbers), rpc_batch_size):
+        batch_block_numbers = missing_block_numbers[
+            batch_start : batch_start + rpc_batch_size
+        ]
+
+        for block in await _fetch_blocks(w3, batch_block_numbers, base_fees_per_gas):
+            blocks_by_number[block.block_number] = block
+
+    return [blocks_by_number[block_number] for block_number in block_numbers]
+
+
+async def _fetch_blocks(
+    w3: Web3,
+    block_numbers: List[int],
+    base_fees_per_gas: Dict[int, int],
+) -> List[Block]:
+    requests = []
+
+    for block_number in block_numbers:
+        block_number_hex = hex(block_number)
+        requests += [
+            (RPCEndpoint("eth_getBlockByNumber"), [block_number_hex, False]),
+            (RPCEndpoint("eth_getBlockReceipts"), [block_number_hex]),
+            (RPCEndpoint("trace_block"), [block_number_hex]),
+        ]
+
+    results = await make_batch_request(w3, requests)
+    blocks = []
+
+    for i, block_number in enumerate(block_numbers):
+        block_json, receipts_json, traces_json = results[3 * i : 3 * i + 3]
+        traces = parse_traces(traces_json)
+
+        blocks.append(
+            Block(
+                block_number=block_number,
+                block_timestamp=hex_to_int(block_json["timestamp"]),
+                miner=_get_miner_address_from_traces(traces),
+                base_fee_per_gas=(
+                    base_fees_per_gas[block_number]
+                    if block_number in base_fees_per_gas
+                    else await fetch_base_fee_per_gas(w3, block_number)
+                ),
+                traces=traces,
+                receipts=parse_receipts(receipts_json),
+            )
+        )
+
+    return blocks
+
+
+def find_blocks(
+    trace_db_session: orm.Session,
+    after_block_number: int,
+    before_block_number: int,
+) -> Dict[int, Block]:
+    """
+    Loads every block in [after_block_number, before_block_number)
+    that the trace DB has in full, with one query per table
+    """
+
+    params = {
+        "after_block_number": after_block_number,
+        "before_block_number": before_block_number,
+    }
+
+    block_timestamps = dict(
+        trace_db_session.execute(
+            "SELECT block_number, block_timestamp FROM block_timestamps "
+            "WHERE block_number >= :after_block_number AND block_number < :before_block_number",
+            params=params,
+        ).all()
+    )
+
+    base_fees_per_gas = dict(
+        trace_db_session.execute(
+            "SELECT block_number, base_fee_in_wei FROM base_fee "
+            "WHERE block_number >= :after_block_number AND block_number < :before_block_number",
+            params=params,
+        ).all()
+    )
+
+    receipts_by_block_number = {
+        block_number: [Receipt(**receipt) for receipt in receipts_json]
+        for block_number, receipts_json in _stream_rows(
+            trace_db_session,
+            "SELECT block_number, raw_receipts FROM block_receipts "
+            "WHERE block_number >= :after_block_number AND block_number < :before_block_number",
+            params,
+        )
+        if block_number in block_timestamps and block_number in base_fees_per_gas
+    }
+
+    blocks_by_number = {}
+
+    for block_number, traces_json in _stream_rows(
+        trace_db_session,
+        "SELECT block_number, raw_traces FROM block_traces "
+        "WHERE block_number >= :after_block_number AND block_number < :before_block_number",
+        params,
+    ):
+        if block_number not in receipts_by_block_number:
+            continue
+
+        traces = [Trace(**trace_json) for trace_json in traces_json]
+
+        blocks_by_number[block_number] = Block(
+            block_number=block_number,
+            block_timestamp=block_timestamps[block_number],
+            miner=_get_miner_address_from_traces(traces),
+            base_fee_per_gas=base_fees_per_gas[block_number],
+            traces=traces,
+            receipts=receipts_by_block_number[block_number],
+        )
+
+    return blocks_by_number
+
+
+async def find_blocks_async(
+    trace_db_reader: TraceDBReader,
+    after_block_number: int,
+    before_block_number: int,
+) -> Dict[int, Block]:
+    """
+    Same as find_blocks, with the table lookups running concurrently
+    on the reader's connection pool
+    """
+
+    (
+        block_timestamps,
+        base_fees_per_gas,
+        receipts_by_block_number,
+    ) = await asyncio.gather(
+        trace_db_reader.find_block_timestamps(after_block_number, before_block_number),
+        trace_db_reader.find_base_fees_per_gas(after_block_number, before_block_number),
+        trace_db_reader.find_blocks_receipts(after_block_number, before_block_number),
+    )
+
+    blocks_by_number = {}
+
+    async for block_number, traces in trace_db_reader.stream_blocks_traces(
+        after_block_number, before_block_number
+    ):
+        if (
+            block_number not in block_timestamps
+            or block_number not in base_fees_per_gas
+            or block_number not in receipts_by_block_number
+        ):
+            continue
+
+        blocks_by_number[block_number] = Block(
+            block_number=block_number,
+            block_timestamp=block_timestamps[block_number],
+            miner=_get_miner_address_from_traces(traces),
+            base_fee_per_gas=base_fees_per_gas[block_number],
+            traces=traces,
+            receipts=receipts_by_block_number[block_number],
+        )
+
+    return blocks_by_number
+
+
+def find_cached_block_numbers(
+    trace_db_session: orm.Session,
+    after_block_number: int,
+    before_block_number: int,
+) -> Set[int]:
+    """
+    Block numbers in [after_block_number, before_block_number)
+    that the trace DB has in full
+    """
+
+    result = trace_db_session.execute(
+        """
+        SELECT block_number FROM block_timestamps
+        WHERE block_number >= :after_block_number AND block_number < :before_block_number
+        INTERSECT
+        SELECT block_number FROM base_fee
+        WHERE block_number >= :after_block_number AND block_number < :before_block_number
+        INTERSECT
+        SELECT block_number FROM block_receipts
+        WHERE block_number >= :after_block_number AND block_number < :before_block_number
+        INTERSECT
+        SELECT block_number FROM block_traces
+        WHERE block_number >= :after_block_number AND block_number < :before_block_number
+        """,
+        params={
+            "after_block_number": after_block_number,
+            "before_block_number": before_block_number,
+        },
+    )
+
+    return {block_number for (block_number,) in result}
+
+
+def _stream_rows(
+    trace_db_session: orm.Session,
+    query: str,
+    params: Dict[str, Any],
+) -> Iterator[Row]:
+    # raw traces are large, so pull them through a server-side cursor
+    # rather than loading the whole range at once
+    result = trace_db_session.execute(
+        query,
+        params=params,
+        execution_options={"stream_results": True},
+    )
+
+    return iter(result.yield_per(TRACE_DB_STREAM_SIZE))
+
+
 async def _find_or_fetch_block_timestamp(
     w3,
     block_number: int,
     trace_db_session: Optional[orm.Session],
+    trace_db_reader: Optional[TraceDBReader],
 ) -> int:
-    if trace_db_session is not None:
+    if trace_db_reader is not None:
+        existing_block_timestamp = await trace_db_reader.find_block_timestamp(
+            block_number
+        )
+        if existing_block_timestamp is not None:
+            return existing_block_timestamp
+    elif trace_db_session is not None:
         existing_block_timestamp = _find_block_timestamp(trace_db_session, block_number)
         if existing_block_timestamp is not None:
             return existing_block_timestamp
@@ -64,8 +340,15 @@ async def _find_or_fetch_block_receipts(
     w3,
     block_number: int,
     trace_db_session: Optional[orm.Session],
+    trace_db_reader: Optional[TraceDBReader],
 ) -> List[Receipt]:
-    if trace_db_session is not None:
+    if trace_db_reader is not None:
+        existing_block_receipts = await trace_db_reader.find_block_receipts(
+            block_number
+        )
+        if existing_block_receipts is not None:
+            return existing_block_receipts
+    elif trace_db_session is not None:
         existing_block_receipts = _find_block_receipts(trace_db_session, block_number)
         if existing_block_receipts is not None:
             return existing_block_receipts
@@ -77,8 +360,13 @@ async def _find_or_fetch_block_traces(
     w3,
     block_number: int,
     trace_db_session: Optional[orm.Session],
+    trace_db_reader: Optional[TraceDBReader],
 ) -> List[Trace]:
-    if trace_db_session is not None:
+    if trace_db_reader is not None:
+        existing_block_traces = await trace_db_reader.find_block_traces(block_number)
+        if existing_block_traces is not None:
+            return existing_block_traces
+    elif trace_db_session is not None:
         existing_block_traces = _find_block_traces(trace_db_session, block_number)
         if existing_block_traces is not None:
             return existing_block_traces
@@ -90,14 +378,25 @@ async def _find_or_fetch_base_fee_per_gas(
     w3,
     block_number: int,
     trace_db_session: Optional[orm.Session],
+    trace_db_reader: Optional[TraceDBReader],
+    base_fees_per_gas: Optional[Dict[int, int]] = None,
 ) -> int:
-    if trace_db_session is not None:
+    if trace_db_reader is not None:
+        existing_base_fee_per_gas = await trace_db_reader.find_base_fee_per_gas(
+            block_number
+        )
+        if existing_base_fee_per_gas is not None:
+            return existing_base_fee_per_gas
+    elif trace_db_session is not None:
         existing_base_fee_per_gas = _find_base_fee_per_gas(
             trace_db_session, block_number
         )
         if existing_base_fee_per_gas is not None:
             return existing_base_fee_per_gas
 
+    if base_fees_per_gas is not None and block_number in base_fees_per_gas:
+        return base_fees_per_gas[block_number]
+
     return await fetch_base_fee_per_gas(w3, block_number)
 
 
@@ -107,13 +406,11 @@ async def _fetch_block_timestamp(w3, block_number: int) -> int:
 
 
 async def _fetch_block_receipts(w3, block_number: int) -> List[Receipt]:
-    receipts_json = await w3.eth.get_block_receipts(block_number)
-    return [Receipt(**receipt) for receipt in receipts_json]
+    return await fetch_raw_block_receipts(w3, block_number)
 
 
 async def _fetch_block_traces(w3, block_number: int) -> List[Trace]:
-    traces_json = await w3.eth.trace_block(block_number)
-    return [Trace(**trace_json) for trace_json in traces_json]
+    return await fetch_raw_block_traces(w3, block_number)
 
 
 def _find_block_timestamp(
@@ -0,0 +1,231 @@
+"""
+File-based store of raw blocks, for replaying ranges
+without a trace DB or a node
+
+Each block is a gzipped JSON file under directory/blocks, sharded by
+block number. index.json tracks every stored block's size and when it
+was last read, which is used to evict the least recently read blocks
+once the store grows past max_size_bytes. Reads only update the index
+in memory, so close the store to save them
+
+Blocks can be written from other threads while they're read
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from mev_inspect.raw_rpc import parse_receipts, parse_traces
+from mev_inspect.schemas.blocks import Block
+from mev_inspect.tokenflow import cache_directory
+from mev_inspect.utils import write_atomically
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE_BYTES = 50 * 1024**3
+
+BLOCKS_PER_SHARD = 1000
+COMPRESSION_LEVEL = 6
+
+INDEX_FILE_NAME = "index.json"
+
+
+class BlockStore:
+    def __init__(
+        self,
+        directory: str = cache_directory,
+        max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+    ):
+        self._directory = directory
+        self._max_size_bytes = max_size_bytes
+
+        # guards the index, and orders saves of it
+        self._index_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+        # block number -> (size in bytes, last read at)
+        self._index: Dict[int, Tuple[int, float]] = self._load_index()
+        self._size_bytes = sum(size for size, _ in self._index.values())
+        self._has_unsaved_reads = False
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size_bytes
+
+    def close(self) -> None:
+        """Saves when blocks were last read, for eviction by later runs"""
+
+        if self._has_unsaved_reads:
+            self._save_index()
+
+    def find_block(self, block_number: int) -> Optional[Block]:
+        block_path = self._get_block_path(block_number)
+
+        # go by the file rather than the index, to pick up
+        # changes from other processes sharing the store
+        try:
+            with gzip.open(block_path, "rb") as block_file:
+                block_json = json.loads(block_file.read())
+        except FileNotFoundError:
+            with self._index_lock:
+                if block_number in self._index:
+                    size, _ = self._index.pop(block_number)
+                    self._size_bytes -= size
+
+            return None
+
+        with self._index_lock:
+            if block_number not in self._index:
+                size = os.path.getsize(block_path)
+                self._size_bytes += size
+            else:
+                size, _ = self._index[block_number]
+
+            self._index[block_number] = (size, time.time())
+            self._has_unsaved_reads = True
+
+        traces = parse_traces(block_json["traces"])
+
+        return Block(
+            block_number=block_number,
+            block_timestamp=block_json["block_timestamp"],
+            miner=block_json["miner"],
+            base_fee_per_gas=block_json["base_fee_per_gas"],
+            traces=traces,
+            receipts=parse_receipts(block_json["receipts"]),
+        )
+
+    def find_blocks(
+        self,
+        after_block_number: int,
+        before_block_number: int,
+    ) -> Dict[int, Block]:
+        blocks_by_number = {}
+
+        for block_number in range(after_block_number, before_block_number):
+            block = self.find_block(block_number)
+            if block is not None:
+                blocks_by_number[block_number] = block
+
+        return blocks_by_number
+
+    def write_blocks(self, blocks: List[Block]) -> None:
+        for block in blocks:
+            block_json = {
+                "block_timestamp": block.block_timestamp,
+                "miner": block.miner,
+                "base_fee_per_gas": block.base_fee_per_gas,
+                "traces": [trace.dict(by_alias=True) for trace in block.traces],
+                "receipts": [receipt.dict(by_alias=True) for receipt in block.receipts],
+            }
+
+            block_path = self._get_block_path(block.block_number)
+            write_atomically(
+                block_path,
+                gzip.compress(
+                    json.dumps(block_json, default=_enum_to_json).encode("utf-8"),
+                    compresslevel=COMPRESSION_LEVEL,
+                ),
+            )
+
+            size = os.path.getsize(block_path)
+
+            with self._index_lock:
+                previous_size, _ = self._index.get(block.block_number, (0, 0.0))
+                self._index[block.block_number] = (size, time.time())
+                self._size_bytes += size - previous_size
+
+        with self._index_lock:
+            self._evict()
+
+        self._save_index()
+
+    def _evict(self) -> None:
+        if self._size_bytes <= self._max_size_bytes:
+            return
+
+        least_recently_read = sorted(
+            self._index.items(),
+            key=lambda item: item[1][1],
+        )
+
+        evicted_blocks = 0
+
+        for block_number, (size, _) in least_recently_read:
+            if self._size_bytes <= self._max_size_bytes:
+                break
+
+            try:
+                os.remove(self._get_block_path(block_number))
+            except FileNotFoundError:
+                pass
+
+            del self._index[block_number]
+            self._size_bytes -= size
+            evicted_blocks += 1
+
+        logger.info(f"Evicted {evicted_blocks} blocks from the block store")
+
+    def _get_block_path(self, block_number: int) -> str:
+        return os.path.join(
+            self._directory,
+            "blocks",
+            str(block_number // BLOCKS_PER_SHARD),
+            f"{block_number}.json.gz",
+        )
+
+    def _load_index(self) -> Dict[int, Tuple[int, float]]:
+        index_path = os.path.join(self._directory, INDEX_FILE_NAME)
+
+        if os.path.exists(index_path):
+            with open(index_path, "r") as index_file:
+                return {
+                    int(block_number): (size, read_at)
+                    for block_number, (size, read_at) in json.load(index_file).items()
+                }
+
+        return self._rebuild_index()
+
+    def _rebuild_index(self) -> Dict[int, Tuple[int, float]]:
+        index = {}
+
+        for shard_path, _, file_names in os.walk(
+            os.path.join(self._directory, "blocks")
+        ):
+            for file_name in file_names:
+                if not file_name.endswith(".json.gz"):
+                    continue
+
+                file_stat = os.stat(os.path.join(shard_path, file_name))
+                block_number = int(file_name[: -len(".json.gz")])
+                index[block_number] = (file_stat.st_size, file_stat.st_atime)
+
+        return index
+
+    def _save_index(self) -> None:
+        with self._save_lock:
+            with self._index_lock:
+                index_json = json.dumps(
+                    {
+                        block_number: [size, read_at]
+                        for block_number, (size, read_at) in self._index.items()
+                    }
+                )
+                self._has_unsaved_reads = False
+
+            write_atomically(
+                os.path.join(self._directory, INDEX_FILE_NAME),
+                index_json.encode("utf-8"),
+            )
+
+
+def _enum_to_json(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+
+    raise TypeError(f"{type(value)} is not JSON serializable")
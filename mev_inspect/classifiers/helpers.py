@@ -94,7 +94,7 @@ def create_swap_from_pool_transfers(
     transfer_in = transfers_to_pool[-1]
     transfer_out = transfers_from_pool_to_recipient[0]
 
-    return Swap(
+    return Swap.construct(
         abi_name=trace.abi_name,
         transaction_hash=trace.transaction_hash,
         transaction_position=trace.transaction_position,
@@ -132,7 +132,7 @@ def create_swap_from_recipient_transfers(
     transfer_in = transfers_from_recipient[0]
     transfer_out = transfers_to_recipient[0]
 
-    return Swap(
+    return Swap.construct(
         abi_name=trace.abi_name,
         transaction_hash=trace.transaction_hash,
         transaction_position=trace.transaction_position,
@@ -151,7 +151,7 @@ def create_swap_from_recipient_transfers(
 
 
 def _build_eth_transfer(trace: ClassifiedTrace) -> Transfer:
-    return Transfer(
+    return Transfer.construct(
         block_number=trace.block_number,
         transaction_hash=trace.transaction_hash,
         trace_address=trace.trace_address,
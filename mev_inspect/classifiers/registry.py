@@ -0,0 +1,123 @@
+"""
+Cache of the decodable functions of every classifier ABI, so a cold
+TraceClassifier doesn't have to parse ABI JSON or hash selectors
+
+The cache is a JSON file under the cache directory, written on first use.
+It's keyed by a hash of the ABI files it was built from, and rebuilt
+whenever any of them change
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from mev_inspect.abi import ABI_DIRECTORY_PATH, get_abi, get_abi_path
+from mev_inspect.decode import DecodableFunction, get_decodable_functions
+from mev_inspect.schemas.classifiers import ClassifierSpec
+from mev_inspect.tokenflow import cache_directory
+from mev_inspect.utils import write_atomically
+
+logger = logging.getLogger(__name__)
+
+# bump when DecodableFunction or how it's worked out changes
+REGISTRY_FORMAT_VERSION = 1
+
+DEFAULT_REGISTRY_PATH = os.path.join(cache_directory, "classifier_registry.json")
+
+
+def load_decodable_functions(
+    specs: Sequence[ClassifierSpec],
+    registry_path: str = DEFAULT_REGISTRY_PATH,
+) -> Dict[str, List[DecodableFunction]]:
+    """
+    Decodable functions of each spec's ABI, by ABI name
+
+    Like decoders, ABIs are looked up by name, so where specs
+    share an ABI name the last spec's ABI is used
+    """
+
+    abi_paths: Dict[str, Path] = {}
+    specs_by_abi_name: Dict[str, ClassifierSpec] = {}
+
+    for spec in specs:
+        abi_path = get_abi_path(spec.abi_name, spec.protocol)
+
+        if abi_path is None:
+            raise ValueError(f"No ABI found for {spec.abi_name}")
+
+        abi_paths[spec.abi_name] = abi_path
+        specs_by_abi_name[spec.abi_name] = spec
+
+    abi_hash = _hash_abi_files(list(abi_paths.values()))
+
+    functions_by_abi_name = _read_registry(registry_path, abi_hash)
+    if functions_by_abi_name is not None and set(functions_by_abi_name) == set(
+        abi_paths
+    ):
+        return functions_by_abi_name
+
+    functions_by_abi_name = {}
+
+    for abi_name, spec in specs_by_abi_name.items():
+        abi = get_abi(spec.abi_name, spec.protocol)
+
+        if abi is None:
+            raise ValueError(f"No ABI found for {spec.abi_name}")
+
+        functions_by_abi_name[abi_name] = get_decodable_functions(abi)
+
+    _write_registry(registry_path, abi_hash, functions_by_abi_name)
+
+    return functions_by_abi_name
+
+
+def _hash_abi_files(abi_paths: List[Path]) -> str:
+    abi_hash = hashlib.sha256(str(REGISTRY_FORMAT_VERSION).encode("utf-8"))
+
+    for abi_path in sorted(set(abi_paths)):
+        abi_hash.update(str(abi_path.relative_to(ABI_DIRECTORY_PATH)).encode("utf-8"))
+        abi_hash.update(abi_path.read_bytes())
+
+    return abi_hash.hexdigest()
+
+
+def _read_registry(
+    registry_path: str,
+    abi_hash: str,
+) -> Optional[Dict[str, List[DecodableFunction]]]:
+    try:
+        with open(registry_path, "r") as registry_file:
+            registry_json = json.load(registry_file)
+    except (OSError, ValueError):
+        return None
+
+    if registry_json.get("abi_hash") != abi_hash:
+        return None
+
+    return {
+        abi_name: [DecodableFunction(*function) for function in functions]
+        for abi_name, functions in registry_json["functions_by_abi_name"].items()
+    }
+
+
+def _write_registry(
+    registry_path: str,
+    abi_hash: str,
+    functions_by_abi_name: Dict[str, List[DecodableFunction]],
+) -> None:
+    registry_json = {
+        "abi_hash": abi_hash,
+        "functions_by_abi_name": functions_by_abi_name,
+    }
+
+    try:
+        write_atomically(
+            registry_path,
+            json.dumps(registry_json, separators=(",", ":")).encode("utf-8"),
+        )
+    except OSError as e:
+        # still works without the cache, just slower to start
+        logger.warning(f"Failed to write the classifier registry: {e}")
@@ -63,7 +63,7 @@ class AaveLiquidationClassifier(LiquidationClassifier):
 class AaveTransferClassifier(TransferClassifier):
     @staticmethod
     def get_transfer(trace: DecodedCallTrace) -> Transfer:
-        return Transfer(
+        return Transfer.construct(
             block_number=trace.block_number,
             transaction_hash=trace.transaction_hash,
             trace_address=trace.trace_address,
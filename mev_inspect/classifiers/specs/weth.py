@@ -11,7 +11,7 @@ from mev_inspect.schemas.transfers import Transfer
 class WethTransferClassifier(TransferClassifier):
     @staticmethod
     def get_transfer(trace: DecodedCallTrace) -> Transfer:
-        return Transfer(
+        return Transfer.construct(
             block_number=trace.block_number,
             transaction_hash=trace.transaction_hash,
             trace_address=trace.trace_address,
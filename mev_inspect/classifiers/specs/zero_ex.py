@@ -34,7 +34,7 @@ class ZeroExSwapClassifier(SwapClassifier):
 
         token_in_address, token_in_amount = _get_0x_token_in_data(trace)
 
-        return Swap(
+        return Swap.construct(
             abi_name=trace.abi_name,
             transaction_hash=trace.transaction_hash,
             transaction_position=trace.transaction_position,
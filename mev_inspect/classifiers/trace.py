@@ -1,8 +1,10 @@
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
 
-from mev_inspect.abi import get_abi
-from mev_inspect.decode import ABIDecoder
+from mev_inspect.decode import SELECTOR_LENGTH, ABIDecoder
+from mev_inspect.decode_cache import DEFAULT_DECODE_CACHE_SIZE, DecodeCache
 from mev_inspect.schemas.blocks import CallAction, CallResult
+from mev_inspect.schemas.call_data import CallData, LazyInputs
+from mev_inspect.schemas.classifiers import ClassifierSpec
 from mev_inspect.schemas.traces import (
     CallTrace,
     Classification,
@@ -11,23 +13,95 @@ from mev_inspect.schemas.traces import (
     Trace,
     TraceType,
 )
+from mev_inspect.utils import hex_to_int
 
+from .registry import DEFAULT_REGISTRY_PATH, load_decodable_functions
 from .specs import ALL_CLASSIFIER_SPECS
 
+ClassifiedTraceT = TypeVar("ClassifiedTraceT", bound=ClassifiedTrace)
+
 
 class TraceClassifier:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        lazy_inputs: bool = False,
+        decode_cache_size: int = DEFAULT_DECODE_CACHE_SIZE,
+        validate_traces: bool = False,
+        registry_path: str = DEFAULT_REGISTRY_PATH,
+    ) -> None:
+        """
+        lazy_inputs leaves the inputs of calls that no detector reads
+        to be ABI decoded on first access, rather than on classification
+
+        decode_cache_size is how many decoded calldata to keep
+        for reuse across blocks, 0 turns the cache off
+
+        validate_traces runs classified traces back through pydantic
+        validation as they're built. Otherwise they're constructed
+        straight from the already validated trace and the values
+        worked out here, which is much faster
+
+        registry_path is where the decodable functions of every
+        classifier ABI are cached between runs
+        """
+
+        self._lazy_inputs = lazy_inputs
+        self._validate_traces = validate_traces
+        self.decode_cache: Optional[DecodeCache] = (
+            DecodeCache(max_entries=decode_cache_size)
+            if decode_cache_size > 0
+            else None
+        )
         self._classifier_specs = ALL_CLASSIFIER_SPECS
-        self._decoders_by_abi_name: Dict[str, ABIDecoder] = {}
+        self._decoders_by_abi_name: Dict[str, ABIDecoder] = {
+            abi_name: ABIDecoder.from_functions(functions)
+            for abi_name, functions in load_decodable_functions(
+                self._classifier_specs, registry_path
+            ).items()
+        }
 
-        for spec in self._classifier_specs:
-            abi = get_abi(spec.abi_name, spec.protocol)
+        self._specs_by_address_and_selector = self._index_specs()
 
-            if abi is None:
-                raise ValueError(f"No ABI found for {spec.abi_name}")
+    def _index_specs(
+        self,
+    ) -> Dict[Tuple[Optional[str], str], List[ClassifierSpec]]:
+        """
+        Maps (contract address, selector) to the specs that could decode
+        a call, in the order they're tried
 
-            decoder = ABIDecoder(abi)
-            self._decoders_by_abi_name[spec.abi_name] = decoder
+        Specs valid for any address are under (None, selector), and are
+        also merged into each address's entries for the same selector
+        """
+
+        prioritized_specs: Dict[
+            Tuple[Optional[str], str], List[Tuple[int, ClassifierSpec]]
+        ] = {}
+
+        for priority, spec in enumerate(self._classifier_specs):
+            decoder = self._decoders_by_abi_name[spec.abi_name]
+
+            addresses: List[Optional[str]] = (
+                [None]
+                if spec.valid_contract_addresses is None
+                else list(
+                    {address.lower() for address in spec.valid_contract_addresses}
+                )
+            )
+
+            for address in addresses:
+                for selector in decoder.get_selectors():
+                    prioritized_specs.setdefault((address, selector), []).append(
+                        (priority, spec)
+                    )
+
+        for (address, selector), specs in prioritized_specs.items():
+            if address is not None:
+                specs.extend(prioritized_specs.get((None, selector), []))
+                specs.sort(key=lambda prioritized_spec: prioritized_spec[0])
+
+        return {
+            key: [spec for _, spec in specs] for key, specs in prioritized_specs.items()
+        }
 
     def classify(
         self,
@@ -45,56 +119,133 @@ class TraceClassifier:
             if classified_trace is not None:
                 return classified_trace
 
-        return ClassifiedTrace(
-            **trace.dict(),
-            trace_type=trace.type,
+        return self._build_trace(
+            ClassifiedTrace,
+            trace,
             classification=Classification.unknown,
         )
 
-    def _classify_call(self, trace) -> Optional[ClassifiedTrace]:
-        action = CallAction(**trace.action)
-        result = CallResult(**trace.result) if trace.result is not None else None
+    def _build_trace(
+        self,
+        trace_class: Type[ClassifiedTraceT],
+        trace: Trace,
+        **values: Any,
+    ) -> ClassifiedTraceT:
+        if self._validate_traces:
+            return trace_class(**trace.dict(), **values)
+
+        # the trace was validated when it was loaded, so its fields
+        # are carried over as they are rather than copied and checked again
+        return trace_class.construct(**trace.__dict__, **values)
+
+    def _parse_call(self, trace: Trace) -> Tuple[CallAction, Optional[CallResult]]:
+        if self._validate_traces:
+            return (
+                CallAction(**trace.action),
+                CallResult(**trace.result) if trace.result is not None else None,
+            )
+
+        action = CallAction.construct(
+            to=trace.action["to"],
+            from_=trace.action["from"],
+            input=trace.action["input"],
+            value=_maybe_hex_to_int(trace.action["value"]),
+            gas=_maybe_hex_to_int(trace.action["gas"]),
+        )
+        result = (
+            CallResult.construct(gas_used=_maybe_hex_to_int(trace.result["gasUsed"]))
+            if trace.result is not None
+            else None
+        )
+
+        return action, result
+
+    def _decode(
+        self,
+        abi_name: str,
+        decoder: ABIDecoder,
+        data: str,
+    ) -> Optional[CallData]:
+        if self.decode_cache is None:
+            return decoder.decode(data)
+
+        return self.decode_cache.get_or_decode(abi_name, data, decoder.decode)
 
-        for spec in self._classifier_specs:
-            if spec.valid_contract_addresses is not None:
-                lower_valid_addresses = {
-                    address.lower() for address in spec.valid_contract_addresses
-                }
+    def _classify_call(self, trace: Trace) -> Optional[ClassifiedTrace]:
+        action, result = self._parse_call(trace)
 
-                if action.to not in lower_valid_addresses:
-                    continue
+        selector = action.input[:SELECTOR_LENGTH]
+        specs = self._specs_by_address_and_selector.get((action.to, selector))
+        if specs is None:
+            specs = self._specs_by_address_and_selector.get((None, selector), [])
 
+        for spec in specs:
             decoder = self._decoders_by_abi_name[spec.abi_name]
-            call_data = decoder.decode(action.input)
-
-            if call_data is not None:
-                signature = call_data.function_signature
-                classifier = spec.classifiers.get(signature)
-                classification = (
-                    Classification.unknown
-                    if classifier is None
-                    else classifier.get_classification()
-                )
+            call_data = (
+                decoder.decode_lazily(action.input)
+                if self._lazy_inputs
+                else self._decode(spec.abi_name, decoder, action.input)
+            )
 
-                return DecodedCallTrace(
-                    **trace.dict(),
-                    trace_type=trace.type,
-                    classification=classification,
-                    protocol=spec.protocol,
-                    abi_name=spec.abi_name,
-                    function_name=call_data.function_name,
-                    function_signature=signature,
-                    inputs=call_data.inputs,
-                    to_address=action.to,
-                    from_address=action.from_,
-                    value=action.value,
-                    gas=action.gas,
-                    gas_used=result.gas_used if result is not None else None,
-                )
+            if call_data is None:
+                continue
+
+            signature = call_data.function_signature
+            classifier = spec.classifiers.get(signature)
+            classification = (
+                Classification.unknown
+                if classifier is None
+                else classifier.get_classification()
+            )
 
-        return CallTrace(
-            **trace.dict(),
-            trace_type=trace.type,
+            lazy_inputs: Optional[LazyInputs] = None
+            call_inputs = call_data.inputs
+
+            if isinstance(call_inputs, LazyInputs):
+                if classification != Classification.unknown:
+                    # detectors read these, so decode them now
+                    call_data = self._decode(spec.abi_name, decoder, action.input)
+                    if call_data is None:
+                        continue
+                else:
+                    # matched by selector alone, so calldata that doesn't
+                    # decode still ends up here, with empty inputs
+                    lazy_inputs = call_inputs
+
+            inputs: Dict[str, Any]
+
+            if lazy_inputs is not None:
+                inputs = {} if self._validate_traces else lazy_inputs
+            else:
+                # decoded inputs can be shared with other traces through
+                # the decode cache, so each trace gets its own copy
+                inputs = dict(call_data.inputs)
+
+            decoded_call_trace = self._build_trace(
+                DecodedCallTrace,
+                trace,
+                classification=classification,
+                protocol=spec.protocol,
+                abi_name=spec.abi_name,
+                function_name=call_data.function_name,
+                function_signature=signature,
+                inputs=inputs,
+                to_address=action.to,
+                from_address=action.from_,
+                value=action.value,
+                gas=action.gas,
+                gas_used=result.gas_used if result is not None else None,
+            )
+
+            if lazy_inputs is not None and self._validate_traces:
+                # set past validation, which would decode them by copying
+                object.__setattr__(decoded_call_trace, "inputs", lazy_inputs)
+
+            return decoded_call_trace
+
+        return self._build_trace(
+            CallTrace,
+            trace,
             classification=Classification.unknown,
             to_address=action.to,
             from_address=action.from_,
@@ -102,3 +253,9 @@ class TraceClassifier:
             gas=action.gas,
             gas_used=result.gas_used if result is not None else None,
         )
+
+
+def _maybe_hex_to_int(value: Any) -> Any:
+    if isinstance(value, str):
+        return hex_to_int(value)
+    return value
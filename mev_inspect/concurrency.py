@@ -1,6 +1,26 @@
 import asyncio
+import logging
 import signal
+import time
+from collections import deque
 from functools import wraps
+from typing import Any, Callable, Coroutine, Deque, Optional
+
+from pydantic import BaseModel
+from web3 import Web3
+from web3.types import RPCEndpoint, RPCResponse
+
+logger = logging.getLogger(__name__)
+
+# a request counts as healthy if it is no slower than this multiple of the median
+LATENCY_TOLERANCE = 2.0
+LATENCY_WINDOW_SIZE = 1000
+
+BACKOFF_FACTOR = 0.7
+BACKOFF_COOLDOWN_SECONDS = 1.0
+
+# HTTP too many requests, and the JSON-RPC "limit exceeded" code
+RATE_LIMIT_ERROR_CODES = (429, -32005)
 
 
 def coro(f):
@@ -20,3 +40,171 @@ def coro(f):
             loop.run_until_complete(loop.shutdown_asyncgens())
 
     return wrapper
+
+
+class ConcurrencyStats(BaseModel):
+    limit: float
+    in_flight: int
+    successes: int
+    failures: int
+    latency_p50_seconds: Optional[float]
+    latency_p90_seconds: Optional[float]
+    latency_p99_seconds: Optional[float]
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit, used like an asyncio.Semaphore
+
+    The limit grows by one for every full window of healthy RPC requests,
+    and is multiplied by BACKOFF_FACTOR on timeouts, rate limits or any
+    other failed request (including each attempt the retry middleware
+    makes). Add rpc_middleware to the provider to feed it
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: Optional[int] = None,
+    ):
+        self._limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit if max_limit is not None else initial_limit
+
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW_SIZE)
+        self._successes = 0
+        self._failures = 0
+        self._last_backoff_at = 0.0
+
+    @property
+    def limit(self) -> int:
+        return max(self._min_limit, int(self._limit))
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *args) -> None:
+        self.release()
+
+    async def acquire(self) -> None:
+        while self._in_flight >= self.limit:
+            waiter = asyncio.get_event_loop().create_future()
+            self._waiters.append(waiter)
+
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                else:
+                    # pass on the slot this waiter was woken for
+                    self._wake_waiters()
+                raise
+
+        self._in_flight += 1
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._wake_waiters()
+
+    def record_success(self, latency_seconds: float) -> None:
+        self._successes += 1
+        p50_latency = self._get_latency_percentile(50)
+        self._latencies.append(latency_seconds)
+
+        is_healthy = (
+            p50_latency is None or latency_seconds <= LATENCY_TOLERANCE * p50_latency
+        )
+
+        if is_healthy and self._limit < self._max_limit:
+            self._limit = min(self._limit + 1 / self._limit, self._max_limit)
+            self._wake_waiters()
+
+    def record_failure(self) -> None:
+        self._failures += 1
+
+        # one backoff per congestion episode rather than one per failed request
+        now = time.monotonic()
+        cooldown_seconds = max(
+            BACKOFF_COOLDOWN_SECONDS,
+            self._get_latency_percentile(50) or 0.0,
+        )
+        if now - self._last_backoff_at < cooldown_seconds:
+            return
+
+        self._last_backoff_at = now
+        previous_limit = self.limit
+        self._limit = max(self._limit * BACKOFF_FACTOR, self._min_limit)
+
+        if self.limit != previous_limit:
+            logger.info(
+                f"Backing off concurrency from {previous_limit} to {self.limit}"
+            )
+
+    def get_stats(self) -> ConcurrencyStats:
+        return ConcurrencyStats(
+            limit=self._limit,
+            in_flight=self._in_flight,
+            successes=self._successes,
+            failures=self._failures,
+            latency_p50_seconds=self._get_latency_percentile(50),
+            latency_p90_seconds=self._get_latency_percentile(90),
+            latency_p99_seconds=self._get_latency_percentile(99),
+        )
+
+    async def rpc_middleware(
+        self,
+        make_request: Callable[[RPCEndpoint, Any], Any],
+        web3: Web3,  # pylint: disable=unused-argument
+    ) -> Callable[[RPCEndpoint, Any], Coroutine[Any, Any, RPCResponse]]:
+        async def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            start = time.monotonic()
+
+            try:
+                response = await make_request(method, params)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.record_failure()
+                raise
+
+            if _is_rate_limit_response(response):
+                self.record_failure()
+            else:
+                self.record_success(time.monotonic() - start)
+
+            return response
+
+        return middleware
+
+    def _wake_waiters(self) -> None:
+        available_slots = self.limit - self._in_flight
+
+        while available_slots > 0 and len(self._waiters) > 0:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                available_slots -= 1
+
+    def _get_latency_percentile(self, percentile: int) -> Optional[float]:
+        if len(self._latencies) == 0:
+            return None
+
+        ordered_latencies = sorted(self._latencies)
+        index = min(
+            len(ordered_latencies) - 1,
+            (len(ordered_latencies) * percentile) // 100,
+        )
+        return ordered_latencies[index]
+
+
+def _is_rate_limit_response(response: Any) -> bool:
+    if not isinstance(response, dict) or "error" not in response:
+        return False
+
+    error = response["error"]
+    return isinstance(error, dict) and error.get("code") in RATE_LIMIT_ERROR_CODES
@@ -0,0 +1,87 @@
+from typing import Any, Iterable, List, Sequence
+
+from pydantic import BaseModel
+
+from mev_inspect.db import write_as_csv
+from mev_inspect.schemas.blocks import Block
+
+
+def write_raw_blocks(
+    trace_db_session,
+    blocks: List[Block],
+) -> None:
+    """
+    Copies blocks fetched from the node into the trace DB,
+    skipping any that are already there
+    """
+
+    _copy_skipping_existing(
+        trace_db_session,
+        "block_timestamps",
+        ("block_number", "block_timestamp"),
+        ((block.block_number, block.block_timestamp) for block in blocks),
+    )
+
+    _copy_skipping_existing(
+        trace_db_session,
+        "base_fee",
+        ("block_number", "base_fee_in_wei"),
+        ((block.block_number, block.base_fee_per_gas) for block in blocks),
+    )
+
+    _copy_skipping_existing(
+        trace_db_session,
+        "block_receipts",
+        ("block_number", "raw_receipts"),
+        ((block.block_number, _to_copy_json(block.receipts)) for block in blocks),
+    )
+
+    _copy_skipping_existing(
+        trace_db_session,
+        "block_traces",
+        ("block_number", "raw_traces"),
+        ((block.block_number, _to_copy_json(block.traces)) for block in blocks),
+    )
+
+    trace_db_session.commit()
+
+
+def _copy_skipping_existing(
+    trace_db_session,
+    table_name: str,
+    columns: Sequence[str],
+    items: Iterable[Iterable[Any]],
+) -> None:
+    # COPY can't skip rows, so copy into a scratch table and insert what's new
+    copy_table_name = f"{table_name}_copy"
+    column_names = ", ".join(columns)
+
+    trace_db_session.execute(
+        f"""
+        CREATE TEMPORARY TABLE {copy_table_name}
+        (LIKE {table_name} INCLUDING DEFAULTS)
+        ON COMMIT DROP
+        """
+    )
+
+    write_as_csv(trace_db_session, copy_table_name, items, columns=columns)
+
+    trace_db_session.execute(
+        f"""
+        INSERT INTO {table_name} ({column_names})
+        SELECT DISTINCT ON (block_number) {column_names}
+        FROM {copy_table_name}
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {table_name}
+            WHERE {table_name}.block_number = {copy_table_name}.block_number
+        )
+        ON CONFLICT DO NOTHING
+        """
+    )
+
+
+def _to_copy_json(models: Sequence[BaseModel]) -> str:
+    models_json = "[" + ",".join(model.json(by_alias=True) for model in models) + "]"
+
+    # backslashes and the separator are special in COPY's text format
+    return models_json.replace("\\", "\\\\").replace("|", "\\|")
@@ -1,20 +1,21 @@
 import os
-from typing import Any, Iterable, List, Optional
+from typing import Any, Iterable, List, Optional, Sequence
 
 from sqlalchemy import create_engine, orm
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from mev_inspect.text_io import StringIteratorIO
 
 
-def get_trace_database_uri() -> Optional[str]:
+def get_trace_database_uri(driver: str = "psycopg2") -> Optional[str]:
     username = os.getenv("TRACE_DB_USER")
     password = os.getenv("TRACE_DB_PASSWORD")
     host = os.getenv("TRACE_DB_HOST")
     db_name = "trace_db"
 
     if all(field is not None for field in [username, password, host]):
-        return f"postgresql+psycopg2://{username}:{password}@{host}/{db_name}"
+        return f"postgresql+{driver}://{username}:{password}@{host}/{db_name}"
 
     return None
 
@@ -54,6 +55,15 @@ def get_trace_sessionmaker():
     return None
 
 
+def get_async_trace_engine(pool_size: int) -> Optional[AsyncEngine]:
+    uri = get_trace_database_uri(driver="asyncpg")
+
+    if uri is not None:
+        return create_async_engine(uri, pool_size=pool_size, max_overflow=0)
+
+    return None
+
+
 def get_inspect_session() -> orm.Session:
     Session = get_inspect_sessionmaker()
     return Session()
@@ -71,13 +81,14 @@ def write_as_csv(
     db_session,
     table_name: str,
     items: Iterable[Iterable[Any]],
+    columns: Optional[Sequence[str]] = None,
 ) -> None:
     csv_iterator = StringIteratorIO(
         ("|".join(map(_clean_csv_value, item)) + "\n" for item in items)
     )
 
     with db_session.connection().connection.cursor() as cursor:
-        cursor.copy_from(csv_iterator, table_name, sep="|")
+        cursor.copy_from(csv_iterator, table_name, sep="|", columns=columns)
 
 
 def _clean_csv_value(value: Optional[Any]) -> str:
@@ -1,24 +1,82 @@
-from typing import Dict, Optional
+import re
+from functools import partial
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 
 import eth_utils.abi
 from eth_abi import decode_abi
-from eth_abi.exceptions import InsufficientDataBytes, NonEmptyPaddingBytes
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.exceptions import (
+    InsufficientDataBytes,
+    NoEntriesFound,
+    NonEmptyPaddingBytes,
+)
+from eth_abi.registry import registry
 from hexbytes._utils import hexstr_to_bytes
 
 from mev_inspect.schemas.abi import ABI, ABIFunctionDescription
-from mev_inspect.schemas.call_data import CallData
+from mev_inspect.schemas.call_data import CallData, LazyInputs
 
 # 0x + 8 characters
 SELECTOR_LENGTH = 10
 
+WORD_SIZE = 32
+
+_UINT_TYPE_PATTERN = re.compile(r"^uint(\d+)$")
+_INT_TYPE_PATTERN = re.compile(r"^int(\d+)$")
+_FIXED_BYTES_TYPE_PATTERN = re.compile(r"^bytes(\d+)$")
+
+_WordDecoder = Callable[[bytes], Any]
+_ValuesDecoder = Callable[[bytes], Tuple[Any, ...]]
+
+
+class DecodableFunction(NamedTuple):
+    """
+    Everything needed to decode calls to an ABI function,
+    without the ABI itself
+    """
+
+    selector: str
+    name: str
+    signature: str
+    input_names: List[str]
+    input_types: List[str]
+
+
+def get_decodable_functions(abi: ABI) -> List[DecodableFunction]:
+    return [
+        DecodableFunction(
+            selector=description.get_selector(),
+            name=description.name,
+            signature=description.get_signature(),
+            input_names=[input.name for input in description.inputs],
+            input_types=[
+                input.type
+                if input.type != "tuple"
+                else eth_utils.abi.collapse_if_tuple(input.dict())
+                for input in description.inputs
+            ],
+        )
+        for description in abi
+        if isinstance(description, ABIFunctionDescription)
+    ]
+
 
 class ABIDecoder:
     def __init__(self, abi: ABI):
-        self._functions_by_selector: Dict[str, ABIFunctionDescription] = {
-            description.get_selector(): description
-            for description in abi
-            if isinstance(description, ABIFunctionDescription)
-        }
+        self._functions_by_selector = _compile_functions(get_decodable_functions(abi))
+
+    @classmethod
+    def from_functions(cls, functions: List[DecodableFunction]) -> "ABIDecoder":
+        """
+        Skips parsing the ABI, for functions that were already worked out
+        """
+
+        decoder = cls([])
+        decoder._functions_by_selector = _compile_functions(functions)
+        return decoder
+
+    def get_selectors(self) -> List[str]:
+        return list(self._functions_by_selector)
 
     def decode(self, data: str) -> Optional[CallData]:
         selector, params = data[:SELECTOR_LENGTH], data[SELECTOR_LENGTH:]
@@ -28,21 +86,223 @@ class ABIDecoder:
         if func is None:
             return None
 
-        names = [input.name for input in func.inputs]
-        types = [
-            input.type
-            if input.type != "tuple"
-            else eth_utils.abi.collapse_if_tuple(input.dict())
-            for input in func.inputs
-        ]
+        inputs = func.decode_inputs(params)
 
-        try:
-            decoded = decode_abi(types, hexstr_to_bytes(params))
-        except (InsufficientDataBytes, NonEmptyPaddingBytes, OverflowError):
+        if inputs is None:
             return None
 
         return CallData(
             function_name=func.name,
-            function_signature=func.get_signature(),
-            inputs={name: value for name, value in zip(names, decoded)},
+            function_signature=func.signature,
+            inputs=inputs,
+        )
+
+    def decode_lazily(self, data: str) -> Optional[CallData]:
+        """
+        Resolves the function from the selector alone, and leaves
+        the inputs to be decoded when they're first read
+
+        Unlike decode, this can't tell whether the params decode,
+        so inputs that turn out not to are left empty
+        """
+
+        selector, params = data[:SELECTOR_LENGTH], data[SELECTOR_LENGTH:]
+
+        func = self._functions_by_selector.get(selector)
+
+        if func is None:
+            return None
+
+        # every input takes at least one 32 byte word
+        if len(params) < 2 * WORD_SIZE * len(func.input_names):
+            return None
+
+        return CallData.construct(
+            function_name=func.name,
+            function_signature=func.signature,
+            inputs=LazyInputs(partial(func.decode_inputs, params)),
+        )
+
+
+class _FunctionDecoder:
+    """
+    Decodes the inputs of one ABI function
+
+    Everything that only depends on the ABI is worked out once up front.
+    Functions taking only static single-word types (addresses, ints,
+    bools, fixed size bytes) are decoded by slicing their words straight
+    out of the calldata, everything else goes through eth_abi
+
+    Compiled decoders can't be pickled, so a pickled decoder is
+    compiled again when it's loaded, at most once per process
+    """
+
+    def __init__(self, function: DecodableFunction):
+        self._function = function
+        self.name = function.name
+        self.signature = function.signature
+        self.input_names = function.input_names
+
+        self._decode_values = _compile_static_decoder(
+            function.input_types
+        ) or _compile_eth_abi_decoder(function.input_types)
+
+    def decode_inputs(self, params: str) -> Optional[Dict[str, Any]]:
+        try:
+            decoded = self._decode_values(hexstr_to_bytes(params))
+        except (InsufficientDataBytes, NonEmptyPaddingBytes, OverflowError):
+            return None
+
+        return dict(zip(self.input_names, decoded))
+
+    def __reduce__(self):
+        return (_load_function_decoder, (self._function,))
+
+
+_loaded_function_decoders: Dict[Tuple[str, ...], _FunctionDecoder] = {}
+
+
+def _load_function_decoder(function: DecodableFunction) -> _FunctionDecoder:
+    key = (function.signature, *function.input_names, *function.input_types)
+
+    function_decoder = _loaded_function_decoders.get(key)
+    if function_decoder is None:
+        function_decoder = _FunctionDecoder(function)
+        _loaded_function_decoders[key] = function_decoder
+
+    return function_decoder
+
+
+def _compile_functions(
+    functions: List[DecodableFunction],
+) -> Dict[str, _FunctionDecoder]:
+    return {function.selector: _FunctionDecoder(function) for function in functions}
+
+
+def _compile_eth_abi_decoder(types: List[str]) -> _ValuesDecoder:
+    try:
+        decoder = TupleDecoder(
+            decoders=[registry.get_decoder(type_str) for type_str in types]
+        )
+    except NoEntriesFound:
+        # leave types eth_abi can't decode to fail on use, as decode_abi would
+        def decode_unsupported_values(data: bytes) -> Tuple[Any, ...]:
+            return decode_abi(types, data)
+
+        return decode_unsupported_values
+
+    def decode_values(data: bytes) -> Tuple[Any, ...]:
+        return decoder(ContextFramesBytesIO(data))
+
+    return decode_values
+
+
+def _compile_static_decoder(types: List[str]) -> Optional[_ValuesDecoder]:
+    word_decoders = []
+
+    for type_str in types:
+        word_decoder = _get_word_decoder(type_str)
+
+        if word_decoder is None:
+            return None
+
+        word_decoders.append(word_decoder)
+
+    word_offsets = [
+        (i * WORD_SIZE, (i + 1) * WORD_SIZE, word_decoder)
+        for i, word_decoder in enumerate(word_decoders)
+    ]
+    head_size = len(word_offsets) * WORD_SIZE
+
+    def decode_values(data: bytes) -> Tuple[Any, ...]:
+        if len(data) < head_size:
+            raise InsufficientDataBytes(
+                f"Tried to read {head_size} bytes.  Only got {len(data)} bytes"
+            )
+
+        return tuple(
+            word_decoder(data[start:end]) for start, end, word_decoder in word_offsets
         )
+
+    return decode_values
+
+
+def _get_word_decoder(type_str: str) -> Optional[_WordDecoder]:
+    """
+    Decoders matching eth_abi's for types that fit in a single word,
+    including raising NonEmptyPaddingBytes for the same words
+    """
+
+    if type_str == "address":
+        return _decode_address
+
+    if type_str == "bool":
+        return _decode_bool
+
+    uint_match = _UINT_TYPE_PATTERN.match(type_str)
+    if uint_match is not None:
+        return _make_uint_decoder(int(uint_match.group(1)))
+
+    int_match = _INT_TYPE_PATTERN.match(type_str)
+    if int_match is not None:
+        return _make_int_decoder(int(int_match.group(1)))
+
+    fixed_bytes_match = _FIXED_BYTES_TYPE_PATTERN.match(type_str)
+    if fixed_bytes_match is not None:
+        return _make_fixed_bytes_decoder(int(fixed_bytes_match.group(1)))
+
+    return None
+
+
+def _decode_address(word: bytes) -> str:
+    if any(word[:12]):
+        raise NonEmptyPaddingBytes(f"Padding bytes were not empty: {word[:12]!r}")
+
+    return "0x" + word[12:].hex()
+
+
+def _decode_bool(word: bytes) -> bool:
+    if any(word[:31]) or word[31] > 1:
+        raise NonEmptyPaddingBytes(f"Boolean must be either 0x0 or 0x1.  Got: {word!r}")
+
+    return word[31] == 1
+
+
+def _make_uint_decoder(bit_size: int) -> _WordDecoder:
+    def decode_uint(word: bytes) -> int:
+        value = int.from_bytes(word, "big")
+
+        if value >> bit_size:
+            raise NonEmptyPaddingBytes(f"Padding bytes were not empty: {word!r}")
+
+        return value
+
+    return decode_uint
+
+
+def _make_int_decoder(bit_size: int) -> _WordDecoder:
+    min_value = -(2 ** (bit_size - 1))
+    max_value = 2 ** (bit_size - 1) - 1
+
+    def decode_int(word: bytes) -> int:
+        # valid padding is exactly a sign extension of the value
+        value = int.from_bytes(word, "big", signed=True)
+
+        if not min_value <= value <= max_value:
+            raise NonEmptyPaddingBytes(f"Padding bytes were not empty: {word!r}")
+
+        return value
+
+    return decode_int
+
+
+def _make_fixed_bytes_decoder(byte_size: int) -> _WordDecoder:
+    def decode_fixed_bytes(word: bytes) -> bytes:
+        if any(word[byte_size:]):
+            raise NonEmptyPaddingBytes(
+                f"Padding bytes were not empty: {word[byte_size:]!r}"
+            )
+
+        return word[:byte_size]
+
+    return decode_fixed_bytes
@@ -0,0 +1,124 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from pydantic import BaseModel
+
+from mev_inspect.schemas.call_data import CallData
+
+DEFAULT_DECODE_CACHE_SIZE = 50000
+
+# enough to make collisions between different calldata a non-issue
+CALLDATA_DIGEST_SIZE = 16
+
+
+class DecodeCacheStats(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: Optional[float]
+    entries: int
+    size_bytes: int
+
+
+class DecodeCache:
+    """
+    Least recently used cache of decoded calldata, keyed by
+    ABI name and a digest of the calldata
+
+    The same approve, transfer and router calls come up again and again
+    across blocks, so those are only decoded once. Failed decodes are
+    cached too. Blocks can be analysed on executor threads, so reads
+    and writes take a lock
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_DECODE_CACHE_SIZE):
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+        # (abi name, calldata digest) -> (call data, estimated size)
+        self._entries: "OrderedDict[Tuple[str, bytes], Tuple[Optional[CallData], int]]" = (
+            OrderedDict()
+        )
+        self._size_bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_decode(
+        self,
+        abi_name: str,
+        data: str,
+        decode: Callable[[str], Optional[CallData]],
+    ) -> Optional[CallData]:
+        key = (
+            abi_name,
+            hashlib.blake2b(
+                data.encode("ascii"), digest_size=CALLDATA_DIGEST_SIZE
+            ).digest(),
+        )
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+
+            self._misses += 1
+
+        call_data = decode(data)
+        size_bytes = _estimate_size_bytes(call_data)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (call_data, size_bytes)
+                self._size_bytes += size_bytes
+
+            while len(self._entries) > self._max_entries:
+                _, (_, evicted_size_bytes) = self._entries.popitem(last=False)
+                self._size_bytes -= evicted_size_bytes
+
+        return call_data
+
+    def get_stats(self) -> DecodeCacheStats:
+        with self._lock:
+            lookups = self._hits + self._misses
+
+            return DecodeCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                hit_rate=self._hits / lookups if lookups > 0 else None,
+                entries=len(self._entries),
+                size_bytes=self._size_bytes,
+            )
+
+
+def _estimate_size_bytes(call_data: Optional[CallData]) -> int:
+    # the key, plus the tuple holding the entry
+    size_bytes = sys.getsizeof(b"") + CALLDATA_DIGEST_SIZE + sys.getsizeof((None, 0))
+
+    if call_data is not None:
+        size_bytes += (
+            sys.getsizeof(call_data)
+            + sys.getsizeof(call_data.function_name)
+            + sys.getsizeof(call_data.function_signature)
+            + _estimate_value_size_bytes(call_data.inputs)
+        )
+
+    return size_bytes
+
+
+def _estimate_value_size_bytes(value: Any) -> int:
+    size_bytes = sys.getsizeof(value)
+
+    if isinstance(value, dict):
+        size_bytes += sum(
+            sys.getsizeof(key) + _estimate_value_size_bytes(item)
+            for key, item in value.items()
+        )
+    elif isinstance(value, (list, tuple)):
+        size_bytes += sum(_estimate_value_size_bytes(item) for item in value)
+
+    return size_bytes
@@ -1,5 +1,10 @@
+from typing import Dict
+
 from web3 import Web3
 
+# most nodes cap eth_feeHistory at 1024 blocks per call
+MAX_FEE_HISTORY_BLOCK_COUNT = 1024
+
 
 async def fetch_base_fee_per_gas(w3: Web3, block_number: int) -> int:
     base_fees = await w3.eth.fee_history(1, block_number)
@@ -8,3 +13,37 @@ async def fetch_base_fee_per_gas(w3: Web3, block_number: int) -> int:
         raise RuntimeError("Unexpected error - no fees returned")
 
     return base_fees_per_gas[0]
+
+
+async def fetch_base_fees_per_gas(
+    w3: Web3,
+    after_block_number: int,
+    before_block_number: int,
+) -> Dict[int, int]:
+    base_fees_per_gas_by_block: Dict[int, int] = {}
+
+    for batch_after_block_number in range(
+        after_block_number,
+        before_block_number,
+        MAX_FEE_HISTORY_BLOCK_COUNT,
+    ):
+        batch_before_block_number = min(
+            batch_after_block_number + MAX_FEE_HISTORY_BLOCK_COUNT,
+            before_block_number,
+        )
+
+        base_fees = await w3.eth.fee_history(
+            batch_before_block_number - batch_after_block_number,
+            batch_before_block_number - 1,
+        )
+
+        # the last base fee returned is for the block after the newest block
+        oldest_block_number = base_fees["oldestBlock"]
+        base_fees_per_gas = base_fees["baseFeePerGas"][:-1]
+        if len(base_fees_per_gas) == 0:
+            raise RuntimeError("Unexpected error - no fees returned")
+
+        for i, base_fee_per_gas in enumerate(base_fees_per_gas):
+            base_fees_per_gas_by_block[oldest_block_number + i] = base_fee_per_gas
+
+    return base_fees_per_gas_by_block
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from websockets.client import connect as websocket_connect
+
+from mev_inspect.block import get_latest_block_number
+from mev_inspect.utils import hex_to_int
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_SECONDS = 5
+RECONNECT_INTERVAL_SECONDS = 5
+
+
+class PollingHeadSource:
+    """Finds new blocks by asking the node for its latest block"""
+
+    def __init__(
+        self, base_provider, poll_interval_seconds: float = POLL_INTERVAL_SECONDS
+    ):
+        self._base_provider = base_provider
+        self._poll_interval_seconds = poll_interval_seconds
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def get_latest_block_number(self) -> int:
+        return await get_latest_block_number(self._base_provider)
+
+    async def wait_for_new_head(self) -> None:
+        await asyncio.sleep(self._poll_interval_seconds)
+
+
+class SubscriptionHeadSource:
+    """
+    Tracks new blocks through an eth_subscribe newHeads websocket subscription
+
+    Falls back to polling the base provider while the subscription is down
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        base_provider,
+        poll_interval_seconds: float = POLL_INTERVAL_SECONDS,
+        reconnect_interval_seconds: float = RECONNECT_INTERVAL_SECONDS,
+    ):
+        self._ws_url = ws_url
+        self._base_provider = base_provider
+        self._poll_interval_seconds = poll_interval_seconds
+        self._reconnect_interval_seconds = reconnect_interval_seconds
+
+        self._latest_block_number: Optional[int] = None
+        self._is_subscribed = False
+        self._new_head = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_subscribed(self) -> bool:
+        return self._is_subscribed
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._subscribe_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+            self._task = None
+
+    async def get_latest_block_number(self) -> int:
+        if self._is_subscribed and self._latest_block_number is not None:
+            return self._latest_block_number
+
+        return await get_latest_block_number(self._base_provider)
+
+    async def wait_for_new_head(self) -> None:
+        try:
+            await asyncio.wait_for(
+                self._new_head.wait(),
+                timeout=self._poll_interval_seconds,
+            )
+        except asyncio.TimeoutError:
+            pass
+
+        self._new_head.clear()
+
+    async def _subscribe_forever(self) -> None:
+        while True:
+            try:
+                await self._subscribe()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # pylint: disable=broad-except
+                logger.error(f"newHeads subscription failed, polling instead: {e}")
+            finally:
+                self._is_subscribed = False
+
+            await asyncio.sleep(self._reconnect_interval_seconds)
+
+    async def _subscribe(self) -> None:
+        async with websocket_connect(self._ws_url, max_size=None) as websocket:
+            await websocket.send(
+                json.dumps(
+                    {
+                        "jsonrpc": "2.0",
+                        "id": 1,
+                        "method": "eth_subscribe",
+                        "params": ["newHeads"],
+                    }
+                )
+            )
+
+            response = json.loads(await websocket.recv())
+            if "error" in response:
+                raise RuntimeError(response["error"])
+
+            logger.info(f"Subscribed to newHeads with id {response['result']}")
+
+            async for message in websocket:
+                head = json.loads(message)["params"]["result"]
+
+                self._latest_block_number = hex_to_int(head["number"])
+                self._is_subscribed = True
+                self._new_head.set()
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Collection, Coroutine, Deque, Dict, Optional
+
+from pydantic import BaseModel
+from web3 import Web3
+from web3.types import RPCEndpoint, RPCResponse
+
+from mev_inspect.methods import BATCH_METHOD
+
+logger = logging.getLogger(__name__)
+
+HEDGED_METHODS = ("trace_block", BATCH_METHOD)
+HEDGE_PERCENTILE = 95
+
+LATENCY_WINDOW_SIZE = 1000
+
+# don't hedge until there are enough samples for the percentile to mean something
+MIN_LATENCY_SAMPLES = 20
+
+
+class HedgingStats(BaseModel):
+    requests: int
+    hedged_requests: int
+    hedge_wins: int
+    hedge_delay_seconds_by_method: Dict[str, float]
+
+
+class RequestHedger:
+    """
+    Sends a second copy of a request once it has taken longer
+    than `percentile` of recent requests for the same method.
+    The first response wins and the other request is cancelled
+
+    With an RPC pool the copy goes to the next best endpoint,
+    otherwise it goes out on another connection to the same node.
+    Add rpc_middleware to the provider to use it
+    """
+
+    def __init__(
+        self,
+        methods: Collection[str] = HEDGED_METHODS,
+        percentile: int = HEDGE_PERCENTILE,
+    ):
+        self._methods = methods
+        self._percentile = percentile
+
+        self._latencies_by_method: Dict[str, Deque[float]] = {
+            method: deque(maxlen=LATENCY_WINDOW_SIZE) for method in methods
+        }
+        self._requests = 0
+        self._hedged_requests = 0
+        self._hedge_wins = 0
+
+    def get_hedge_delay(self, method: str) -> Optional[float]:
+        latencies = self._latencies_by_method[method]
+
+        if len(latencies) < MIN_LATENCY_SAMPLES:
+            return None
+
+        ordered_latencies = sorted(latencies)
+        index = min(
+            len(ordered_latencies) - 1,
+            (len(ordered_latencies) * self._percentile) // 100,
+        )
+        return ordered_latencies[index]
+
+    def get_stats(self) -> HedgingStats:
+        hedge_delay_seconds_by_method = {}
+
+        for method in self._methods:
+            hedge_delay = self.get_hedge_delay(method)
+            if hedge_delay is not None:
+                hedge_delay_seconds_by_method[method] = hedge_delay
+
+        return HedgingStats(
+            requests=self._requests,
+            hedged_requests=self._hedged_requests,
+            hedge_wins=self._hedge_wins,
+            hedge_delay_seconds_by_method=hedge_delay_seconds_by_method,
+        )
+
+    async def rpc_middleware(
+        self,
+        make_request: Callable[[RPCEndpoint, Any], Any],
+        web3: Web3,  # pylint: disable=unused-argument
+    ) -> Callable[[RPCEndpoint, Any], Coroutine[Any, Any, RPCResponse]]:
+        async def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            if method not in self._methods:
+                return await make_request(method, params)
+
+            start = time.monotonic()
+            response = await self._make_hedged_request(make_request, method, params)
+            self._latencies_by_method[method].append(time.monotonic() - start)
+
+            return response
+
+        return middleware
+
+    async def _make_hedged_request(
+        self,
+        make_request: Callable[[RPCEndpoint, Any], Any],
+        method: RPCEndpoint,
+        params: Any,
+    ) -> RPCResponse:
+        self._requests += 1
+
+        hedge_delay = self.get_hedge_delay(method)
+        if hedge_delay is None:
+            return await make_request(method, params)
+
+        request = asyncio.ensure_future(make_request(method, params))
+        pending = {request}
+
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+            if request in done:
+                return request.result()
+
+            logger.info(f"Hedging {method} {params} after {hedge_delay:.2f}s")
+            self._hedged_requests += 1
+
+            hedge = asyncio.ensure_future(make_request(method, params))
+            pending.add(hedge)
+
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                # prefer a response over an error while the other request can still succeed
+                for task in sorted(done, key=lambda task: task.exception() is not None):
+                    if task.exception() is None or len(pending) == 0:
+                        if task is hedge:
+                            self._hedge_wins += 1
+
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
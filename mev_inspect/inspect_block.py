@@ -1,11 +1,22 @@
+import asyncio
 import logging
-from typing import List, Optional
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Deque, Dict, List, NamedTuple, Optional, Set, Tuple
 
 from sqlalchemy import orm
 from web3 import Web3
 
 from mev_inspect.arbitrages import get_arbitrages
-from mev_inspect.block import create_from_block_number
+from mev_inspect.block import (
+    create_from_block_number,
+    create_from_block_numbers,
+    find_blocks,
+    find_blocks_async,
+)
+from mev_inspect.block_store import BlockStore
+from mev_inspect.classifiers.registry import DEFAULT_REGISTRY_PATH
 from mev_inspect.classifiers.trace import TraceClassifier
 from mev_inspect.crud.arbitrages import delete_arbitrages_for_blocks, write_arbitrages
 from mev_inspect.crud.blocks import delete_blocks, write_blocks
@@ -34,6 +45,8 @@ from mev_inspect.crud.traces import (
     write_classified_traces,
 )
 from mev_inspect.crud.transfers import delete_transfers_for_blocks, write_transfers
+from mev_inspect.decode_cache import DEFAULT_DECODE_CACHE_SIZE
+from mev_inspect.fees import fetch_base_fees_per_gas
 from mev_inspect.liquidations import get_liquidations
 from mev_inspect.miner_payments import get_miner_payments
 from mev_inspect.nft_trades import get_nft_trades
@@ -52,7 +65,10 @@ from mev_inspect.schemas.swaps import Swap
 from mev_inspect.schemas.traces import ClassifiedTrace
 from mev_inspect.schemas.transfers import Transfer
 from mev_inspect.swaps import get_swaps
-from mev_inspect.transfers import get_transfers
+from mev_inspect.trace_archive import TraceArchive
+from mev_inspect.trace_cache import TraceCacheWriter
+from mev_inspect.trace_db import TraceDBReader
+from mev_inspect.transfers import TransferIndex
 
 logger = logging.getLogger(__name__)
 
@@ -84,7 +100,32 @@ async def inspect_many_blocks(
     before_block_number: int,
     trace_db_session: Optional[orm.Session],
     should_write_classified_traces: bool = True,
+    rpc_batch_size: Optional[int] = None,
+    prefetch_depth: int = 0,
+    trace_cache_writer: Optional[TraceCacheWriter] = None,
+    block_store: Optional[BlockStore] = None,
+    trace_archive: Optional[TraceArchive] = None,
+    trace_db_reader: Optional[TraceDBReader] = None,
+    analysis_pool: Optional["AnalysisPool"] = None,
 ):
+    """
+    prefetch_depth is how many blocks (or RPC batches of blocks)
+    to keep fetching ahead of the block being analysed
+
+    trace_cache_writer, if given, saves blocks fetched over RPC to the trace DB
+
+    block_store, if given, is checked for blocks missing from the trace DB,
+    and saves blocks fetched over RPC
+
+    trace_archive, if given, is checked before anything else
+
+    trace_db_reader, if given, is used for trace DB lookups
+    in place of trace_db_session, so they overlap with RPC fetches
+
+    analysis_pool, if given, classifies and analyses blocks
+    on worker processes, in place of trace_classifier
+    """
+
     all_blocks: List[Block] = []
     all_classified_traces: List[ClassifiedTrace] = []
     all_transfers: List[Transfer] = []
@@ -101,73 +142,80 @@ async def inspect_many_blocks(
 
     all_nft_trades: List[NftTrade] = []
 
-    for block_number in range(after_block_number, before_block_number):
-        block = await create_from_block_number(
+    block_inspections: List[_BlockInspection] = []
+    block_chunk: List[Block] = []
+    pending_block_inspections: Deque[asyncio.Future] = deque()
+
+    try:
+        async for block in _get_blocks(
             w3,
-            block_number,
+            after_block_number,
+            before_block_number,
             trace_db_session,
-        )
-
-        logger.info(f"Block: {block_number} -- Total traces: {len(block.traces)}")
-
-        total_transactions = len(
-            set(
-                t.transaction_hash
-                for t in block.traces
-                if t.transaction_hash is not None
-            )
-        )
-        logger.info(
-            f"Block: {block_number} -- Total transactions: {total_transactions}"
-        )
-
-        classified_traces = trace_classifier.classify(block.traces)
-        logger.info(
-            f"Block: {block_number} -- Returned {len(classified_traces)} classified traces"
-        )
-
-        transfers = get_transfers(classified_traces)
-        logger.info(f"Block: {block_number} -- Found {len(transfers)} transfers")
-
-        swaps = get_swaps(classified_traces)
-        logger.info(f"Block: {block_number} -- Found {len(swaps)} swaps")
-
-        arbitrages = get_arbitrages(swaps)
-        logger.info(f"Block: {block_number} -- Found {len(arbitrages)} arbitrages")
-
-        liquidations = get_liquidations(classified_traces)
-        logger.info(f"Block: {block_number} -- Found {len(liquidations)} liquidations")
-
-        sandwiches = get_sandwiches(swaps)
-        logger.info(f"Block: {block_number} -- Found {len(sandwiches)} sandwiches")
-
-        punk_bids = get_punk_bids(classified_traces)
-        punk_bid_acceptances = get_punk_bid_acceptances(classified_traces)
-        punk_snipes = get_punk_snipes(punk_bids, punk_bid_acceptances)
-        logger.info(f"Block: {block_number} -- Found {len(punk_snipes)} punk snipes")
-
-        nft_trades = get_nft_trades(classified_traces)
-        logger.info(f"Block: {block_number} -- Found {len(nft_trades)} nft trades")
-
-        miner_payments = get_miner_payments(
-            block.miner, block.base_fee_per_gas, classified_traces, block.receipts
-        )
-
-        all_blocks.append(block)
-        all_classified_traces.extend(classified_traces)
-        all_transfers.extend(transfers)
-        all_swaps.extend(swaps)
-        all_arbitrages.extend(arbitrages)
-        all_liquidations.extend(liquidations)
-        all_sandwiches.extend(sandwiches)
-
-        all_punk_bids.extend(punk_bids)
-        all_punk_bid_acceptances.extend(punk_bid_acceptances)
-        all_punk_snipes.extend(punk_snipes)
-
-        all_nft_trades.extend(nft_trades)
-
-        all_miner_payments.extend(miner_payments)
+            rpc_batch_size,
+            prefetch_depth,
+            trace_cache_writer,
+            block_store,
+            trace_archive,
+            trace_db_reader,
+        ):
+            all_blocks.append(block)
+
+            if analysis_pool is not None:
+                block_chunk.append(block)
+
+                if len(block_chunk) >= analysis_pool.chunk_size:
+                    # wait on the oldest chunk, rather than queueing without limit
+                    if (
+                        len(pending_block_inspections)
+                        >= analysis_pool.max_chunks_in_flight
+                    ):
+                        block_inspections.extend(
+                            await pending_block_inspections.popleft()
+                        )
+
+                    pending_block_inspections.append(
+                        asyncio.ensure_future(analysis_pool.inspect_blocks(block_chunk))
+                    )
+                    block_chunk = []
+
+            elif prefetch_depth > 0:
+                # analyse off the event loop, so prefetched blocks keep downloading
+                block_inspections.append(
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, _inspect_block_data, trace_classifier, block
+                    )
+                )
+            else:
+                block_inspections.append(_inspect_block_data(trace_classifier, block))
+
+        if analysis_pool is not None:
+            if len(block_chunk) > 0:
+                pending_block_inspections.append(
+                    asyncio.ensure_future(analysis_pool.inspect_blocks(block_chunk))
+                )
+
+            while len(pending_block_inspections) > 0:
+                block_inspections.extend(await pending_block_inspections.popleft())
+    finally:
+        for pending_block_inspection in pending_block_inspections:
+            pending_block_inspection.cancel()
+
+    for block_inspection in block_inspections:
+        all_classified_traces.extend(block_inspection.classified_traces)
+        all_transfers.extend(block_inspection.transfers)
+        all_swaps.extend(block_inspection.swaps)
+        all_arbitrages.extend(block_inspection.arbitrages)
+        all_liquidations.extend(block_inspection.liquidations)
+        all_sandwiches.extend(block_inspection.sandwiches)
+
+        all_punk_bids.extend(block_inspection.punk_bids)
+        all_punk_bid_acceptances.extend(block_inspection.punk_bid_acceptances)
+        all_punk_snipes.extend(block_inspection.punk_snipes)
+
+        all_nft_trades.extend(block_inspection.nft_trades)
+
+        all_miner_payments.extend(block_inspection.miner_payments)
 
     logger.info("Writing data")
     delete_blocks(inspect_db_session, after_block_number, before_block_number)
@@ -234,3 +282,302 @@ async def inspect_many_blocks(
     )
 
     logger.info("Done writing")
+
+
+class _BlockInspection(NamedTuple):
+    classified_traces: List[ClassifiedTrace]
+    transfers: List[Transfer]
+    swaps: List[Swap]
+    arbitrages: List[Arbitrage]
+    liquidations: List[Liquidation]
+    sandwiches: List[Sandwich]
+    punk_bids: List[PunkBid]
+    punk_bid_acceptances: List[PunkBidAcceptance]
+    punk_snipes: List[PunkSnipe]
+    nft_trades: List[NftTrade]
+    miner_payments: List[MinerPayment]
+
+
+def _inspect_block_data(
+    trace_classifier: TraceClassifier, block: Block
+) -> _BlockInspection:
+    block_number = block.block_number
+    logger.info(f"Block: {block_number} -- Total traces: {len(block.traces)}")
+
+    total_transactions = len(
+        set(t.transaction_hash for t in block.traces if t.transaction_hash is not None)
+    )
+    logger.info(f"Block: {block_number} -- Total transactions: {total_transactions}")
+
+    classified_traces = trace_classifier.classify(block.traces)
+    logger.info(
+        f"Block: {block_number} -- Returned {len(classified_traces)} classified traces"
+    )
+
+    transfer_index = TransferIndex(classified_traces)
+    transfers = transfer_index.transfers
+    logger.info(f"Block: {block_number} -- Found {len(transfers)} transfers")
+
+    swaps = get_swaps(classified_traces, transfer_index)
+    logger.info(f"Block: {block_number} -- Found {len(swaps)} swaps")
+
+    arbitrages = get_arbitrages(swaps)
+    logger.info(f"Block: {block_number} -- Found {len(arbitrages)} arbitrages")
+
+    liquidations = get_liquidations(classified_traces, transfer_index)
+    logger.info(f"Block: {block_number} -- Found {len(liquidations)} liquidations")
+
+    sandwiches = get_sandwiches(swaps)
+    logger.info(f"Block: {block_number} -- Found {len(sandwiches)} sandwiches")
+
+    punk_bids = get_punk_bids(classified_traces)
+    punk_bid_acceptances = get_punk_bid_acceptances(classified_traces)
+    punk_snipes = get_punk_snipes(punk_bids, punk_bid_acceptances)
+    logger.info(f"Block: {block_number} -- Found {len(punk_snipes)} punk snipes")
+
+    nft_trades = get_nft_trades(classified_traces, transfer_index)
+    logger.info(f"Block: {block_number} -- Found {len(nft_trades)} nft trades")
+
+    miner_payments = get_miner_payments(
+        block.miner,
+        block.base_fee_per_gas,
+        classified_traces,
+        block.receipts,
+        transfer_index,
+    )
+
+    return _BlockInspection(
+        classified_traces=classified_traces,
+        transfers=transfers,
+        swaps=swaps,
+        arbitrages=arbitrages,
+        liquidations=liquidations,
+        sandwiches=sandwiches,
+        punk_bids=punk_bids,
+        punk_bid_acceptances=punk_bid_acceptances,
+        punk_snipes=punk_snipes,
+        nft_trades=nft_trades,
+        miner_payments=miner_payments,
+    )
+
+
+class AnalysisPool:
+    """
+    Classifies and analyses blocks on a pool of worker processes,
+    so analysis can use more than the event loop's one core
+
+    Each worker builds its own TraceClassifier once, then takes blocks
+    chunk_size at a time and sends back what was found in them
+
+    max_chunks_in_flight caps the chunks each caller has sent to the pool
+    and not yet collected, defaulting to two per worker to keep them busy
+
+    Workers are started on first use, and started again
+    if blocks are sent after a shutdown
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        chunk_size: int = 1,
+        lazy_inputs: bool = False,
+        decode_cache_size: int = DEFAULT_DECODE_CACHE_SIZE,
+        registry_path: str = DEFAULT_REGISTRY_PATH,
+        max_chunks_in_flight: Optional[int] = None,
+    ):
+        self.chunk_size = chunk_size
+        self.max_chunks_in_flight = (
+            max_chunks_in_flight if max_chunks_in_flight is not None else 2 * workers
+        )
+
+        self._workers = workers
+        self._worker_args = (lazy_inputs, decode_cache_size, registry_path)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def inspect_blocks(self, blocks: List[Block]) -> List[_BlockInspection]:
+        if self._executor is None:
+            # spawn rather than fork, as forking copies the parent's
+            # event loop, DB connections and threads into each worker
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_analysis_worker,
+                initargs=self._worker_args,
+            )
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, _inspect_blocks_in_worker, blocks
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+_worker_trace_classifier: Optional[TraceClassifier] = None
+
+
+def _init_analysis_worker(
+    lazy_inputs: bool,
+    decode_cache_size: int,
+    registry_path: str,
+) -> None:
+    global _worker_trace_classifier  # pylint: disable=global-statement
+
+    _worker_trace_classifier = TraceClassifier(
+        lazy_inputs=lazy_inputs,
+        decode_cache_size=decode_cache_size,
+        registry_path=registry_path,
+    )
+
+
+def _inspect_blocks_in_worker(blocks: List[Block]) -> List[_BlockInspection]:
+    if _worker_trace_classifier is None:
+        raise RuntimeError("Analysis worker wasn't initialized")
+
+    return [_inspect_block_data(_worker_trace_classifier, block) for block in blocks]
+
+
+async def _get_blocks(
+    w3: Web3,
+    after_block_number: int,
+    before_block_number: int,
+    trace_db_session: Optional[orm.Session],
+    rpc_batch_size: Optional[int],
+    prefetch_depth: int,
+    trace_cache_writer: Optional[TraceCacheWriter],
+    block_store: Optional[BlockStore],
+    trace_archive: Optional[TraceArchive],
+    trace_db_reader: Optional[TraceDBReader],
+) -> AsyncIterator[Block]:
+    existing_blocks: Dict[int, Block] = {}
+
+    if trace_archive is not None:
+        existing_blocks = trace_archive.find_blocks(
+            after_block_number, before_block_number
+        )
+
+    if len(existing_blocks) < before_block_number - after_block_number:
+        trace_db_blocks: Dict[int, Block] = {}
+
+        if trace_db_reader is not None:
+            trace_db_blocks = await find_blocks_async(
+                trace_db_reader, after_block_number, before_block_number
+            )
+        elif trace_db_session is not None:
+            trace_db_blocks = find_blocks(
+                trace_db_session, after_block_number, before_block_number
+            )
+
+        for block_number, block in trace_db_blocks.items():
+            existing_blocks.setdefault(block_number, block)
+
+    if block_store is not None:
+        for block_number in range(after_block_number, before_block_number):
+            if block_number not in existing_blocks:
+                stored_block = block_store.find_block(block_number)
+                if stored_block is not None:
+                    existing_blocks[block_number] = stored_block
+
+    missing_block_numbers = [
+        block_number
+        for block_number in range(after_block_number, before_block_number)
+        if block_number not in existing_blocks
+    ]
+
+    if len(missing_block_numbers) == 0:
+        for block_number in range(after_block_number, before_block_number):
+            if block_number in existing_blocks:
+                yield existing_blocks[block_number]
+
+        return
+
+    if rpc_batch_size is None:
+        base_fees_per_gas = await fetch_base_fees_per_gas(
+            w3, min(missing_block_numbers), max(missing_block_numbers) + 1
+        )
+
+        async def fetch_blocks(block_numbers: List[int]) -> List[Block]:
+            return [
+                await create_from_block_number(
+                    w3,
+                    block_number,
+                    trace_db_session,
+                    base_fees_per_gas=base_fees_per_gas,
+                    trace_db_reader=trace_db_reader,
+                )
+                for block_number in block_numbers
+            ]
+
+        fetch_size = 1
+
+    else:
+
+        async def fetch_blocks(block_numbers: List[int]) -> List[Block]:
+            # already looked for these in the trace DB above
+            return await create_from_block_numbers(
+                w3,
+                block_numbers,
+                None,
+                rpc_batch_size=rpc_batch_size,
+            )
+
+        # without prefetching, fetch the whole range in one go
+        fetch_size = (
+            rpc_batch_size if prefetch_depth > 0 else len(missing_block_numbers)
+        )
+
+    missing_block_number_batches = deque(
+        missing_block_numbers[i : i + fetch_size]
+        for i in range(0, len(missing_block_numbers), fetch_size)
+    )
+    pending_fetches: Deque[Tuple[List[int], asyncio.Future]] = deque()
+
+    def start_fetches(max_pending_fetches: int) -> None:
+        while (
+            len(missing_block_number_batches) > 0
+            and len(pending_fetches) < max_pending_fetches
+        ):
+            block_numbers = missing_block_number_batches.popleft()
+            pending_fetches.append(
+                (block_numbers, asyncio.ensure_future(fetch_blocks(block_numbers)))
+            )
+
+    # the batch the next missing block is in, as fetched
+    fetched_block_numbers: Set[int] = set()
+    fetched_blocks: Dict[int, Block] = {}
+
+    try:
+        # start on the missing blocks while analysing the ones already found
+        start_fetches(prefetch_depth)
+
+        # batches are fetched in block order, so the blocks already found
+        # are slotted in between them as their numbers come up
+        for block_number in range(after_block_number, before_block_number):
+            if block_number in existing_blocks:
+                yield existing_blocks[block_number]
+                continue
+
+            if block_number not in fetched_block_numbers:
+                start_fetches(prefetch_depth + 1)
+                block_numbers, pending_fetch = pending_fetches.popleft()
+                fetched_block_numbers = set(block_numbers)
+                blocks = await pending_fetch
+
+                if trace_cache_writer is not None:
+                    trace_cache_writer.add(blocks)
+
+                if block_store is not None:
+                    # compressing and syncing blocks to disk would stall the loop
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, block_store.write_blocks, blocks
+                    )
+
+                fetched_blocks = {block.block_number: block for block in blocks}
+
+            if block_number in fetched_blocks:
+                yield fetched_blocks[block_number]
+    finally:
+        for _, pending_fetch in pending_fetches:
+            pending_fetch.cancel()
@@ -9,10 +9,27 @@ from web3 import Web3
 from web3.eth import AsyncEth
 
 from mev_inspect.block import create_from_block_number
+from mev_inspect.block_store import BlockStore
 from mev_inspect.classifiers.trace import TraceClassifier
-from mev_inspect.inspect_block import inspect_block, inspect_many_blocks
+from mev_inspect.concurrency import AdaptiveConcurrencyLimiter
+from mev_inspect.db import get_trace_sessionmaker
+from mev_inspect.decode_cache import DEFAULT_DECODE_CACHE_SIZE
+from mev_inspect.hedging import RequestHedger
+from mev_inspect.inspect_block import (
+    AnalysisPool,
+    inspect_block,
+    inspect_many_blocks,
+)
 from mev_inspect.methods import get_block_receipts, trace_block
 from mev_inspect.provider import get_base_provider
+from mev_inspect.rpc_pool import RPCPoolProvider
+from mev_inspect.trace_archive import TraceArchive
+from mev_inspect.trace_cache import TraceCacheWriter
+from mev_inspect.trace_db import (
+    DEFAULT_TRACE_DB_POOL_SIZE,
+    TraceDBReader,
+    get_trace_db_reader,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -29,12 +46,82 @@ class MEVInspector:
         rpc: str,
         max_concurrency: int = 1,
         request_timeout: int = 300,
+        rpc_batch_size: Optional[int] = None,
+        adaptive_concurrency: bool = False,
+        max_adaptive_concurrency: int = 50,
+        prefetch_depth: int = 0,
+        hedge_percentile: Optional[int] = None,
+        write_trace_cache: bool = False,
+        use_block_store: bool = False,
+        trace_archive_path: Optional[str] = None,
+        async_trace_db: bool = False,
+        lazy_inputs: bool = False,
+        decode_cache_size: int = DEFAULT_DECODE_CACHE_SIZE,
+        analysis_workers: int = 0,
+        analysis_chunk_size: int = 1,
     ):
+        if adaptive_concurrency:
+            self.concurrency_limiter = AdaptiveConcurrencyLimiter(
+                initial_limit=max_concurrency,
+                max_limit=max(max_concurrency, max_adaptive_concurrency),
+            )
+        else:
+            self.concurrency_limiter = AdaptiveConcurrencyLimiter(
+                initial_limit=max_concurrency,
+                min_limit=max_concurrency,
+                max_limit=max_concurrency,
+            )
+
         base_provider = get_base_provider(rpc, request_timeout=request_timeout)
+        base_provider.middlewares += (self.concurrency_limiter.rpc_middleware,)
+
+        self.request_hedger: Optional[RequestHedger] = None
+        if hedge_percentile is not None:
+            self.request_hedger = RequestHedger(percentile=hedge_percentile)
+            base_provider.middlewares += (self.request_hedger.rpc_middleware,)
+
         self.w3 = Web3(base_provider, modules={"eth": (AsyncEth,)}, middlewares=[])
 
-        self.trace_classifier = TraceClassifier()
-        self.max_concurrency = asyncio.Semaphore(max_concurrency)
+        self.trace_classifier = TraceClassifier(
+            lazy_inputs=lazy_inputs,
+            decode_cache_size=decode_cache_size,
+        )
+
+        self.analysis_pool: Optional[AnalysisPool] = None
+        if analysis_workers > 0:
+            self.analysis_pool = AnalysisPool(
+                analysis_workers,
+                chunk_size=analysis_chunk_size,
+                lazy_inputs=lazy_inputs,
+                decode_cache_size=decode_cache_size,
+            )
+
+        self.rpc_batch_size = rpc_batch_size
+        self.prefetch_depth = prefetch_depth
+
+        self.trace_cache_writer: Optional[TraceCacheWriter] = None
+        if write_trace_cache:
+            trace_db_sessionmaker = get_trace_sessionmaker()
+            if trace_db_sessionmaker is None:
+                raise ValueError("Writing to the trace cache needs a trace DB")
+
+            self.trace_cache_writer = TraceCacheWriter(trace_db_sessionmaker)
+
+        self.block_store: Optional[BlockStore] = None
+        if use_block_store:
+            self.block_store = BlockStore()
+
+        self.trace_archive: Optional[TraceArchive] = None
+        if trace_archive_path is not None:
+            self.trace_archive = TraceArchive(trace_archive_path)
+
+        self.trace_db_reader: Optional[TraceDBReader] = None
+        if async_trace_db:
+            self.trace_db_reader = get_trace_db_reader(
+                pool_size=max(max_concurrency, DEFAULT_TRACE_DB_POOL_SIZE)
+            )
+            if self.trace_db_reader is None:
+                raise ValueError("Reading the trace DB asynchronously needs a trace DB")
 
     async def create_from_block(
         self,
@@ -45,6 +132,7 @@ class MEVInspector:
             w3=self.w3,
             block_number=block_number,
             trace_db_session=trace_db_session,
+            trace_db_reader=self.trace_db_reader,
         )
 
     async def inspect_single_block(
@@ -93,6 +181,41 @@ class MEVInspector:
             logger.error(f"Exited due to {type(e)}")
             traceback.print_exc()
             raise
+        finally:
+            if self.trace_cache_writer is not None:
+                await self.trace_cache_writer.flush()
+
+                if self.trace_cache_writer.failed_blocks > 0:
+                    logger.error(
+                        f"Failed to write {self.trace_cache_writer.failed_blocks} "
+                        "blocks to the trace DB"
+                    )
+
+            if self.trace_db_reader is not None:
+                await self.trace_db_reader.close()
+
+            if self.block_store is not None:
+                self.block_store.close()
+
+            if self.analysis_pool is not None:
+                self.analysis_pool.shutdown()
+
+            self._log_endpoint_stats()
+            logger.info(
+                f"RPC concurrency stats: {self.concurrency_limiter.get_stats()}"
+            )
+            if self.request_hedger is not None:
+                logger.info(f"RPC hedging stats: {self.request_hedger.get_stats()}")
+            if self.trace_classifier.decode_cache is not None:
+                logger.info(
+                    f"Decode cache stats: {self.trace_classifier.decode_cache.get_stats()}"
+                )
+
+    def _log_endpoint_stats(self):
+        base_provider = self.w3.provider
+        if isinstance(base_provider, RPCPoolProvider):
+            for stats in base_provider.get_endpoint_stats():
+                logger.info(f"RPC endpoint stats: {stats}")
 
     async def safe_inspect_many_blocks(
         self,
@@ -101,7 +224,7 @@ class MEVInspector:
         after_block_number: int,
         before_block_number: int,
     ):
-        async with self.max_concurrency:
+        async with self.concurrency_limiter:
             return await inspect_many_blocks(
                 inspect_db_session,
                 self.w3,
@@ -109,4 +232,11 @@ class MEVInspector:
                 after_block_number,
                 before_block_number,
                 trace_db_session=trace_db_session,
+                rpc_batch_size=self.rpc_batch_size,
+                prefetch_depth=self.prefetch_depth,
+                trace_cache_writer=self.trace_cache_writer,
+                block_store=self.block_store,
+                trace_archive=self.trace_archive,
+                trace_db_reader=self.trace_db_reader,
+                analysis_pool=self.analysis_pool,
             )
@@ -1,12 +1,12 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from mev_inspect.classifiers.specs import get_classifier
 from mev_inspect.schemas.classifiers import LiquidationClassifier
 from mev_inspect.schemas.liquidations import Liquidation
 from mev_inspect.schemas.traces import Classification, ClassifiedTrace, DecodedCallTrace
 from mev_inspect.schemas.transfers import Transfer
-from mev_inspect.traces import get_child_traces, is_child_trace_address
-from mev_inspect.transfers import get_child_transfers
+from mev_inspect.traces import TraceTree, is_child_trace_address
+from mev_inspect.transfers import TransferIndex
 
 
 def has_liquidations(classified_traces: List[ClassifiedTrace]) -> bool:
@@ -17,11 +17,17 @@ def has_liquidations(classified_traces: List[ClassifiedTrace]) -> bool:
     return liquidations_exist
 
 
-def get_liquidations(classified_traces: List[ClassifiedTrace]) -> List[Liquidation]:
+def get_liquidations(
+    classified_traces: List[ClassifiedTrace],
+    transfer_index: Optional[TransferIndex] = None,
+) -> List[Liquidation]:
 
     liquidations: List[Liquidation] = []
     parent_liquidations: List[DecodedCallTrace] = []
 
+    # only built for transactions with liquidations, which most don't have
+    trace_trees: Dict[str, TraceTree] = {}
+
     for trace in classified_traces:
 
         if not isinstance(trace, DecodedCallTrace):
@@ -33,12 +39,20 @@ def get_liquidations(classified_traces: List[ClassifiedTrace]) -> List[Liquidati
         if trace.classification == Classification.liquidate:
 
             parent_liquidations.append(trace)
-            child_traces = get_child_traces(
-                trace.transaction_hash, trace.trace_address, classified_traces
-            )
-            child_transfers = get_child_transfers(
-                trace.transaction_hash, trace.trace_address, child_traces
+            if trace.transaction_hash not in trace_trees:
+                trace_trees[trace.transaction_hash] = TraceTree(
+                    classified_trace
+                    for classified_trace in classified_traces
+                    if classified_trace.transaction_hash == trace.transaction_hash
+                )
+
+            child_traces = trace_trees[trace.transaction_hash].get_child_traces(
+                trace.trace_address
             )
+            if transfer_index is None:
+                transfer_index = TransferIndex(classified_traces)
+
+            child_transfers = transfer_index.get_transfers(child_traces)
             liquidation = _parse_liquidation(trace, child_traces, child_transfers)
 
             if liquidation is not None:
@@ -4,6 +4,10 @@ from web3._utils.rpc_abi import RPC
 from web3.method import Method, default_root_munger
 from web3.types import BlockIdentifier, ParityBlockTrace, RPCEndpoint
 
+# what a JSON-RPC batch is called as it goes through provider middlewares,
+# with the batched (method, params) pairs as its params
+BATCH_METHOD = RPCEndpoint("batch")
+
 trace_block: Method[Callable[[BlockIdentifier], List[ParityBlockTrace]]] = Method(
     RPC.trace_block,
     mungers=[default_root_munger],
@@ -1,10 +1,10 @@
-from typing import List
+from typing import List, Optional
 
 from mev_inspect.schemas.miner_payments import MinerPayment
 from mev_inspect.schemas.receipts import Receipt
 from mev_inspect.schemas.traces import ClassifiedTrace
 from mev_inspect.traces import get_traces_by_transaction_hash
-from mev_inspect.transfers import filter_transfers, get_eth_transfers
+from mev_inspect.transfers import TransferIndex, filter_transfers, get_eth_transfers
 
 
 def get_miner_payments(
@@ -12,6 +12,7 @@ def get_miner_payments(
     base_fee_per_gas: int,
     traces: List[ClassifiedTrace],
     receipts: List[Receipt],
+    transfer_index: Optional[TransferIndex] = None,
 ) -> List[MinerPayment]:
     miner_payments = []
 
@@ -27,7 +28,7 @@ def get_miner_payments(
 
         first_trace = sorted(transaciton_traces, key=lambda t: t.trace_address)[0]
 
-        eth_transfers = get_eth_transfers(transaciton_traces)
+        eth_transfers = get_eth_transfers(transaciton_traces, transfer_index)
         miner_eth_transfers = filter_transfers(
             eth_transfers, to_address=miner_address.lower()
         )
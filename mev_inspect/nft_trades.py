@@ -5,38 +5,42 @@ from mev_inspect.schemas.classifiers import NftTradeClassifier
 from mev_inspect.schemas.nft_trades import NftTrade
 from mev_inspect.schemas.traces import Classification, ClassifiedTrace, DecodedCallTrace
 from mev_inspect.schemas.transfers import Transfer
-from mev_inspect.traces import get_traces_by_transaction_hash
-from mev_inspect.transfers import (
-    get_child_transfers,
-    remove_child_transfers_of_transfers,
-)
+from mev_inspect.traces import TraceTree, get_traces_by_transaction_hash
+from mev_inspect.transfers import TransferIndex, remove_child_transfers_of_transfers
 
 
-def get_nft_trades(traces: List[ClassifiedTrace]) -> List[NftTrade]:
+def get_nft_trades(
+    traces: List[ClassifiedTrace],
+    transfer_index: Optional[TransferIndex] = None,
+) -> List[NftTrade]:
+    if transfer_index is None:
+        transfer_index = TransferIndex(traces)
+
     nft_trades = []
 
     for _, transaction_traces in get_traces_by_transaction_hash(traces).items():
-        nft_trades += _get_nft_trades_for_transaction(list(transaction_traces))
+        nft_trades += _get_nft_trades_for_transaction(
+            list(transaction_traces), transfer_index
+        )
 
     return nft_trades
 
 
 def _get_nft_trades_for_transaction(
     traces: List[ClassifiedTrace],
+    transfer_index: TransferIndex,
 ) -> List[NftTrade]:
-    ordered_traces = list(sorted(traces, key=lambda t: t.trace_address))
+    trace_tree = TraceTree(traces)
 
     nft_trades: List[NftTrade] = []
 
-    for trace in ordered_traces:
+    for trace in trace_tree.traces:
         if not isinstance(trace, DecodedCallTrace):
             continue
 
         elif trace.classification == Classification.nft_trade:
-            child_transfers = get_child_transfers(
-                trace.transaction_hash,
-                trace.trace_address,
-                traces,
+            child_transfers = transfer_index.get_transfers(
+                trace_tree.get_child_traces(trace.trace_address)
             )
             nft_trade = _parse_trade(
                 trace,
@@ -1,9 +1,61 @@
-from web3 import AsyncHTTPProvider, Web3
+import os
+from functools import partial
+from typing import Dict, Optional, Union
 
-from mev_inspect.retry import http_retry_with_backoff_request_middleware
+from web3 import AsyncHTTPProvider
 
+from mev_inspect.retry import RetryPolicy, http_retry_with_backoff_request_middleware
+from mev_inspect.rpc_pool import RPCPoolProvider
 
-def get_base_provider(rpc: str, request_timeout: int = 500) -> Web3.AsyncHTTPProvider:
-    base_provider = AsyncHTTPProvider(rpc, request_kwargs={"timeout": request_timeout})
-    base_provider.middlewares += (http_retry_with_backoff_request_middleware,)
+RPC_METHOD_RATE_LIMITS_ENV = "RPC_METHOD_RATE_LIMITS"
+
+
+def get_base_provider(
+    rpc: str,
+    request_timeout: int = 500,
+    method_rate_limits: Optional[Dict[str, float]] = None,
+) -> Union[AsyncHTTPProvider, RPCPoolProvider]:
+    """
+    rpc can be a single URL, or a comma-separated list
+    of URLs to spread requests across
+
+    method_rate_limits caps requests per second by method,
+    defaulting to RPC_METHOD_RATE_LIMITS, like "trace_block=5,eth_getBlockReceipts=20"
+    """
+
+    endpoint_uris = [uri.strip() for uri in rpc.split(",") if uri.strip() != ""]
+
+    base_provider: Union[AsyncHTTPProvider, RPCPoolProvider]
+    if len(endpoint_uris) > 1:
+        base_provider = RPCPoolProvider(endpoint_uris, request_timeout=request_timeout)
+    else:
+        base_provider = AsyncHTTPProvider(
+            rpc, request_kwargs={"timeout": request_timeout}
+        )
+
+    if method_rate_limits is None:
+        method_rate_limits = get_method_rate_limits()
+
+    # one policy per provider, so every request shares its limits and budget.
+    # A pool keeps a circuit breaker per endpoint instead of one for them all
+    retry_policy = RetryPolicy(
+        method_rate_limits=method_rate_limits,
+        has_circuit_breaker=not isinstance(base_provider, RPCPoolProvider),
+    )
+    base_provider.middlewares += (
+        partial(http_retry_with_backoff_request_middleware, retry_policy=retry_policy),
+    )
     return base_provider
+
+
+def get_method_rate_limits() -> Dict[str, float]:
+    method_rate_limits: Dict[str, float] = {}
+
+    for method_rate_limit in os.environ.get(RPC_METHOD_RATE_LIMITS_ENV, "").split(","):
+        if method_rate_limit.strip() == "":
+            continue
+
+        method, rate = method_rate_limit.split("=")
+        method_rate_limits[method.strip()] = float(rate)
+
+    return method_rate_limits
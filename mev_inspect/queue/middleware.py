@@ -54,6 +54,7 @@ class InspectorMiddleware(Middleware):
                 self._rpc_url,
                 max_concurrency=5,
                 request_timeout=300,
+                adaptive_concurrency=True,
             )
 
             setattr(self.STATE, self.INSPECT_STATE_KEY, inspector)
@@ -0,0 +1,116 @@
+"""
+Fetches trace_block and eth_getBlockReceipts without going through
+web3's request manager and formatters, and builds traces and receipts
+straight from the response body without re-validating them
+"""
+
+import json
+from typing import Any, List
+
+from web3 import Web3
+from web3._utils.request import async_make_post_request
+from web3.middleware import async_combine_middlewares
+from web3.types import RPCEndpoint, RPCResponse
+
+from mev_inspect.rpc_pool import RPCPoolProvider
+from mev_inspect.schemas.receipts import Receipt
+from mev_inspect.schemas.traces import Trace, TraceType
+from mev_inspect.utils import hex_to_int, loads
+
+
+async def fetch_raw_block_traces(w3: Web3, block_number: int) -> List[Trace]:
+    traces_json = await make_raw_request(
+        w3, RPCEndpoint("trace_block"), [hex(block_number)]
+    )
+    return parse_traces(traces_json)
+
+
+async def fetch_raw_block_receipts(w3: Web3, block_number: int) -> List[Receipt]:
+    receipts_json = await make_raw_request(
+        w3, RPCEndpoint("eth_getBlockReceipts"), [hex(block_number)]
+    )
+    return parse_receipts(receipts_json)
+
+
+async def make_raw_request(w3: Web3, method: RPCEndpoint, params: Any) -> Any:
+    # keep the provider's own middlewares, like retries
+    make_request = await async_combine_middlewares(
+        middlewares=w3.provider.middlewares,
+        web3=w3,
+        provider_request_fn=lambda method, params: _make_raw_request(
+            w3.provider, method, params
+        ),
+    )
+
+    response = await make_request(method, params)
+
+    if "error" in response:
+        raise ValueError(response["error"])
+
+    return response["result"]
+
+
+async def post_request(base_provider, data: bytes) -> Any:
+    """
+    Posts a raw JSON-RPC body, and returns the parsed response
+    """
+
+    if isinstance(base_provider, RPCPoolProvider):
+        return await base_provider.post_request(data)
+
+    return loads(
+        await async_make_post_request(
+            base_provider.endpoint_uri,
+            data,
+            **base_provider.get_request_kwargs(),
+        )
+    )
+
+
+async def _make_raw_request(
+    base_provider, method: RPCEndpoint, params: Any
+) -> RPCResponse:
+    data = json.dumps(
+        {"jsonrpc": "2.0", "method": method, "params": params, "id": 1}
+    ).encode("utf-8")
+
+    return await post_request(base_provider, data)
+
+
+def parse_traces(traces_json: List[dict]) -> List[Trace]:
+    return [
+        Trace.construct(
+            action=trace_json["action"],
+            block_hash=trace_json["blockHash"],
+            block_number=trace_json["blockNumber"],
+            result=trace_json.get("result"),
+            subtraces=trace_json["subtraces"],
+            trace_address=trace_json["traceAddress"],
+            transaction_hash=trace_json.get("transactionHash"),
+            transaction_position=trace_json.get("transactionPosition"),
+            type=TraceType(trace_json["type"]),
+            error=trace_json.get("error"),
+        )
+        for trace_json in traces_json
+    ]
+
+
+def parse_receipts(receipts_json: List[dict]) -> List[Receipt]:
+    return [
+        Receipt.construct(
+            block_number=_maybe_hex_to_int(receipt_json["blockNumber"]),
+            transaction_hash=receipt_json["transactionHash"],
+            transaction_index=_maybe_hex_to_int(receipt_json["transactionIndex"]),
+            gas_used=_maybe_hex_to_int(receipt_json["gasUsed"]),
+            effective_gas_price=_maybe_hex_to_int(receipt_json["effectiveGasPrice"]),
+            cumulative_gas_used=_maybe_hex_to_int(receipt_json["cumulativeGasUsed"]),
+            to=receipt_json.get("to"),
+        )
+        for receipt_json in receipts_json
+    ]
+
+
+def _maybe_hex_to_int(value: Any) -> int:
+    if isinstance(value, str):
+        return hex_to_int(value)
+    return value
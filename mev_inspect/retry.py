@@ -1,8 +1,21 @@
 import asyncio
 import logging
 import random
+import time
 from asyncio.exceptions import TimeoutError
-from typing import Any, Callable, Collection, Coroutine, Type
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Coroutine,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Type,
+)
 
 from aiohttp.client_exceptions import (
     ClientConnectorError,
@@ -16,6 +29,8 @@ from web3 import Web3
 from web3.middleware.exception_retry_request import whitelist
 from web3.types import RPCEndpoint, RPCResponse
 
+from mev_inspect.methods import BATCH_METHOD
+
 request_exceptions = (ConnectionError, HTTPError, Timeout, TooManyRedirects)
 aiohttp_exceptions = (
     ClientOSError,
@@ -25,11 +40,230 @@ aiohttp_exceptions = (
     ServerTimeoutError,
 )
 
-whitelist_additions = ["eth_getBlockReceipts", "trace_block", "eth_feeHistory"]
+# batches are only ever made of the read-only calls above
+whitelist_additions = [
+    "eth_getBlockReceipts",
+    "trace_block",
+    "eth_feeHistory",
+    BATCH_METHOD,
+]
+
+# retries allowed per request made, shared by all requests to a provider
+RETRY_BUDGET_RATIO = 0.2
+MIN_RETRY_BUDGET = 10.0
+MAX_RETRY_BUDGET = 100.0
+
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 10
+CIRCUIT_BREAKER_RESET_SECONDS = 30.0
+
+MAX_RETRY_AFTER_SECONDS = 60.0
 
 logger = logging.getLogger(__name__)
 
 
+class CircuitOpenError(Exception):
+    pass
+
+
+class TokenBucket:
+    """Allows `rate` requests per second, with bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self._rate = rate
+        self._capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self._capacity,
+                self._tokens + (now - self._updated_at) * self._rate,
+            )
+            self._updated_at = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+class RetryBudget:
+    """Caps retries to a fraction of requests, so retries can't snowball"""
+
+    def __init__(
+        self,
+        ratio: float = RETRY_BUDGET_RATIO,
+        initial_budget: float = MIN_RETRY_BUDGET,
+        max_budget: float = MAX_RETRY_BUDGET,
+    ):
+        self._ratio = ratio
+        self._max_budget = max_budget
+        self._budget = initial_budget
+
+    def record_request(self) -> None:
+        self._budget = min(self._budget + self._ratio, self._max_budget)
+
+    def try_spend(self) -> bool:
+        if self._budget < 1:
+            return False
+
+        self._budget -= 1
+        return True
+
+
+class CircuitBreaker:
+    """
+    Opens after too many consecutive failures, failing requests fast
+    until a single trial request succeeds after the reset timeout
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        reset_seconds: float = CIRCUIT_BREAKER_RESET_SECONDS,
+    ):
+        self._failure_threshold = failure_threshold
+        self._reset_seconds = reset_seconds
+
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._is_trial_in_flight = False
+
+    def is_open(self) -> bool:
+        """Whether a request made now would be failed fast"""
+
+        if self._opened_at is None:
+            return False
+
+        is_resetting = time.monotonic() - self._opened_at >= self._reset_seconds
+        return not is_resetting or self._is_trial_in_flight
+
+    def before_request(self) -> bool:
+        """
+        Raises CircuitOpenError if the circuit is open,
+        otherwise returns whether the request is the trial
+        """
+
+        if self.is_open():
+            raise CircuitOpenError(
+                f"Circuit open after {self._consecutive_failures} consecutive failures"
+            )
+
+        if self._opened_at is None:
+            return False
+
+        self._is_trial_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("Closing circuit")
+
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._is_trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+
+        if self._is_trial_in_flight or (
+            self._opened_at is None
+            and self._consecutive_failures >= self._failure_threshold
+        ):
+            logger.error(
+                f"Opening circuit after {self._consecutive_failures} consecutive failures"
+            )
+            self._opened_at = time.monotonic()
+            self._is_trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """
+        For a trial that ended without saying anything about the provider,
+        like one that was cancelled, so another request can be the trial
+        """
+
+        self._is_trial_in_flight = False
+
+
+class RetryPolicy:
+    """
+    State shared by every request to one provider:
+    per-method rate limits, Retry-After pauses,
+    the retry budget and the circuit breaker
+    """
+
+    def __init__(
+        self,
+        method_rate_limits: Optional[Dict[str, float]] = None,
+        has_circuit_breaker: bool = True,
+    ):
+        """
+        has_circuit_breaker can be turned off for providers that
+        keep their own, like RPCPoolProvider does for each endpoint
+        """
+
+        self._buckets_by_method = {
+            method: TokenBucket(rate)
+            for method, rate in (method_rate_limits or {}).items()
+        }
+        self._paused_until = 0.0
+
+        self.retry_budget = RetryBudget()
+        self.circuit_breaker: Optional[CircuitBreaker] = (
+            CircuitBreaker() if has_circuit_breaker else None
+        )
+
+    async def before_request(self, method: RPCEndpoint, params: Any) -> bool:
+        """Returns whether the request is the circuit breaker's trial"""
+
+        if self.circuit_breaker is not None and self.circuit_breaker.is_open():
+            # fail fast, without waiting on pauses or rate limits
+            self.circuit_breaker.before_request()
+
+        pause_seconds = self._paused_until - time.monotonic()
+        if pause_seconds > 0:
+            await asyncio.sleep(pause_seconds)
+
+        # a batch counts against the rate limit of every request in it
+        for request_method in _get_request_methods(method, params):
+            bucket = self._buckets_by_method.get(request_method)
+            if bucket is not None:
+                await bucket.acquire()
+
+        self.retry_budget.record_request()
+
+        # taken last, so the trial can't be cancelled before it's sent
+        if self.circuit_breaker is not None:
+            return self.circuit_breaker.before_request()
+
+        return False
+
+    def record_success(self) -> None:
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_success()
+
+    def record_failure(self) -> None:
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_failure()
+
+    def release_trial(self) -> None:
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.release_trial()
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def _get_request_methods(method: RPCEndpoint, params: Any) -> List[RPCEndpoint]:
+    if method == BATCH_METHOD:
+        return [request_method for request_method, _ in params]
+
+    return [method]
+
+
 def check_if_retry_on_failure(method: RPCEndpoint) -> bool:
     root = method.split("_")[0]
     if root in (whitelist + whitelist_additions):
@@ -40,46 +274,105 @@ def check_if_retry_on_failure(method: RPCEndpoint) -> bool:
         return False
 
 
+def get_retry_after_seconds(error: BaseException) -> Optional[float]:
+    headers: Optional[Mapping[str, str]] = None
+    if isinstance(error, ClientResponseError):
+        headers = error.headers
+    elif isinstance(error, HTTPError) and error.response is not None:
+        headers = error.response.headers
+
+    if headers is None or "Retry-After" not in headers:
+        return None
+
+    retry_after = headers["Retry-After"]
+
+    try:
+        seconds = float(retry_after)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER_SECONDS)
+
+
 async def exception_retry_with_backoff_middleware(
     make_request: Callable[[RPCEndpoint, Any], Any],
     web3: Web3,  # pylint: disable=unused-argument
     errors: Collection[Type[BaseException]],
     retries: int = 5,
     backoff_time_seconds: float = 0.1,
+    retry_policy: Optional[RetryPolicy] = None,
 ) -> Callable[[RPCEndpoint, Any], Coroutine[Any, Any, RPCResponse]]:
     """
     Creates middleware that retries failed HTTP requests. Is a default
     middleware for HTTPProvider.
     """
 
+    policy = retry_policy if retry_policy is not None else RetryPolicy()
+
+    async def make_request_with_policy(method: RPCEndpoint, params: Any) -> RPCResponse:
+        is_trial = await policy.before_request(method, params)
+
+        try:
+            response = await make_request(method, params)
+        # https://github.com/python/mypy/issues/5349
+        except errors as e:  # type: ignore
+            policy.record_failure()
+
+            retry_after_seconds = get_retry_after_seconds(e)
+            if retry_after_seconds is not None:
+                logger.info(f"Pausing requests for {retry_after_seconds}s")
+                policy.pause(retry_after_seconds)
+
+            raise
+        except BaseException:
+            # cancelled, or failed in a way that isn't the provider's,
+            # so this can't decide the trial either way
+            if is_trial:
+                policy.release_trial()
+
+            raise
+
+        policy.record_success()
+        return response
+
     async def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
 
         if check_if_retry_on_failure(method):
             for i in range(retries):
                 try:
-                    return await make_request(method, params)
+                    return await make_request_with_policy(method, params)
                 # https://github.com/python/mypy/issues/5349
-                except errors:  # type: ignore
+                except errors as e:  # type: ignore
                     logger.error(
                         f"Request for method {method}, params: {params}, retrying: {i}/{retries}"
                     )
-                    if i < (retries - 1):
-                        backoff_time = backoff_time_seconds * (
-                            random.uniform(5, 10) ** i
-                        )
-                        await asyncio.sleep(backoff_time)
+                    if i < (retries - 1) and policy.retry_budget.try_spend():
+                        # a Retry-After pause is waited out before the retry
+                        # is sent, so it isn't backed off on top of
+                        if get_retry_after_seconds(e) is None:
+                            backoff_time = backoff_time_seconds * (
+                                random.uniform(5, 10) ** i
+                            )
+                            await asyncio.sleep(backoff_time)
                         continue
                     else:
                         raise
             return None
         else:
-            return await make_request(method, params)
+            return await make_request_with_policy(method, params)
 
     return middleware
 
 
 async def http_retry_with_backoff_request_middleware(
-    make_request: Callable[[RPCEndpoint, Any], Any], web3: Web3
+    make_request: Callable[[RPCEndpoint, Any], Any],
+    web3: Web3,
+    retry_policy: Optional[RetryPolicy] = None,
 ) -> Callable[[RPCEndpoint, Any], Coroutine[Any, Any, RPCResponse]]:
     return await exception_retry_with_backoff_middleware(
         make_request,
@@ -89,4 +382,5 @@ async def http_retry_with_backoff_request_middleware(
             + aiohttp_exceptions
             + (TimeoutError, ConnectionRefusedError)
         ),
+        retry_policy=retry_policy,
     )
@@ -0,0 +1,272 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, List, TypeVar
+
+from aiohttp.client_exceptions import ClientResponseError
+from eth_typing import URI
+from pydantic import BaseModel
+from requests.exceptions import HTTPError
+from web3 import AsyncHTTPProvider
+from web3._utils.request import async_make_post_request
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from mev_inspect.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    aiohttp_exceptions,
+    request_exceptions,
+)
+from mev_inspect.utils import loads
+
+logger = logging.getLogger(__name__)
+
+# weight of the newest sample in the rolling latency and error rate
+SMOOTHING_FACTOR = 0.2
+
+# how much a 100% error rate inflates an endpoint's score
+ERROR_RATE_PENALTY = 10
+
+# floor so endpoints without samples still share load by requests in flight
+MIN_LATENCY_SECONDS = 0.001
+
+MAX_CONSECUTIVE_ERRORS = 3
+EJECTION_SECONDS = 30.0
+MAX_EJECTION_SECONDS = 300.0
+
+# errors that say the endpoint itself is down or overloaded
+ENDPOINT_FAILURE_EXCEPTIONS = (
+    request_exceptions
+    + aiohttp_exceptions
+    + (asyncio.TimeoutError, ConnectionRefusedError)
+)
+TOO_MANY_REQUESTS_STATUS = 429
+
+# JSON-RPC error codes for a node that can't serve requests right now
+# (EIP-1474 resource unavailable and limit exceeded). Anything else,
+# like a revert or an unknown block, is the request's fault
+NODE_UNAVAILABLE_ERROR_CODES = {-32002, -32005}
+
+_T = TypeVar("_T")
+
+
+class EndpointStats(BaseModel):
+    endpoint_uri: str
+    requests: int
+    errors: int
+    in_flight: int
+    latency_seconds: float
+    error_rate: float
+    score: float
+    is_ejected: bool
+    is_circuit_open: bool
+
+
+class _Endpoint:
+    def __init__(self, endpoint_uri: str, request_timeout: int):
+        self.endpoint_uri = endpoint_uri
+        self.provider = AsyncHTTPProvider(
+            endpoint_uri, request_kwargs={"timeout": request_timeout}
+        )
+
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.latency_seconds = 0.0
+        self.error_rate = 0.0
+
+        self.consecutive_errors = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+
+        self.circuit_breaker = CircuitBreaker()
+
+    def get_score(self) -> float:
+        return (
+            max(self.latency_seconds, MIN_LATENCY_SECONDS)
+            * (1 + ERROR_RATE_PENALTY * self.error_rate)
+            * (1 + self.in_flight)
+        )
+
+    def is_ejected(self, now: float) -> bool:
+        return now < self.ejected_until
+
+    def record_success(self, latency_seconds: float) -> None:
+        if self.requests == 0:
+            self.latency_seconds = latency_seconds
+        else:
+            self.latency_seconds += SMOOTHING_FACTOR * (
+                latency_seconds - self.latency_seconds
+            )
+
+        self.requests += 1
+        self.error_rate -= SMOOTHING_FACTOR * self.error_rate
+        self.consecutive_errors = 0
+        self.ejections = 0
+
+    def record_error(self) -> None:
+        self.requests += 1
+        self.errors += 1
+        self.error_rate += SMOOTHING_FACTOR * (1 - self.error_rate)
+        self.consecutive_errors += 1
+
+        if self.consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+            ejection_seconds = min(
+                EJECTION_SECONDS * (2**self.ejections),
+                MAX_EJECTION_SECONDS,
+            )
+            logger.warning(
+                f"Ejecting {self.endpoint_uri} for {ejection_seconds}s "
+                f"after {self.consecutive_errors} consecutive errors"
+            )
+
+            self.ejected_until = time.monotonic() + ejection_seconds
+            self.ejections += 1
+            self.consecutive_errors = 0
+
+    def get_stats(self) -> EndpointStats:
+        return EndpointStats(
+            endpoint_uri=self.endpoint_uri,
+            requests=self.requests,
+            errors=self.errors,
+            in_flight=self.in_flight,
+            latency_seconds=self.latency_seconds,
+            error_rate=self.error_rate,
+            score=self.get_score(),
+            is_ejected=self.is_ejected(time.monotonic()),
+            is_circuit_open=self.circuit_breaker.is_open(),
+        )
+
+
+class RPCPoolProvider(AsyncJSONBaseProvider):
+    """
+    Routes each request to the healthiest of several RPC endpoints,
+    scored by rolling latency, error rate and requests in flight.
+
+    Endpoints that fail repeatedly are ejected for a while,
+    and each has its own circuit breaker, so one bad endpoint
+    doesn't fail requests the others could serve
+    """
+
+    def __init__(self, endpoint_uris: List[str], request_timeout: int = 500):
+        if len(endpoint_uris) == 0:
+            raise ValueError("At least one RPC endpoint is required")
+
+        self._endpoints = [
+            _Endpoint(endpoint_uri, request_timeout) for endpoint_uri in endpoint_uris
+        ]
+
+        super().__init__()
+
+    def __str__(self) -> str:
+        endpoint_uris = ", ".join(endpoint.endpoint_uri for endpoint in self._endpoints)
+        return f"RPC pool {endpoint_uris}"
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        return await self._route(
+            lambda endpoint: endpoint.provider.make_request(method, params)
+        )
+
+    async def post_request(self, data: bytes) -> Any:
+        """
+        Posts a raw JSON-RPC body, and returns the parsed response
+        """
+
+        return await self._route(lambda endpoint: _post_request(endpoint, data))
+
+    def get_endpoint_stats(self) -> List[EndpointStats]:
+        return [endpoint.get_stats() for endpoint in self._endpoints]
+
+    async def _route(
+        self,
+        make_request: Callable[[_Endpoint], Awaitable[_T]],
+    ) -> _T:
+        endpoint = self._select_endpoint()
+        is_trial = endpoint.circuit_breaker.before_request()
+        endpoint.in_flight += 1
+        start = time.monotonic()
+
+        try:
+            result = await make_request(endpoint)
+        except Exception as e:
+            if _is_endpoint_failure(e):
+                endpoint.record_error()
+                endpoint.circuit_breaker.record_failure()
+            else:
+                # the endpoint answered, it just refused the request
+                endpoint.circuit_breaker.record_success()
+                endpoint.record_success(time.monotonic() - start)
+            raise
+        except BaseException:
+            # cancelled, like the slower of two hedged requests
+            if is_trial:
+                endpoint.circuit_breaker.release_trial()
+            raise
+        finally:
+            endpoint.in_flight -= 1
+
+        # even an unavailable node is up enough to answer
+        endpoint.circuit_breaker.record_success()
+
+        if _is_node_unavailable_response(result):
+            endpoint.record_error()
+        else:
+            endpoint.record_success(time.monotonic() - start)
+
+        return result
+
+    def _select_endpoint(self) -> _Endpoint:
+        closed_endpoints = [
+            endpoint
+            for endpoint in self._endpoints
+            if not endpoint.circuit_breaker.is_open()
+        ]
+
+        if len(closed_endpoints) == 0:
+            raise CircuitOpenError(f"Circuit open for every endpoint in {self}")
+
+        now = time.monotonic()
+        available_endpoints = [
+            endpoint for endpoint in closed_endpoints if not endpoint.is_ejected(now)
+        ]
+
+        # if everything is ejected, try whichever comes back first
+        if len(available_endpoints) == 0:
+            return min(closed_endpoints, key=lambda endpoint: endpoint.ejected_until)
+
+        return min(available_endpoints, key=lambda endpoint: endpoint.get_score())
+
+
+async def _post_request(endpoint: _Endpoint, data: bytes) -> Any:
+    return loads(
+        await async_make_post_request(
+            URI(endpoint.endpoint_uri),
+            data,
+            **endpoint.provider.get_request_kwargs(),
+        )
+    )
+
+
+def _is_endpoint_failure(error: Exception) -> bool:
+    status = None
+    if isinstance(error, ClientResponseError):
+        status = error.status
+    elif isinstance(error, HTTPError) and error.response is not None:
+        status = error.response.status_code
+
+    if status is not None:
+        return status == TOO_MANY_REQUESTS_STATUS or status >= 500
+
+    return isinstance(error, ENDPOINT_FAILURE_EXCEPTIONS)
+
+
+def _is_node_unavailable_response(response: Any) -> bool:
+    # any request in a batch being turned away means the node is struggling
+    if isinstance(response, list):
+        return any(_is_node_unavailable_response(item) for item in response)
+
+    if not isinstance(response, dict) or not isinstance(response.get("error"), dict):
+        return False
+
+    return response["error"].get("code") in NODE_UNAVAILABLE_ERROR_CODES
@@ -1,9 +1,94 @@
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional, Union
 
 from pydantic import BaseModel
 
 
+class LazyInputs(dict):
+    """
+    Call inputs that are only ABI decoded the first time they're read
+
+    Behaves as a plain dict once decoded. Anything that reads the inputs,
+    including serializing the trace they belong to, decodes them.
+    Inputs that turn out not to decode are left empty
+
+    Pickling keeps them undecoded, so decode has to be picklable
+    """
+
+    def __init__(self, decode: Callable[[], Optional[Dict[str, Any]]]):
+        super().__init__()
+        self._decode: Optional[Callable[[], Optional[Dict[str, Any]]]] = decode
+
+    @property
+    def is_decoded(self) -> bool:
+        return self._decode is None
+
+    def _ensure_decoded(self) -> None:
+        if self._decode is not None:
+            decode = self._decode
+            self._decode = None
+            super().update(decode() or {})
+
+    def __getitem__(self, key):
+        self._ensure_decoded()
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        self._ensure_decoded()
+        return super().__contains__(key)
+
+    def __iter__(self):
+        self._ensure_decoded()
+        return super().__iter__()
+
+    def __len__(self):
+        self._ensure_decoded()
+        return super().__len__()
+
+    def __eq__(self, other):
+        self._ensure_decoded()
+        return super().__eq__(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        self._ensure_decoded()
+        return super().__repr__()
+
+    def __reduce__(self):
+        if self._decode is not None:
+            return (LazyInputs, (self._decode,))
+
+        return (dict, (self.copy(),))
+
+    def get(self, key, default=None):
+        self._ensure_decoded()
+        return super().get(key, default)
+
+    def keys(self):
+        self._ensure_decoded()
+        return super().keys()
+
+    def values(self):
+        self._ensure_decoded()
+        return super().values()
+
+    def items(self):
+        self._ensure_decoded()
+        return super().items()
+
+    def copy(self):
+        self._ensure_decoded()
+        return dict(super().items())
+
+    __hash__ = None  # type: ignore
+
+
 class CallData(BaseModel):
     function_name: str
     function_signature: str
-    inputs: Dict[str, Any]
+    # LazyInputs is checked first, as validating it as a dict would decode it
+    inputs: Union[LazyInputs, Dict[str, Any]]
+
+    class Config:
+        arbitrary_types_allowed = True
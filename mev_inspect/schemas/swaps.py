@@ -1,11 +1,11 @@
 from typing import List, Optional
 
-from pydantic import BaseModel
-
 from mev_inspect.schemas.traces import Protocol
 
+from .utils import FlatModel
+
 
-class Swap(BaseModel):
+class Swap(FlatModel):
     abi_name: str
     transaction_hash: str
     transaction_position: int
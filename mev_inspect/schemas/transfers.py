@@ -1,9 +1,9 @@
 from typing import List
 
-from pydantic import BaseModel
+from .utils import FlatModel
 
 
-class Transfer(BaseModel):
+class Transfer(FlatModel):
     block_number: int
     transaction_hash: str
     trace_address: List[int]
@@ -1,4 +1,5 @@
 import json
+from typing import Any
 
 from hexbytes import HexBytes
 from pydantic import BaseModel
@@ -31,3 +32,18 @@ class CamelModel(BaseModel):
     class Config(Web3Model.Config):
         alias_generator = to_camel
         allow_population_by_field_name = True
+
+
+class FlatModel(BaseModel):
+    """
+    BaseModel whose fields are all plain values rather than other models
+
+    Detectors compare these a lot, so models of the same type are
+    compared field by field rather than by dumping each to a dict first
+    """
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is type(self):
+            return self.__dict__ == other.__dict__
+
+        return super().__eq__(other)
@@ -5,43 +5,46 @@ from mev_inspect.schemas.classifiers import SwapClassifier
 from mev_inspect.schemas.swaps import Swap
 from mev_inspect.schemas.traces import Classification, ClassifiedTrace, DecodedCallTrace
 from mev_inspect.schemas.transfers import Transfer
-from mev_inspect.traces import get_traces_by_transaction_hash
-from mev_inspect.transfers import (
-    get_child_transfers,
-    get_transfer,
-    remove_child_transfers_of_transfers,
-)
+from mev_inspect.traces import TraceTree, get_traces_by_transaction_hash
+from mev_inspect.transfers import TransferIndex, remove_child_transfers_of_transfers
 
 
-def get_swaps(traces: List[ClassifiedTrace]) -> List[Swap]:
+def get_swaps(
+    traces: List[ClassifiedTrace],
+    transfer_index: Optional[TransferIndex] = None,
+) -> List[Swap]:
+    if transfer_index is None:
+        transfer_index = TransferIndex(traces)
+
     swaps = []
 
     for _, transaction_traces in get_traces_by_transaction_hash(traces).items():
-        swaps += _get_swaps_for_transaction(list(transaction_traces))
+        swaps += _get_swaps_for_transaction(list(transaction_traces), transfer_index)
 
     return swaps
 
 
-def _get_swaps_for_transaction(traces: List[ClassifiedTrace]) -> List[Swap]:
-    ordered_traces = list(sorted(traces, key=lambda t: t.trace_address))
+def _get_swaps_for_transaction(
+    traces: List[ClassifiedTrace],
+    transfer_index: TransferIndex,
+) -> List[Swap]:
+    trace_tree = TraceTree(traces)
 
     swaps: List[Swap] = []
     prior_transfers: List[Transfer] = []
 
-    for trace in ordered_traces:
+    for trace in trace_tree.traces:
         if not isinstance(trace, DecodedCallTrace):
             continue
 
         elif trace.classification == Classification.transfer:
-            transfer = get_transfer(trace)
+            transfer = transfer_index.get_transfer(trace)
             if transfer is not None:
                 prior_transfers.append(transfer)
 
         elif trace.classification == Classification.swap:
-            child_transfers = get_child_transfers(
-                trace.transaction_hash,
-                trace.trace_address,
-                traces,
+            child_transfers = transfer_index.get_transfers(
+                trace_tree.get_child_traces(trace.trace_address)
             )
 
             swap = _parse_swap(
@@ -0,0 +1,628 @@
+"""
+Columnar archive of blocks, for replaying historical ranges
+without any JSON parsing
+
+A segment file holds a range of blocks as fixed-width columns:
+addresses, selectors, values, gas and trace_address offsets are all
+packed binary, and variable-length data (calldata, output, errors)
+lives in one shared byte heap. Segments are opened with mmap, so
+opening one copies nothing, and traces are only materialised when
+a block is read
+
+Call traces, which are nearly all of them, are stored fully in
+columns. Any trace that wouldn't round-trip exactly through the
+columns (creates, suicides, rewards) keeps its action and result
+as JSON in the heap instead
+
+Numeric columns are always little-endian, whatever the host
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from mev_inspect.schemas.blocks import Block
+from mev_inspect.schemas.receipts import Receipt
+from mev_inspect.schemas.traces import Trace, TraceType
+from mev_inspect.utils import write_atomically
+
+MAGIC = b"MEVARC01"
+HEADER_LENGTH_FORMAT = "<Q"
+COLUMN_BYTE_ORDER = "little"
+
+TRACE_TYPES = list(TraceType)
+CALL_TYPES = ["call", "staticcall", "delegatecall", "callcode"]
+
+CALL_ACTION_KEYS = {"callType", "from", "gas", "input", "to", "value"}
+CALL_RESULT_KEYS = {"gasUsed", "output"}
+
+# trace flags
+HAS_TRANSACTION_HASH = 1
+HAS_TRANSACTION_POSITION = 2
+HAS_RESULT = 4
+HAS_ERROR = 8
+IS_COLUMNAR_CALL = 16
+
+# receipt flags
+HAS_TO = 1
+
+# miner_length of a block with no miner
+NO_MINER = 2**64 - 1
+
+BLOCK_COLUMNS = {
+    "block_number": "Q",
+    "block_timestamp": "Q",
+    "base_fee_per_gas": "32s",
+    "miner_start": "Q",
+    "miner_length": "Q",
+    "trace_start": "Q",
+    "trace_count": "Q",
+    "receipt_start": "Q",
+    "receipt_count": "Q",
+}
+
+TRACE_COLUMNS = {
+    "type": "B",
+    "flags": "B",
+    "call_type": "B",
+    "block_hash": "32s",
+    "block_number": "Q",
+    "subtraces": "I",
+    "transaction_hash": "32s",
+    "transaction_position": "I",
+    "trace_address_start": "Q",
+    "trace_address_length": "I",
+    "from": "20s",
+    "to": "20s",
+    "value": "32s",
+    "gas": "Q",
+    "selector": "4s",
+    "input_start": "Q",
+    "input_length": "Q",
+    "gas_used": "Q",
+    "output_start": "Q",
+    "output_length": "Q",
+    "error_start": "Q",
+    "error_length": "Q",
+    "json_start": "Q",
+    "json_length": "Q",
+}
+
+RECEIPT_COLUMNS = {
+    "flags": "B",
+    "block_number": "Q",
+    "transaction_hash": "32s",
+    "transaction_index": "I",
+    "gas_used": "Q",
+    "effective_gas_price": "32s",
+    "cumulative_gas_used": "Q",
+    "to": "20s",
+}
+
+
+class _ColumnWriter:
+    def __init__(self, columns: Dict[str, str]):
+        self._columns = columns
+        self._values: Dict[str, List[Any]] = {name: [] for name in columns}
+
+    def append(self, **values: Any) -> None:
+        for name in self._columns:
+            self._values[name].append(values.get(name, 0))
+
+    def __len__(self) -> int:
+        return len(next(iter(self._values.values())))
+
+    def get_column_bytes(self) -> Iterator[Tuple[str, str, bytes]]:
+        for name, column_format in self._columns.items():
+            values = self._values[name]
+
+            if column_format.endswith("s"):
+                width = int(column_format[:-1])
+                column_bytes = b"".join(
+                    (value or b"").rjust(width, b"\x00") for value in values
+                )
+            else:
+                column_bytes = _array_to_bytes(array(column_format, values))
+
+            yield name, column_format, column_bytes
+
+
+class _Heap:
+    def __init__(self):
+        self._data = bytearray()
+
+    def append(self, data: bytes) -> Tuple[int, int]:
+        start = len(self._data)
+        self._data += data
+        return start, len(data)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._data)
+
+
+def write_trace_archive(path: str, blocks: List[Block]) -> None:
+    """Writes blocks to a new segment file, replacing it atomically"""
+
+    block_columns = _ColumnWriter(BLOCK_COLUMNS)
+    trace_columns = _ColumnWriter(TRACE_COLUMNS)
+    receipt_columns = _ColumnWriter(RECEIPT_COLUMNS)
+    heap = _Heap()
+    trace_addresses: List[int] = []
+
+    for block in sorted(blocks, key=lambda block: block.block_number):
+        miner_start, miner_length = (
+            heap.append(block.miner.encode("utf-8"))
+            if block.miner is not None
+            else (0, NO_MINER)
+        )
+
+        block_columns.append(
+            block_number=block.block_number,
+            block_timestamp=block.block_timestamp,
+            base_fee_per_gas=_uint256_to_bytes(block.base_fee_per_gas),
+            miner_start=miner_start,
+            miner_length=miner_length,
+            trace_start=len(trace_columns),
+            trace_count=len(block.traces),
+            receipt_start=len(receipt_columns),
+            receipt_count=len(block.receipts),
+        )
+
+        for trace in block.traces:
+            trace_values = _get_trace_values(trace, heap)
+            trace_values["trace_address_start"] = len(trace_addresses)
+            trace_values["trace_address_length"] = len(trace.trace_address)
+            trace_addresses.extend(trace.trace_address)
+
+            trace_columns.append(**trace_values)
+
+        for receipt in block.receipts:
+            receipt_columns.append(
+                flags=HAS_TO if receipt.to is not None else 0,
+                block_number=receipt.block_number,
+                transaction_hash=_hex_to_bytes(receipt.transaction_hash, 32),
+                transaction_index=receipt.transaction_index,
+                gas_used=receipt.gas_used,
+                effective_gas_price=_uint256_to_bytes(receipt.effective_gas_price),
+                cumulative_gas_used=receipt.cumulative_gas_used,
+                to=_hex_to_bytes(receipt.to, 20) if receipt.to is not None else None,
+            )
+
+    sections = [
+        ("blocks", block_columns),
+        ("traces", trace_columns),
+        ("receipts", receipt_columns),
+    ]
+
+    header: Dict[str, Any] = {"columns": {}, "counts": {}}
+    column_data: List[bytes] = []
+    offset = 0
+
+    def add_column(name: str, column_format: str, column_bytes: bytes) -> None:
+        nonlocal offset
+        padding = -len(column_bytes) % 8
+
+        header["columns"][name] = [offset, len(column_bytes), column_format]
+        column_data.append(column_bytes + b"\x00" * padding)
+        offset += len(column_bytes) + padding
+
+    for section_name, columns in sections:
+        header["counts"][section_name] = len(columns)
+
+        for name, column_format, column_bytes in columns.get_column_bytes():
+            add_column(f"{section_name}.{name}", column_format, column_bytes)
+
+    add_column("trace_addresses", "I", _array_to_bytes(array("I", trace_addresses)))
+    add_column("heap", "B", heap.to_bytes())
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * (-(len(MAGIC) + 8 + len(header_bytes)) % 8)
+
+    write_atomically(
+        os.path.abspath(path),
+        b"".join(
+            [
+                MAGIC,
+                struct.pack(HEADER_LENGTH_FORMAT, len(header_bytes)),
+                header_bytes,
+                *column_data,
+            ]
+        ),
+    )
+
+
+class TraceArchive:
+    """Reads blocks from a segment written by write_trace_archive"""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._memory = memoryview(self._mmap)
+
+        if self._memory[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a trace archive")
+
+        header_start = len(MAGIC) + struct.calcsize(HEADER_LENGTH_FORMAT)
+        (header_length,) = struct.unpack_from(
+            HEADER_LENGTH_FORMAT, self._memory, len(MAGIC)
+        )
+        header = json.loads(
+            bytes(self._memory[header_start : header_start + header_length])
+        )
+        data_start = header_start + header_length
+
+        # every view into the mmap has to be released before it can be closed
+        self._views: List[memoryview] = [self._memory]
+        self._columns: Dict[str, Any] = {}
+
+        for name, (offset, length, column_format) in header["columns"].items():
+            column: Any = self._memory[
+                data_start + offset : data_start + offset + length
+            ]
+            self._views.append(column)
+
+            if not column_format.endswith("s"):
+                if sys.byteorder == COLUMN_BYTE_ORDER:
+                    column = column.cast(column_format)
+                    self._views.append(column)
+                else:
+                    # can't view the column in place, so swap a copy
+                    column = _array_from_bytes(column_format, column)
+
+            self._columns[name] = column
+
+        self._block_indexes = {
+            block_number: block_index
+            for block_index, block_number in enumerate(
+                self._columns["blocks.block_number"]
+            )
+        }
+
+    def __enter__(self) -> "TraceArchive":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._columns = {}
+
+        for view in reversed(self._views):
+            view.release()
+
+        self._views = []
+        self._mmap.close()
+        self._file.close()
+
+    @property
+    def block_numbers(self) -> List[int]:
+        return list(self._block_indexes)
+
+    def find_block(self, block_number: int) -> Optional[Block]:
+        block_index = self._block_indexes.get(block_number)
+        if block_index is None:
+            return None
+
+        def block_column(name: str) -> Any:
+            return self._columns[f"blocks.{name}"][block_index]
+
+        trace_start = block_column("trace_start")
+        receipt_start = block_column("receipt_start")
+        miner_length = block_column("miner_length")
+
+        return Block.construct(
+            block_number=block_number,
+            block_timestamp=block_column("block_timestamp"),
+            miner=(
+                self._read_heap(block_column("miner_start"), miner_length).decode(
+                    "utf-8"
+                )
+                if miner_length != NO_MINER
+                else None
+            ),
+            base_fee_per_gas=self._read_uint256("blocks.base_fee_per_gas", block_index),
+            traces=[
+                self._read_trace(trace_index)
+                for trace_index in range(
+                    trace_start, trace_start + block_column("trace_count")
+                )
+            ],
+            receipts=[
+                self._read_receipt(receipt_index)
+                for receipt_index in range(
+                    receipt_start, receipt_start + block_column("receipt_count")
+                )
+            ],
+        )
+
+    def find_blocks(
+        self,
+        after_block_number: int,
+        before_block_number: int,
+    ) -> Dict[int, Block]:
+        blocks_by_number = {}
+
+        for block_number in range(after_block_number, before_block_number):
+            block = self.find_block(block_number)
+            if block is not None:
+                blocks_by_number[block_number] = block
+
+        return blocks_by_number
+
+    def _read_trace(self, trace_index: int) -> Trace:
+        columns = self._columns
+
+        def trace_column(name: str) -> Any:
+            return columns[f"traces.{name}"][trace_index]
+
+        flags = trace_column("flags")
+
+        trace_address_start = trace_column("trace_address_start")
+        trace_address = columns["trace_addresses"][
+            trace_address_start : trace_address_start
+            + trace_column("trace_address_length")
+        ].tolist()
+
+        if flags & IS_COLUMNAR_CALL:
+            action: Dict[str, Any] = {
+                "callType": CALL_TYPES[trace_column("call_type")],
+                "from": self._read_address("traces.from", trace_index),
+                "gas": hex(trace_column("gas")),
+                "input": "0x"
+                + self._read_heap(
+                    trace_column("input_start"), trace_column("input_length")
+                ).hex(),
+                "to": self._read_address("traces.to", trace_index),
+                "value": hex(self._read_uint256("traces.value", trace_index)),
+            }
+
+            result = (
+                {
+                    "gasUsed": hex(trace_column("gas_used")),
+                    "output": "0x"
+                    + self._read_heap(
+                        trace_column("output_start"), trace_column("output_length")
+                    ).hex(),
+                }
+                if flags & HAS_RESULT
+                else None
+            )
+        else:
+            action_and_result = json.loads(
+                self._read_heap(trace_column("json_start"), trace_column("json_length"))
+            )
+            action = action_and_result["action"]
+            result = action_and_result["result"]
+
+        return Trace.construct(
+            action=action,
+            block_hash=self._read_hash("traces.block_hash", trace_index),
+            block_number=trace_column("block_number"),
+            result=result,
+            subtraces=trace_column("subtraces"),
+            trace_address=trace_address,
+            transaction_hash=(
+                self._read_hash("traces.transaction_hash", trace_index)
+                if flags & HAS_TRANSACTION_HASH
+                else None
+            ),
+            transaction_position=(
+                trace_column("transaction_position")
+                if flags & HAS_TRANSACTION_POSITION
+                else None
+            ),
+            type=TRACE_TYPES[trace_column("type")],
+            error=(
+                self._read_heap(
+                    trace_column("error_start"), trace_column("error_length")
+                ).decode("utf-8")
+                if flags & HAS_ERROR
+                else None
+            ),
+        )
+
+    def _read_receipt(self, receipt_index: int) -> Receipt:
+        def receipt_column(name: str) -> Any:
+            return self._columns[f"receipts.{name}"][receipt_index]
+
+        return Receipt.construct(
+            block_number=receipt_column("block_number"),
+            transaction_hash=self._read_hash(
+                "receipts.transaction_hash", receipt_index
+            ),
+            transaction_index=receipt_column("transaction_index"),
+            gas_used=receipt_column("gas_used"),
+            effective_gas_price=self._read_uint256(
+                "receipts.effective_gas_price", receipt_index
+            ),
+            cumulative_gas_used=receipt_column("cumulative_gas_used"),
+            to=(
+                self._read_address("receipts.to", receipt_index)
+                if receipt_column("flags") & HAS_TO
+                else None
+            ),
+        )
+
+    def _read_fixed_width(self, name: str, index: int, width: int) -> bytes:
+        return bytes(self._columns[name][index * width : (index + 1) * width])
+
+    def _read_address(self, name: str, index: int) -> str:
+        return "0x" + self._read_fixed_width(name, index, 20).hex()
+
+    def _read_hash(self, name: str, index: int) -> str:
+        return "0x" + self._read_fixed_width(name, index, 32).hex()
+
+    def _read_uint256(self, name: str, index: int) -> int:
+        return int.from_bytes(self._read_fixed_width(name, index, 32), "big")
+
+    def _read_heap(self, start: int, length: int) -> bytes:
+        return bytes(self._columns["heap"][start : start + length])
+
+
+def _get_trace_values(trace: Trace, heap: _Heap) -> Dict[str, Any]:
+    flags = 0
+
+    if trace.transaction_hash is not None:
+        flags |= HAS_TRANSACTION_HASH
+
+    if trace.transaction_position is not None:
+        flags |= HAS_TRANSACTION_POSITION
+
+    if trace.result is not None:
+        flags |= HAS_RESULT
+
+    values: Dict[str, Any] = {
+        "type": TRACE_TYPES.index(trace.type),
+        "block_hash": _hex_to_bytes(trace.block_hash, 32),
+        "block_number": trace.block_number,
+        "subtraces": trace.subtraces,
+        "transaction_hash": (
+            _hex_to_bytes(trace.transaction_hash, 32)
+            if trace.transaction_hash is not None
+            else None
+        ),
+        "transaction_position": trace.transaction_position or 0,
+    }
+
+    if trace.error is not None:
+        flags |= HAS_ERROR
+        values["error_start"], values["error_length"] = heap.append(
+            trace.error.encode("utf-8")
+        )
+
+    call_values = _get_call_values(trace, heap)
+
+    if call_values is not None:
+        flags |= IS_COLUMNAR_CALL
+        values.update(call_values)
+    else:
+        values["json_start"], values["json_length"] = heap.append(
+            json.dumps({"action": trace.action, "result": trace.result}).encode("utf-8")
+        )
+
+    values["flags"] = flags
+    return values
+
+
+def _get_call_values(trace: Trace, heap: _Heap) -> Optional[Dict[str, Any]]:
+    """
+    Column values for a call trace, or None if the trace
+    wouldn't read back exactly the same from them
+    """
+
+    action = trace.action
+    result = trace.result
+
+    if trace.type != TraceType.call or set(action) != CALL_ACTION_KEYS:
+        return None
+
+    if result is not None and set(result) != CALL_RESULT_KEYS:
+        return None
+
+    if action["callType"] not in CALL_TYPES:
+        return None
+
+    if not all(_is_canonical_address(action[key]) for key in ("from", "to")) or not all(
+        _is_canonical_hex_bytes(value)
+        for value in (
+            action["input"],
+            result["output"] if result is not None else "0x",
+        )
+    ):
+        return None
+
+    if not all(
+        _is_canonical_hex_int(value)
+        for value in (
+            action["gas"],
+            action["value"],
+            result["gasUsed"] if result is not None else "0x0",
+        )
+    ):
+        return None
+
+    gas = int(action["gas"], 16)
+    value = int(action["value"], 16)
+    gas_used = int(result["gasUsed"], 16) if result is not None else 0
+
+    if gas >= 2**64 or gas_used >= 2**64 or value >= 2**256:
+        return None
+
+    call_input = bytes.fromhex(action["input"][2:])
+    input_start, input_length = heap.append(call_input)
+
+    output_start, output_length = (
+        heap.append(bytes.fromhex(result["output"][2:]))
+        if result is not None
+        else (0, 0)
+    )
+
+    return {
+        "call_type": CALL_TYPES.index(action["callType"]),
+        "from": bytes.fromhex(action["from"][2:]),
+        "to": bytes.fromhex(action["to"][2:]),
+        "value": _uint256_to_bytes(value),
+        "gas": gas,
+        "selector": call_input[:4].ljust(4, b"\x00"),
+        "input_start": input_start,
+        "input_length": input_length,
+        "gas_used": gas_used,
+        "output_start": output_start,
+        "output_length": output_length,
+    }
+
+
+def _is_canonical_address(value: Any) -> bool:
+    return _is_canonical_hex_bytes(value) and len(value) == 42
+
+
+def _is_canonical_hex_bytes(value: Any) -> bool:
+    if not isinstance(value, str) or not value.startswith("0x"):
+        return False
+
+    try:
+        return "0x" + bytes.fromhex(value[2:]).hex() == value
+    except ValueError:
+        return False
+
+
+def _is_canonical_hex_int(value: Any) -> bool:
+    if not isinstance(value, str):
+        return False
+
+    try:
+        return hex(int(value, 16)) == value
+    except ValueError:
+        return False
+
+
+def _hex_to_bytes(value: str, width: int) -> bytes:
+    if not _is_canonical_hex_bytes(value) or len(value) != 2 + 2 * width:
+        raise ValueError(f"Can't store {value} in a {width} byte column")
+
+    return bytes.fromhex(value[2:])
+
+
+def _array_to_bytes(values: array) -> bytes:
+    if sys.byteorder != COLUMN_BYTE_ORDER:
+        values.byteswap()
+
+    return values.tobytes()
+
+
+def _array_from_bytes(column_format: str, data: memoryview) -> array:
+    values = array(column_format)
+    values.frombytes(data)
+
+    if sys.byteorder != COLUMN_BYTE_ORDER:
+        values.byteswap()
+
+    return values
+
+
+def _uint256_to_bytes(value: int) -> bytes:
+    return value.to_bytes(32, "big")
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from sqlalchemy import orm
+from web3 import Web3
+
+from mev_inspect.block import (
+    DEFAULT_RPC_BATCH_SIZE,
+    create_from_block_numbers,
+    find_cached_block_numbers,
+)
+from mev_inspect.crud.raw_blocks import write_raw_blocks
+from mev_inspect.schemas.blocks import Block
+
+logger = logging.getLogger(__name__)
+
+TRACE_CACHE_WRITE_BATCH_SIZE = 10
+
+# blocks checked against the trace DB and written back at a time when warming it up
+WARM_BATCH_SIZE = 500
+
+
+class TraceCacheWriter:
+    """
+    Writes blocks fetched over RPC back into the trace DB in the background,
+    so each block only has to be fetched from the node once
+
+    A batch that fails to write is logged and rolled back rather than
+    raised, as it's only a cache. failed_blocks counts the blocks lost
+    """
+
+    def __init__(
+        self,
+        trace_db_sessionmaker,
+        batch_size: int = TRACE_CACHE_WRITE_BATCH_SIZE,
+    ):
+        self._trace_db_session = trace_db_sessionmaker()
+        self._batch_size = batch_size
+
+        # sessions aren't thread safe, so a single thread does all the writes
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+        self._pending_blocks: List[Block] = []
+        self._writes: List[asyncio.Future] = []
+
+        self.failed_blocks = 0
+
+    def add(self, blocks: List[Block]) -> None:
+        self._pending_blocks.extend(blocks)
+
+        if len(self._pending_blocks) >= self._batch_size:
+            self._start_write()
+
+    async def flush(self) -> None:
+        self._start_write()
+
+        writes = self._writes
+        self._writes = []
+        await asyncio.gather(*writes)
+
+    def _start_write(self) -> None:
+        if len(self._pending_blocks) == 0:
+            return
+
+        blocks = self._pending_blocks
+        self._pending_blocks = []
+
+        self._writes = [write for write in self._writes if not write.done()]
+        self._writes.append(
+            asyncio.get_running_loop().run_in_executor(
+                self._executor, self._write, blocks
+            )
+        )
+
+    def _write(self, blocks: List[Block]) -> None:
+        try:
+            write_raw_blocks(self._trace_db_session, blocks)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error(f"Failed to write {len(blocks)} blocks to the trace DB: {e}")
+            self._trace_db_session.rollback()
+            self.failed_blocks += len(blocks)
+
+
+async def warm_trace_cache(
+    w3: Web3,
+    trace_db_session: orm.Session,
+    trace_db_sessionmaker,
+    after_block_number: int,
+    before_block_number: int,
+    max_concurrency: int = 5,
+    rpc_batch_size: int = DEFAULT_RPC_BATCH_SIZE,
+    batch_size: int = WARM_BATCH_SIZE,
+) -> int:
+    """
+    Fetches every block in [after_block_number, before_block_number)
+    that isn't in the trace DB yet and writes it there
+
+    Each batch is committed once written, so an interrupted run
+    picks up where it left off
+
+    Returns how many blocks failed to write, which a rerun will fetch again
+    """
+
+    trace_cache_writer = TraceCacheWriter(trace_db_sessionmaker, batch_size=batch_size)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch_blocks(block_numbers: List[int]) -> None:
+        async with semaphore:
+            blocks = await create_from_block_numbers(
+                w3,
+                block_numbers,
+                None,
+                rpc_batch_size=rpc_batch_size,
+            )
+
+        trace_cache_writer.add(blocks)
+
+    start = time.monotonic()
+    fetched_blocks = 0
+    skipped_blocks = 0
+
+    # write each batch while fetching the next
+    previous_flush: Optional[asyncio.Future] = None
+
+    for batch_after_block in range(after_block_number, before_block_number, batch_size):
+        batch_before_block = min(batch_after_block + batch_size, before_block_number)
+
+        cached_block_numbers = find_cached_block_numbers(
+            trace_db_session, batch_after_block, batch_before_block
+        )
+        missing_block_numbers = [
+            block_number
+            for block_number in range(batch_after_block, batch_before_block)
+            if block_number not in cached_block_numbers
+        ]
+
+        await asyncio.gather(
+            *(
+                fetch_blocks(missing_block_numbers[i : i + rpc_batch_size])
+                for i in range(0, len(missing_block_numbers), rpc_batch_size)
+            )
+        )
+
+        if previous_flush is not None:
+            await previous_flush
+
+        previous_flush = asyncio.ensure_future(trace_cache_writer.flush())
+
+        fetched_blocks += len(missing_block_numbers)
+        skipped_blocks += len(cached_block_numbers)
+        elapsed_seconds = time.monotonic() - start
+
+        logger.info(
+            f"Warmed blocks {batch_after_block} to {batch_before_block} -- "
+            f"fetched {fetched_blocks}, skipped {skipped_blocks} already cached, "
+            f"failed to write {trace_cache_writer.failed_blocks}, "
+            f"{fetched_blocks / elapsed_seconds:.1f} blocks/s"
+        )
+
+    if previous_flush is not None:
+        await previous_flush
+
+    logger.info(
+        f"Warmed blocks {after_block_number} to {before_block_number} -- "
+        f"fetched {fetched_blocks}, skipped {skipped_blocks} already cached, "
+        f"failed to write {trace_cache_writer.failed_blocks}"
+    )
+
+    return trace_cache_writer.failed_blocks
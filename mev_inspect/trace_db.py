@@ -0,0 +1,173 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from mev_inspect.db import get_async_trace_engine
+from mev_inspect.schemas.receipts import Receipt
+from mev_inspect.schemas.traces import Trace
+
+DEFAULT_TRACE_DB_POOL_SIZE = 10
+
+# rows held at once while streaming raw traces from the trace DB
+TRACE_DB_STREAM_SIZE = 10
+
+
+class TraceDBReader:
+    """
+    Reads raw blocks from the trace DB without blocking the event loop
+
+    Every lookup checks out its own connection from the pool,
+    so concurrent lookups run side by side rather than queueing
+    on a single session
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self._engine = engine
+
+    async def close(self) -> None:
+        await self._engine.dispose()
+
+    async def find_block_timestamp(self, block_number: int) -> Optional[int]:
+        return await self._find_value(
+            "SELECT block_timestamp FROM block_timestamps WHERE block_number = :block_number",
+            block_number,
+        )
+
+    async def find_base_fee_per_gas(self, block_number: int) -> Optional[int]:
+        return await self._find_value(
+            "SELECT base_fee_in_wei FROM base_fee WHERE block_number = :block_number",
+            block_number,
+        )
+
+    async def find_block_receipts(self, block_number: int) -> Optional[List[Receipt]]:
+        receipts_json = await self._find_value(
+            "SELECT raw_receipts FROM block_receipts WHERE block_number = :block_number",
+            block_number,
+        )
+
+        if receipts_json is None:
+            return None
+
+        return [Receipt(**receipt) for receipt in receipts_json]
+
+    async def find_block_traces(self, block_number: int) -> Optional[List[Trace]]:
+        traces_json = await self._find_value(
+            "SELECT raw_traces FROM block_traces WHERE block_number = :block_number",
+            block_number,
+        )
+
+        if traces_json is None:
+            return None
+
+        return [Trace(**trace_json) for trace_json in traces_json]
+
+    async def find_block_timestamps(
+        self,
+        after_block_number: int,
+        before_block_number: int,
+    ) -> Dict[int, int]:
+        return dict(
+            await self._find_rows(
+                "SELECT block_number, block_timestamp FROM block_timestamps "
+                "WHERE block_number >= :after_block_number AND block_number < :before_block_number",
+                after_block_number,
+                before_block_number,
+            )
+        )
+
+    async def find_base_fees_per_gas(
+        self,
+        after_block_number: int,
+        before_block_number: int,
+    ) -> Dict[int, int]:
+        return dict(
+            await self._find_rows(
+                "SELECT block_number, base_fee_in_wei FROM base_fee "
+                "WHERE block_number >= :after_block_number AND block_number < :before_block_number",
+                after_block_number,
+                before_block_number,
+            )
+        )
+
+    async def find_blocks_receipts(
+        self,
+        after_block_number: int,
+        before_block_number: int,
+    ) -> Dict[int, List[Receipt]]:
+        return {
+            block_number: [Receipt(**receipt) for receipt in receipts_json]
+            for block_number, receipts_json in await self._find_rows(
+                "SELECT block_number, raw_receipts FROM block_receipts "
+                "WHERE block_number >= :after_block_number AND block_number < :before_block_number",
+                after_block_number,
+                before_block_number,
+            )
+        }
+
+    async def stream_blocks_traces(
+        self,
+        after_block_number: int,
+        before_block_number: int,
+    ) -> AsyncIterator[Tuple[int, List[Trace]]]:
+        # raw traces are large, so pull them through a server-side cursor
+        # rather than loading the whole range at once
+        async with self._engine.connect() as connection:
+            result = await connection.stream(
+                text(
+                    "SELECT block_number, raw_traces FROM block_traces "
+                    "WHERE block_number >= :after_block_number AND block_number < :before_block_number"
+                ),
+                {
+                    "after_block_number": after_block_number,
+                    "before_block_number": before_block_number,
+                },
+            )
+
+            async for rows in result.partitions(TRACE_DB_STREAM_SIZE):
+                for block_number, traces_json in rows:
+                    yield block_number, [
+                        Trace(**trace_json) for trace_json in traces_json
+                    ]
+
+    async def _find_value(self, query: str, block_number: int) -> Optional[Any]:
+        async with self._engine.connect() as connection:
+            result = await connection.execute(
+                text(query),
+                {"block_number": block_number},
+            )
+            row = result.one_or_none()
+
+        if row is None:
+            return None
+
+        (value,) = row
+        return value
+
+    async def _find_rows(
+        self,
+        query: str,
+        after_block_number: int,
+        before_block_number: int,
+    ) -> List[Tuple[Any, ...]]:
+        async with self._engine.connect() as connection:
+            result = await connection.execute(
+                text(query),
+                {
+                    "after_block_number": after_block_number,
+                    "before_block_number": before_block_number,
+                },
+            )
+
+            return [tuple(row) for row in result.all()]
+
+
+def get_trace_db_reader(
+    pool_size: int = DEFAULT_TRACE_DB_POOL_SIZE,
+) -> Optional[TraceDBReader]:
+    engine = get_async_trace_engine(pool_size)
+
+    if engine is not None:
+        return TraceDBReader(engine)
+
+    return None
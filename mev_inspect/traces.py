@@ -1,5 +1,6 @@
+from bisect import bisect_left, bisect_right
 from itertools import groupby
-from typing import Dict, List
+from typing import Dict, Iterable, List
 
 from mev_inspect.schemas.traces import ClassifiedTrace
 
@@ -16,22 +17,52 @@ def is_child_trace_address(
     )
 
 
+class TraceTree:
+    """
+    Index over the call tree of a single transaction's traces
+
+    Traces are kept in trace address order, which is a preorder walk
+    of the tree, so the children of any trace follow it as one run
+    and are found with a binary search rather than a scan
+    """
+
+    def __init__(self, traces: Iterable[ClassifiedTrace]):
+        self.traces = sorted(traces, key=lambda trace: trace.trace_address)
+        self._trace_addresses = [trace.trace_address for trace in self.traces]
+
+    def get_child_traces(
+        self,
+        parent_trace_address: List[int],
+    ) -> List[ClassifiedTrace]:
+        """
+        All traces below the parent, not only its direct children,
+        as in is_child_trace_address
+        """
+
+        start = bisect_right(self._trace_addresses, parent_trace_address)
+
+        if len(parent_trace_address) == 0:
+            return self.traces[start:]
+
+        # everything below the parent sorts before its next sibling
+        next_sibling_trace_address = parent_trace_address[:-1] + [
+            parent_trace_address[-1] + 1
+        ]
+        end = bisect_left(self._trace_addresses, next_sibling_trace_address, lo=start)
+
+        return self.traces[start:end]
+
+
 def get_child_traces(
     transaction_hash: str,
     parent_trace_address: List[int],
     traces: List[ClassifiedTrace],
 ) -> List[ClassifiedTrace]:
-    ordered_traces = sorted(traces, key=lambda t: t.trace_address)
-    child_traces = []
-
-    for trace in ordered_traces:
-        if trace.transaction_hash == transaction_hash and is_child_trace_address(
-            trace.trace_address,
-            parent_trace_address,
-        ):
-            child_traces.append(trace)
+    trace_tree = TraceTree(
+        trace for trace in traces if trace.transaction_hash == transaction_hash
+    )
 
-    return child_traces
+    return trace_tree.get_child_traces(parent_trace_address)
 
 
 def is_child_of_any_address(
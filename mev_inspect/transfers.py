@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Sequence
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from mev_inspect.classifiers.specs import get_classifier
 from mev_inspect.schemas.classifiers import TransferClassifier
@@ -19,8 +19,47 @@ def get_transfers(traces: List[ClassifiedTrace]) -> List[Transfer]:
     return transfers
 
 
-def get_eth_transfers(traces: List[ClassifiedTrace]) -> List[Transfer]:
-    transfers = get_transfers(traces)
+class TransferIndex:
+    """
+    The transfers of a block's classified traces, worked out once
+    and shared by every detector that reads them
+
+    Transfers are looked up by transaction hash and trace address,
+    so only traces the index was built from are covered
+    """
+
+    def __init__(self, traces: List[ClassifiedTrace]):
+        self.transfers = get_transfers(traces)
+        self._transfers_by_trace: Dict[Tuple[str, Tuple[int, ...]], Transfer] = {
+            (transfer.transaction_hash, tuple(transfer.trace_address)): transfer
+            for transfer in self.transfers
+        }
+
+    def get_transfer(self, trace: ClassifiedTrace) -> Optional[Transfer]:
+        return self._transfers_by_trace.get(
+            (trace.transaction_hash, tuple(trace.trace_address))
+        )
+
+    def get_transfers(self, traces: List[ClassifiedTrace]) -> List[Transfer]:
+        transfers = []
+
+        for trace in traces:
+            transfer = self.get_transfer(trace)
+            if transfer is not None:
+                transfers.append(transfer)
+
+        return transfers
+
+
+def get_eth_transfers(
+    traces: List[ClassifiedTrace],
+    transfer_index: Optional[TransferIndex] = None,
+) -> List[Transfer]:
+    transfers = (
+        get_transfers(traces)
+        if transfer_index is None
+        else transfer_index.get_transfers(traces)
+    )
 
     return [
         transfer
@@ -49,7 +88,7 @@ def _is_simple_eth_transfer(trace: ClassifiedTrace) -> bool:
 
 
 def build_eth_transfer(trace: ClassifiedTrace) -> Transfer:
-    return Transfer(
+    return Transfer.construct(
         block_number=trace.block_number,
         transaction_hash=trace.transaction_hash,
         trace_address=trace.trace_address,
@@ -106,23 +145,24 @@ def remove_child_transfers_of_transfers(
     transfers: List[Transfer],
 ) -> List[Transfer]:
     updated_transfers = []
-    transfer_addresses_by_transaction: Dict[str, List[List[int]]] = {}
+    kept_address_by_transaction: Dict[str, List[int]] = {}
 
+    # transfers usually come in trace address order already,
+    # which sorting only has to check
     sorted_transfers = sorted(transfers, key=lambda t: t.trace_address)
 
     for transfer in sorted_transfers:
-        existing_addresses = transfer_addresses_by_transaction.get(
-            transfer.transaction_hash, []
-        )
+        # in trace address order, everything between a kept transfer
+        # and its children is a child of it too, so a transfer is a child
+        # of an earlier transfer only if it's a child of the last one kept
+        kept_address = kept_address_by_transaction.get(transfer.transaction_hash)
 
-        if not any(
-            is_child_trace_address(transfer.trace_address, parent_address)
-            for parent_address in existing_addresses
+        if kept_address is None or not is_child_trace_address(
+            transfer.trace_address, kept_address
         ):
             updated_transfers.append(transfer)
-
-        transfer_addresses_by_transaction[
-            transfer.transaction_hash
-        ] = existing_addresses + [transfer.trace_address]
+            kept_address_by_transaction[
+                transfer.transaction_hash
+            ] = transfer.trace_address
 
     return updated_transfers
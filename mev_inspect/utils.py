@@ -1,5 +1,17 @@
+import json
+import os
+import tempfile
+from typing import Any, Callable
+
 from hexbytes._utils import hexstr_to_bytes
 
+try:
+    import orjson
+
+    loads: Callable[[bytes], Any] = orjson.loads
+except ImportError:
+    loads = json.loads
+
 
 def hex_to_int(value: str) -> int:
     return int.from_bytes(hexstr_to_bytes(value), byteorder="big")
@@ -12,3 +24,21 @@ def equal_within_percent(
         (first_value - second_value) / (0.5 * (first_value + second_value))
     )
     return difference < threshold_percent
+
+
+def write_atomically(path: str, data: bytes) -> None:
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    # readers only ever see a complete file, never a partial write
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "wb") as temporary_file:
+            temporary_file.write(data)
+            temporary_file.flush()
+            os.fsync(temporary_file.fileno())
+
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
@@ -0,0 +1,71 @@
+"""
+Compares classifying the traces of each test block with every
+classified trace validated by pydantic as it's built, against
+constructing them straight from the already validated traces
+
+Run with:
+    python -m tests.benchmark_classify
+"""
+
+import os
+import timeit
+from functools import partial
+
+from mev_inspect.classifiers.trace import TraceClassifier
+
+from .utils import TEST_BLOCKS_DIRECTORY, load_test_block
+
+REPEATS = 5
+
+
+def main():
+    block_numbers = sorted(
+        int(filename.split(".")[0]) for filename in os.listdir(TEST_BLOCKS_DIRECTORY)
+    )
+
+    validating_classifier = TraceClassifier(validate_traces=True)
+    constructing_classifier = TraceClassifier()
+
+    total_validated_seconds = 0.0
+    total_constructed_seconds = 0.0
+
+    print(
+        f"{'block':>10} {'traces':>8} {'validated ms':>14} {'constructed ms':>16} {'speedup':>8}"
+    )
+
+    for block_number in block_numbers:
+        block = load_test_block(block_number)
+
+        validated_seconds = min(
+            timeit.repeat(
+                partial(validating_classifier.classify, block.traces),
+                number=1,
+                repeat=REPEATS,
+            )
+        )
+        constructed_seconds = min(
+            timeit.repeat(
+                partial(constructing_classifier.classify, block.traces),
+                number=1,
+                repeat=REPEATS,
+            )
+        )
+
+        total_validated_seconds += validated_seconds
+        total_constructed_seconds += constructed_seconds
+
+        print(
+            f"{block_number:>10} {len(block.traces):>8} "
+            f"{validated_seconds * 1000:>14.2f} {constructed_seconds * 1000:>16.2f} "
+            f"{validated_seconds / constructed_seconds:>7.1f}x"
+        )
+
+    print(
+        f"{'total':>10} {'':>8} "
+        f"{total_validated_seconds * 1000:>14.2f} {total_constructed_seconds * 1000:>16.2f} "
+        f"{total_validated_seconds / total_constructed_seconds:>7.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
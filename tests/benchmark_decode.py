@@ -0,0 +1,139 @@
+"""
+Compares decoding the calldata of every classified call in the test blocks,
+per protocol, through eth_abi's generic decode_abi with the ABI worked out
+on every call, against the decoders ABIDecoder compiles for each function
+
+Run with:
+    python -m tests.benchmark_decode
+"""
+
+import os
+import timeit
+import warnings
+from collections import defaultdict
+from functools import partial
+from typing import Dict, List, Tuple
+
+import eth_utils.abi
+from eth_abi import decode_abi
+from eth_abi.exceptions import InsufficientDataBytes, NonEmptyPaddingBytes
+from hexbytes._utils import hexstr_to_bytes
+
+from mev_inspect.abi import get_abi
+from mev_inspect.classifiers.trace import TraceClassifier
+from mev_inspect.decode import SELECTOR_LENGTH, ABIDecoder
+from mev_inspect.schemas.abi import ABIFunctionDescription
+from mev_inspect.schemas.call_data import CallData
+from mev_inspect.schemas.traces import DecodedCallTrace
+
+from .utils import TEST_BLOCKS_DIRECTORY, load_test_block
+
+REPEATS = 5
+
+
+def _generic_decode(
+    functions_by_selector: Dict[str, ABIFunctionDescription],
+    data: str,
+):
+    selector, params = data[:SELECTOR_LENGTH], data[SELECTOR_LENGTH:]
+    func = functions_by_selector[selector]
+
+    names = [input.name for input in func.inputs]
+    types = [
+        input.type
+        if input.type != "tuple"
+        else eth_utils.abi.collapse_if_tuple(input.dict())
+        for input in func.inputs
+    ]
+
+    try:
+        decoded = decode_abi(types, hexstr_to_bytes(params))
+    except (InsufficientDataBytes, NonEmptyPaddingBytes, OverflowError):
+        return None
+
+    return CallData(
+        function_name=func.name,
+        function_signature=func.get_signature(),
+        inputs={name: value for name, value in zip(names, decoded)},
+    )
+
+
+def _decode_all_generic(calls: List[Tuple[Dict, ABIDecoder, str]]):
+    for functions_by_selector, _, data in calls:
+        _generic_decode(functions_by_selector, data)
+
+
+def _decode_all_compiled(calls: List[Tuple[Dict, ABIDecoder, str]]):
+    for _, decoder, data in calls:
+        decoder.decode(data)
+
+
+def main():
+    warnings.simplefilter("ignore", DeprecationWarning)
+
+    trace_classifier = TraceClassifier()
+    calls_by_protocol: Dict[str, List[Tuple[Dict, ABIDecoder, str]]] = defaultdict(list)
+    decoders: Dict[Tuple[str, str], Tuple[Dict, ABIDecoder]] = {}
+
+    for filename in sorted(os.listdir(TEST_BLOCKS_DIRECTORY)):
+        block = load_test_block(int(filename.split(".")[0]))
+
+        for trace in trace_classifier.classify(block.traces):
+            if not isinstance(trace, DecodedCallTrace):
+                continue
+
+            key = (trace.abi_name, trace.protocol)
+            if key not in decoders:
+                abi = get_abi(trace.abi_name, trace.protocol)
+                decoders[key] = (
+                    {
+                        description.get_selector(): description
+                        for description in abi
+                        if isinstance(description, ABIFunctionDescription)
+                    },
+                    ABIDecoder(abi),
+                )
+
+            functions_by_selector, decoder = decoders[key]
+            protocol = (
+                trace.protocol.value if trace.protocol is not None else trace.abi_name
+            )
+            calls_by_protocol[protocol].append(
+                (functions_by_selector, decoder, trace.action["input"])
+            )
+
+    total_generic_seconds = 0.0
+    total_compiled_seconds = 0.0
+
+    print(
+        f"{'protocol':>24} {'calls':>8} {'generic ms':>12} {'compiled ms':>12} {'speedup':>8}"
+    )
+
+    for protocol, calls in sorted(calls_by_protocol.items()):
+        generic_seconds = min(
+            timeit.repeat(partial(_decode_all_generic, calls), number=1, repeat=REPEATS)
+        )
+        compiled_seconds = min(
+            timeit.repeat(
+                partial(_decode_all_compiled, calls), number=1, repeat=REPEATS
+            )
+        )
+
+        total_generic_seconds += generic_seconds
+        total_compiled_seconds += compiled_seconds
+
+        print(
+            f"{protocol:>24} {len(calls):>8} "
+            f"{generic_seconds * 1000:>12.2f} {compiled_seconds * 1000:>12.2f} "
+            f"{generic_seconds / compiled_seconds:>7.1f}x"
+        )
+
+    print(
+        f"{'total':>24} {'':>8} "
+        f"{total_generic_seconds * 1000:>12.2f} {total_compiled_seconds * 1000:>12.2f} "
+        f"{total_generic_seconds / total_compiled_seconds:>7.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compares decoding trace_block and eth_getBlockReceipts responses
+through web3's json decoding and pydantic validation
+against the raw path in mev_inspect.raw_rpc
+
+Run with:
+    python -m tests.benchmark_raw_rpc
+"""
+
+import json
+import os
+import timeit
+from functools import partial
+
+from mev_inspect.raw_rpc import loads, parse_receipts, parse_traces
+from mev_inspect.schemas.receipts import Receipt
+from mev_inspect.schemas.traces import Trace
+
+from .utils import (
+    TEST_BLOCKS_DIRECTORY,
+    load_test_block,
+    to_raw_rpc_receipts,
+    to_raw_rpc_traces,
+)
+
+REPEATS = 5
+
+
+def _validated_path(traces_body: bytes, receipts_body: bytes):
+    traces = [Trace(**trace_json) for trace_json in json.loads(traces_body)]
+    receipts = [Receipt(**receipt_json) for receipt_json in json.loads(receipts_body)]
+    return traces, receipts
+
+
+def _raw_path(traces_body: bytes, receipts_body: bytes):
+    return parse_traces(loads(traces_body)), parse_receipts(loads(receipts_body))
+
+
+def main():
+    block_numbers = sorted(
+        int(filename.split(".")[0]) for filename in os.listdir(TEST_BLOCKS_DIRECTORY)
+    )
+
+    total_validated_seconds = 0.0
+    total_raw_seconds = 0.0
+
+    print(
+        f"{'block':>10} {'traces':>8} {'validated ms':>14} {'raw ms':>10} {'speedup':>8}"
+    )
+
+    for block_number in block_numbers:
+        block = load_test_block(block_number)
+        traces_body = to_raw_rpc_traces(block)
+        receipts_body = to_raw_rpc_receipts(block)
+
+        validated_seconds = min(
+            timeit.repeat(
+                partial(_validated_path, traces_body, receipts_body),
+                number=1,
+                repeat=REPEATS,
+            )
+        )
+        raw_seconds = min(
+            timeit.repeat(
+                partial(_raw_path, traces_body, receipts_body),
+                number=1,
+                repeat=REPEATS,
+            )
+        )
+
+        total_validated_seconds += validated_seconds
+        total_raw_seconds += raw_seconds
+
+        print(
+            f"{block_number:>10} {len(block.traces):>8} "
+            f"{validated_seconds * 1000:>14.2f} {raw_seconds * 1000:>10.2f} "
+            f"{validated_seconds / raw_seconds:>7.1f}x"
+        )
+
+    print(
+        f"{'total':>10} {'':>8} "
+        f"{total_validated_seconds * 1000:>14.2f} {total_raw_seconds * 1000:>10.2f} "
+        f"{total_validated_seconds / total_raw_seconds:>7.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,14 @@ import pytest
 from mev_inspect.classifiers.trace import TraceClassifier
 
 
+@pytest.fixture(name="registry_path", scope="session")
+def fixture_registry_path(tmp_path_factory) -> str:
+    return str(tmp_path_factory.mktemp("cache") / "classifier_registry.json")
+
+
 @pytest.fixture(scope="session")
-def trace_classifier() -> TraceClassifier:
-    return TraceClassifier()
+def trace_classifier(registry_path) -> TraceClassifier:
+    return TraceClassifier(registry_path=registry_path)
 
 
 @pytest.fixture(name="get_transaction_hashes")
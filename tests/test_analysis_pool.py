@@ -0,0 +1,27 @@
+import asyncio
+
+from mev_inspect.inspect_block import (  # pylint: disable=protected-access
+    AnalysisPool,
+    _inspect_block_data,
+)
+
+from .utils import load_test_block
+
+
+def test_analysis_pool_matches_in_process_analysis(trace_classifier, registry_path):
+    blocks = [load_test_block(block_number) for block_number in [12775690, 12483198]]
+
+    analysis_pool = AnalysisPool(workers=2, chunk_size=1, registry_path=registry_path)
+
+    async def inspect_blocks():
+        return await asyncio.gather(
+            *(analysis_pool.inspect_blocks([block]) for block in blocks)
+        )
+
+    try:
+        pool_inspections = asyncio.run(inspect_blocks())
+    finally:
+        analysis_pool.shutdown()
+
+    for block, [pool_inspection] in zip(blocks, pool_inspections):
+        assert pool_inspection == _inspect_block_data(trace_classifier, block)
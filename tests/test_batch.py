@@ -0,0 +1,85 @@
+import asyncio
+import json
+from functools import partial
+
+import pytest
+from aiohttp.client_exceptions import ClientOSError
+from web3 import AsyncHTTPProvider, Web3
+
+from mev_inspect import batch
+from mev_inspect.batch import make_batch_request
+from mev_inspect.methods import BATCH_METHOD
+from mev_inspect.retry import (
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    CircuitOpenError,
+    RetryPolicy,
+    http_retry_with_backoff_request_middleware,
+)
+
+
+def _make_w3(retry_policy: RetryPolicy, requested_methods: list) -> Web3:
+    async def recording_middleware(
+        make_request, web3
+    ):  # pylint: disable=unused-argument
+        async def middleware(method, params):
+            requested_methods.append(method)
+            return await make_request(method, params)
+
+        return middleware
+
+    base_provider = AsyncHTTPProvider("http://localhost:8545")
+    base_provider.middlewares = (
+        partial(http_retry_with_backoff_request_middleware, retry_policy=retry_policy),
+        recording_middleware,
+    )
+
+    return Web3(base_provider, middlewares=[])
+
+
+def test_batches_go_through_provider_middlewares(monkeypatch):
+    posts = 0
+
+    async def post_request(base_provider, data):  # pylint: disable=unused-argument
+        nonlocal posts
+        posts += 1
+
+        # the first attempt fails, as a dropped connection would
+        if posts == 1:
+            raise ClientOSError()
+
+        return [
+            {"jsonrpc": "2.0", "id": request["id"], "result": request["params"]}
+            for request in json.loads(data)
+        ]
+
+    monkeypatch.setattr(batch, "post_request", post_request)
+
+    requested_methods: list = []
+    w3 = _make_w3(RetryPolicy(), requested_methods)
+
+    results = asyncio.run(
+        make_batch_request(
+            w3,
+            [("trace_block", ["0x1"]), ("eth_getBlockReceipts", ["0x2"])],  # type: ignore
+        )
+    )
+
+    assert results == [["0x1"], ["0x2"]]
+    assert posts == 2
+    assert requested_methods == [BATCH_METHOD, BATCH_METHOD]
+
+
+def test_batches_fail_fast_while_circuit_is_open(monkeypatch):
+    async def post_request(base_provider, data):  # pylint: disable=unused-argument
+        raise AssertionError("Shouldn't be sent while the circuit is open")
+
+    monkeypatch.setattr(batch, "post_request", post_request)
+
+    retry_policy = RetryPolicy()
+    for _ in range(CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+        retry_policy.circuit_breaker.record_failure()
+
+    w3 = _make_w3(retry_policy, [])
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(make_batch_request(w3, [("trace_block", ["0x1"])]))  # type: ignore
@@ -0,0 +1,73 @@
+import os
+
+from mev_inspect.block_store import BlockStore
+
+from .utils import load_test_block
+
+
+def test_block_store_round_trip(tmp_path):
+    block = load_test_block(12775690)
+
+    block_store = BlockStore(directory=str(tmp_path))
+    assert block_store.find_block(block.block_number) is None
+
+    block_store.write_blocks([block])
+
+    assert block_store.find_block(block.block_number) == block
+
+    # a new store finds the block through the saved index
+    reopened_block_store = BlockStore(directory=str(tmp_path))
+    assert reopened_block_store.size_bytes == block_store.size_bytes
+    assert reopened_block_store.find_blocks(
+        block.block_number, block.block_number + 1
+    ) == {block.block_number: block}
+
+
+def test_block_store_evicts_least_recently_read(tmp_path):
+    first_block = load_test_block(12775690)
+    second_block = load_test_block(12483198)
+
+    block_store = BlockStore(directory=str(tmp_path / "unbounded"))
+    block_store.write_blocks([first_block, second_block])
+    max_size_bytes = block_store.size_bytes - 1
+
+    block_store = BlockStore(
+        directory=str(tmp_path / "bounded"), max_size_bytes=max_size_bytes
+    )
+    block_store.write_blocks([first_block])
+    block_store.write_blocks([second_block])
+
+    assert block_store.size_bytes <= max_size_bytes
+    assert block_store.find_block(first_block.block_number) is None
+    assert block_store.find_block(second_block.block_number) == second_block
+
+
+def test_block_store_rebuilds_missing_index(tmp_path):
+    block = load_test_block(12775690)
+
+    BlockStore(directory=str(tmp_path)).write_blocks([block])
+    os.remove(os.path.join(tmp_path, "index.json"))
+
+    block_store = BlockStore(directory=str(tmp_path))
+    assert block_store.size_bytes > 0
+    assert block_store.find_block(block.block_number) == block
+
+
+def test_block_store_saves_reads_on_close(tmp_path):
+    first_block = load_test_block(12775690)
+    second_block = load_test_block(12483198)
+
+    BlockStore(directory=str(tmp_path)).write_blocks([first_block, second_block])
+
+    # a replay that only reads still decides what's evicted next
+    block_store = BlockStore(directory=str(tmp_path))
+    block_store.find_block(first_block.block_number)
+    block_store.close()
+
+    block_store = BlockStore(
+        directory=str(tmp_path), max_size_bytes=block_store.size_bytes - 1
+    )
+    block_store.write_blocks([])
+
+    assert block_store.find_block(first_block.block_number) == first_block
+    assert block_store.find_block(second_block.block_number) is None
@@ -0,0 +1,43 @@
+import json
+
+from mev_inspect.abi import get_abi
+from mev_inspect.classifiers import registry
+from mev_inspect.classifiers.specs import ALL_CLASSIFIER_SPECS
+from mev_inspect.decode import get_decodable_functions
+
+
+def test_registry_is_reused_until_abis_change(tmp_path, monkeypatch):
+    registry_path = str(tmp_path / "classifier_registry.json")
+    specs = ALL_CLASSIFIER_SPECS[:3]
+
+    functions_by_abi_name = registry.load_decodable_functions(specs, registry_path)
+
+    for spec in specs:
+        assert functions_by_abi_name[spec.abi_name] == get_decodable_functions(
+            get_abi(spec.abi_name, spec.protocol)
+        )
+
+    def fail_get_abi(abi_name, protocol):
+        raise AssertionError(f"Parsed the ABI for {abi_name} ({protocol})")
+
+    monkeypatch.setattr(registry, "get_abi", fail_get_abi)
+    assert (
+        registry.load_decodable_functions(specs, registry_path) == functions_by_abi_name
+    )
+
+    # a registry built from other ABI files is rebuilt
+    with open(registry_path, "r") as registry_file:
+        registry_json = json.load(registry_file)
+
+    registry_json["abi_hash"] = "stale"
+
+    with open(registry_path, "w") as registry_file:
+        json.dump(registry_json, registry_file)
+
+    monkeypatch.undo()
+    assert (
+        registry.load_decodable_functions(specs, registry_path) == functions_by_abi_name
+    )
+
+    with open(registry_path, "r") as registry_file:
+        assert json.load(registry_file)["abi_hash"] != "stale"
@@ -0,0 +1,62 @@
+import asyncio
+
+from mev_inspect.concurrency import AdaptiveConcurrencyLimiter
+
+
+def test_limiter_grows_while_healthy_and_backs_off_on_failure():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=10)
+
+    for _ in range(20):
+        limiter.record_success(0.1)
+
+    grown_limit = limiter.limit
+    assert 2 < grown_limit <= 10
+
+    limiter.record_failure()
+    assert limiter.limit < grown_limit
+
+    # a burst of failures from the same episode only backs off once
+    backed_off_limit = limiter.limit
+    limiter.record_failure()
+    assert limiter.limit == backed_off_limit
+
+    stats = limiter.get_stats()
+    assert stats.successes == 20
+    assert stats.failures == 2
+    assert stats.latency_p50_seconds == 0.1
+
+
+def test_limiter_does_not_grow_on_slow_requests():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=100)
+
+    for _ in range(20):
+        limiter.record_success(0.1)
+
+    limit = limiter.get_stats().limit
+    limiter.record_success(1.0)
+
+    assert limiter.get_stats().limit == limit
+
+
+def test_fixed_limiter_caps_concurrency():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=2, max_limit=2)
+    in_flight = 0
+    max_in_flight = 0
+
+    async def task():
+        nonlocal in_flight, max_in_flight
+
+        async with limiter:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            limiter.record_failure()
+            in_flight -= 1
+
+    async def run():
+        await asyncio.gather(*[task() for _ in range(10)])
+
+    asyncio.run(run())
+
+    assert max_in_flight == 2
+    assert limiter.limit == 2
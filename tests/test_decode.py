@@ -1,4 +1,8 @@
+import pickle
+
 import pydantic
+from eth_abi import decode_abi
+from eth_abi.exceptions import NonEmptyPaddingBytes
 
 from mev_inspect import decode
 from mev_inspect.schemas import abi
@@ -67,3 +71,94 @@ def test_decode_function_with_tuple_argument():
     assert call_data.function_name == test_function_name
     assert call_data.function_signature == "testFunction((uint256))"
     assert call_data.inputs == {test_tuple_name: (1,)}
+
+
+def test_decode_function_lazily():
+    test_function_name = "testFunction"
+    test_parameter_name = "testParameter"
+    test_abi = pydantic.parse_obj_as(
+        abi.ABI,
+        [
+            {
+                "name": test_function_name,
+                "type": "function",
+                "inputs": [{"name": test_parameter_name, "type": "uint256"}],
+            }
+        ],
+    )
+    test_function_selector = "350c530b"
+    test_function_argument = (
+        "0000000000000000000000000000000000000000000000000000000000000001"
+    )
+    abi_decoder = decode.ABIDecoder(test_abi)
+    call_data = abi_decoder.decode_lazily(
+        "0x" + test_function_selector + test_function_argument
+    )
+    assert call_data.function_name == test_function_name
+    assert call_data.function_signature == "testFunction(uint256)"
+    assert not call_data.inputs.is_decoded
+
+    assert call_data.inputs == {test_parameter_name: 1}
+    assert call_data.inputs.is_decoded
+
+    # too short to hold the argument
+    assert abi_decoder.decode_lazily("0x" + test_function_selector) is None
+
+    # pickled inputs, like those sent back from analysis workers, stay lazy
+    call_data = abi_decoder.decode_lazily(
+        "0x" + test_function_selector + test_function_argument
+    )
+    unpickled_inputs = pickle.loads(pickle.dumps(call_data.inputs))
+    assert not call_data.inputs.is_decoded
+    assert not unpickled_inputs.is_decoded
+    assert unpickled_inputs == {test_parameter_name: 1}
+
+
+def test_static_decoding_matches_eth_abi():
+    types = ["address", "bool", "uint8", "uint256", "int24", "int256", "bytes4"]
+    test_abi = pydantic.parse_obj_as(
+        abi.ABI,
+        [
+            {
+                "name": "testFunction",
+                "type": "function",
+                "inputs": [
+                    {"name": f"input{i}", "type": type_str}
+                    for i, type_str in enumerate(types)
+                ],
+            }
+        ],
+    )
+    abi_decoder = decode.ABIDecoder(test_abi)
+    [selector] = abi_decoder.get_selectors()
+
+    words = [
+        "00" * 12 + "ab" * 20,
+        "00" * 31 + "01",
+        "00" * 31 + "ff",
+        "ff" * 32,
+        "ff" * 29 + "800000",
+        "80" + "00" * 31,
+        "12345678" + "00" * 28,
+    ]
+
+    # each word is valid for its own type, and most are invalid for the others
+    for shift in range(len(words)):
+        shifted_words = words[shift:] + words[:shift]
+        params = "".join(shifted_words)
+
+        try:
+            expected_inputs = {
+                f"input{i}": value
+                for i, value in enumerate(
+                    decode_abi(types, bytes.fromhex(params))  # type: ignore
+                )
+            }
+        except NonEmptyPaddingBytes:
+            expected_inputs = None
+
+        call_data = abi_decoder.decode(selector + params)
+        assert (None if call_data is None else call_data.inputs) == expected_inputs
+
+    # too short
+    assert abi_decoder.decode(selector + "".join(words)[:-2]) is None
@@ -0,0 +1,38 @@
+from mev_inspect.decode_cache import DecodeCache
+from mev_inspect.schemas.call_data import CallData
+
+
+def test_decode_cache_reuses_and_evicts_least_recently_used():
+    decoded_data = []
+
+    def decode(data):
+        decoded_data.append(data)
+        return CallData(
+            function_name="transfer",
+            function_signature="transfer(address,uint256)",
+            inputs={"data": data},
+        )
+
+    decode_cache = DecodeCache(max_entries=2)
+
+    first_call_data = decode_cache.get_or_decode("ERC20", "0x01", decode)
+    assert decode_cache.get_or_decode("ERC20", "0x01", decode) == first_call_data
+    assert decoded_data == ["0x01"]
+
+    # same calldata, different ABI
+    decode_cache.get_or_decode("UniswapV2Pair", "0x01", decode)
+    assert decoded_data == ["0x01", "0x01"]
+
+    # evicts ("UniswapV2Pair", "0x01"), as ("ERC20", "0x01") was read more recently
+    decode_cache.get_or_decode("ERC20", "0x01", decode)
+    decode_cache.get_or_decode("ERC20", "0x02", decode)
+    decode_cache.get_or_decode("ERC20", "0x01", decode)
+    decode_cache.get_or_decode("UniswapV2Pair", "0x01", decode)
+    assert decoded_data == ["0x01", "0x01", "0x02", "0x01"]
+
+    stats = decode_cache.get_stats()
+    assert stats.hits == 3
+    assert stats.misses == 4
+    assert stats.hit_rate == 3 / 7
+    assert stats.entries == 2
+    assert stats.size_bytes > 0
@@ -0,0 +1,57 @@
+import asyncio
+
+from mev_inspect.fees import MAX_FEE_HISTORY_BLOCK_COUNT, fetch_base_fees_per_gas
+
+# what a node returns for the block after the newest one asked for
+NEXT_BLOCK_BASE_FEE_PER_GAS = -1
+
+
+def _get_base_fee_per_gas(block_number: int) -> int:
+    return 1000 * block_number
+
+
+class _FakeEth:
+    def __init__(self):
+        self.fee_history_calls = []
+
+    async def fee_history(self, block_count, newest_block):
+        self.fee_history_calls.append((block_count, newest_block))
+        oldest_block = newest_block - block_count + 1
+
+        return {
+            "oldestBlock": oldest_block,
+            "baseFeePerGas": [
+                _get_base_fee_per_gas(block_number)
+                for block_number in range(oldest_block, newest_block + 1)
+            ]
+            + [NEXT_BLOCK_BASE_FEE_PER_GAS],
+        }
+
+
+class _FakeWeb3:
+    def __init__(self):
+        self.eth = _FakeEth()
+
+
+def test_fetch_base_fees_per_gas_across_fee_history_batches():
+    w3 = _FakeWeb3()
+    after_block_number = 1000
+    before_block_number = after_block_number + MAX_FEE_HISTORY_BLOCK_COUNT + 100
+
+    base_fees_per_gas = asyncio.run(
+        fetch_base_fees_per_gas(
+            w3, after_block_number, before_block_number  # type: ignore
+        )
+    )
+
+    assert w3.eth.fee_history_calls == [
+        (
+            MAX_FEE_HISTORY_BLOCK_COUNT,
+            after_block_number + MAX_FEE_HISTORY_BLOCK_COUNT - 1,
+        ),
+        (100, before_block_number - 1),
+    ]
+    assert base_fees_per_gas == {
+        block_number: _get_base_fee_per_gas(block_number)
+        for block_number in range(after_block_number, before_block_number)
+    }
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import time
+
+import websockets
+
+from mev_inspect.heads import SubscriptionHeadSource
+
+POLLED_BLOCK_NUMBER = 5
+
+
+class FakeBaseProvider:
+    def __init__(self):
+        self.requests = 0
+
+    async def make_request(self, method, params):  # pylint: disable=unused-argument
+        self.requests += 1
+        return {"result": {"number": hex(POLLED_BLOCK_NUMBER)}}
+
+
+async def _serve_new_heads(block_numbers):
+    heads_sent = asyncio.Event()
+
+    async def handler(websocket, path=None):  # pylint: disable=unused-argument
+        request = json.loads(await websocket.recv())
+        assert request["method"] == "eth_subscribe"
+        assert request["params"] == ["newHeads"]
+
+        await websocket.send(
+            json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": "0xabc"})
+        )
+
+        for block_number in block_numbers:
+            await websocket.send(
+                json.dumps(
+                    {
+                        "jsonrpc": "2.0",
+                        "method": "eth_subscription",
+                        "params": {
+                            "subscription": "0xabc",
+                            "result": {"number": hex(block_number)},
+                        },
+                    }
+                )
+            )
+
+        heads_sent.set()
+        await websocket.wait_closed()
+
+    server = await websockets.serve(handler, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    return server, f"ws://127.0.0.1:{port}", heads_sent
+
+
+def test_subscription_head_source_follows_new_heads():
+    async def run():
+        server, ws_url, heads_sent = await _serve_new_heads([100, 101])
+        base_provider = FakeBaseProvider()
+        head_source = SubscriptionHeadSource(
+            ws_url,
+            base_provider,
+            poll_interval_seconds=10,
+        )
+
+        await head_source.start()
+        await asyncio.wait_for(heads_sent.wait(), timeout=5)
+
+        start = time.monotonic()
+        await head_source.wait_for_new_head()
+        waited_seconds = time.monotonic() - start
+
+        latest_block_number = await head_source.get_latest_block_number()
+
+        await head_source.stop()
+        server.close()
+        await server.wait_closed()
+
+        return latest_block_number, waited_seconds, base_provider.requests
+
+    latest_block_number, waited_seconds, polled_requests = asyncio.run(run())
+
+    assert latest_block_number == 101
+    assert waited_seconds < 5
+    assert polled_requests == 0
+
+
+def test_subscription_head_source_falls_back_to_polling():
+    async def run():
+        server, ws_url, _ = await _serve_new_heads([])
+        server.close()
+        await server.wait_closed()
+
+        base_provider = FakeBaseProvider()
+        head_source = SubscriptionHeadSource(
+            ws_url,
+            base_provider,
+            poll_interval_seconds=0.01,
+        )
+
+        await head_source.start()
+        await head_source.wait_for_new_head()
+        latest_block_number = await head_source.get_latest_block_number()
+        is_subscribed = head_source.is_subscribed
+        await head_source.stop()
+
+        return latest_block_number, is_subscribed, base_provider.requests
+
+    latest_block_number, is_subscribed, polled_requests = asyncio.run(run())
+
+    assert latest_block_number == POLLED_BLOCK_NUMBER
+    assert not is_subscribed
+    assert polled_requests == 1
@@ -0,0 +1,58 @@
+import asyncio
+
+from mev_inspect.hedging import MIN_LATENCY_SAMPLES, RequestHedger
+
+
+def test_slow_request_is_hedged_and_first_response_wins():
+    requests = 0
+    cancelled_requests = 0
+
+    async def make_request(method, params):  # pylint: disable=unused-argument
+        nonlocal requests, cancelled_requests
+        requests += 1
+
+        # the first request hangs, the hedge answers straight away
+        try:
+            await asyncio.sleep(10 if requests == 1 else 0)
+        except asyncio.CancelledError:
+            cancelled_requests += 1
+            raise
+
+        return {"result": requests}
+
+    async def run():
+        hedger = RequestHedger(percentile=50)
+        for _ in range(MIN_LATENCY_SAMPLES):
+            hedger._latencies_by_method[  # pylint: disable=protected-access
+                "trace_block"
+            ].append(0.01)
+
+        middleware = await hedger.rpc_middleware(make_request, None)  # type: ignore
+        response = await asyncio.wait_for(middleware("trace_block", ["0x1"]), 1)
+        await asyncio.sleep(0)
+
+        return response, hedger.get_stats()
+
+    response, stats = asyncio.run(run())
+
+    assert response == {"result": 2}
+    assert cancelled_requests == 1
+    assert stats.requests == 1
+    assert stats.hedged_requests == 1
+    assert stats.hedge_wins == 1
+
+
+def test_only_hedged_methods_are_hedged():
+    async def make_request(method, params):  # pylint: disable=unused-argument
+        return {"result": method}
+
+    async def run():
+        hedger = RequestHedger()
+        middleware = await hedger.rpc_middleware(make_request, None)  # type: ignore
+        await middleware("eth_blockNumber", [])
+        return hedger.get_stats()
+
+    stats = asyncio.run(run())
+
+    assert stats.requests == 0
+    assert stats.hedge_delay_seconds_by_method == {}
@@ -0,0 +1,98 @@
+import asyncio
+from unittest.mock import MagicMock
+
+from mev_inspect import inspect_block
+from mev_inspect.block_store import BlockStore
+
+from .utils import load_test_block
+
+
+def _stub_blocks(block_numbers):
+    block = load_test_block(12775690)
+    return [
+        block.copy(update={"block_number": block_number})
+        for block_number in block_numbers
+    ]
+
+
+def test_get_blocks_yields_cached_and_fetched_blocks_in_order(tmp_path, monkeypatch):
+    cached_block_numbers = [100, 103, 104, 108]
+    block_store = BlockStore(directory=str(tmp_path))
+    block_store.write_blocks(_stub_blocks(cached_block_numbers))
+
+    fetched_block_numbers = []
+
+    async def create_from_block_numbers(
+        w3, block_numbers, trace_db_session, rpc_batch_size
+    ):  # pylint: disable=unused-argument
+        fetched_block_numbers.extend(block_numbers)
+        # later batches come back first
+        await asyncio.sleep(0.01 * (110 - block_numbers[0]) / 10)
+        return _stub_blocks(block_numbers)
+
+    monkeypatch.setattr(
+        inspect_block, "create_from_block_numbers", create_from_block_numbers
+    )
+
+    async def run():
+        return [
+            block.block_number
+            async for block in inspect_block._get_blocks(
+                None, 100, 110, None, 2, 2, None, block_store, None, None
+            )
+        ]
+
+    assert asyncio.run(run()) == list(range(100, 110))
+    assert sorted(fetched_block_numbers) == [101, 102, 105, 106, 107, 109]
+
+
+def test_prefetching_is_bounded_and_inspects_every_block_once(
+    trace_classifier, monkeypatch
+):
+    prefetch_depth = 2
+    fetches_in_flight = 0
+    max_fetches_in_flight = 0
+    inspected_block_numbers = []
+
+    async def create_from_block_numbers(
+        w3, block_numbers, trace_db_session, rpc_batch_size
+    ):  # pylint: disable=unused-argument
+        nonlocal fetches_in_flight, max_fetches_in_flight
+        fetches_in_flight += 1
+        max_fetches_in_flight = max(max_fetches_in_flight, fetches_in_flight)
+
+        await asyncio.sleep(0.01)
+
+        fetches_in_flight -= 1
+        return [
+            block.copy(update={"traces": [], "receipts": []})
+            for block in _stub_blocks(block_numbers)
+        ]
+
+    inspect_block_data = inspect_block._inspect_block_data
+
+    def record_inspect_block_data(classifier, block):
+        inspected_block_numbers.append(block.block_number)
+        return inspect_block_data(classifier, block)
+
+    monkeypatch.setattr(
+        inspect_block, "create_from_block_numbers", create_from_block_numbers
+    )
+    monkeypatch.setattr(inspect_block, "_inspect_block_data", record_inspect_block_data)
+
+    asyncio.run(
+        inspect_block.inspect_many_blocks(
+            MagicMock(),
+            None,
+            trace_classifier,
+            100,
+            120,
+            None,
+            rpc_batch_size=1,
+            prefetch_depth=prefetch_depth,
+        )
+    )
+
+    # the batch being waited on, and prefetch_depth more behind it
+    assert max_fetches_in_flight == prefetch_depth + 1
+    assert inspected_block_numbers == list(range(100, 120))
@@ -0,0 +1,46 @@
+import json
+
+import orjson
+
+from mev_inspect.raw_rpc import loads, parse_receipts, parse_traces
+from mev_inspect.schemas.receipts import Receipt
+from mev_inspect.schemas.traces import Trace
+
+from .utils import load_test_block, to_raw_rpc_receipts, to_raw_rpc_traces
+
+
+def test_parse_traces_matches_validated_traces():
+    block = load_test_block(12914944)
+
+    traces_json = loads(to_raw_rpc_traces(block))
+    traces = parse_traces(traces_json)
+
+    assert traces == [Trace(**trace_json) for trace_json in traces_json]
+    assert traces == block.traces
+
+
+def test_parse_receipts_matches_validated_receipts():
+    block = load_test_block(12914944)
+
+    receipts_json = loads(to_raw_rpc_receipts(block))
+    receipts = parse_receipts(receipts_json)
+
+    assert receipts == [Receipt(**receipt_json) for receipt_json in receipts_json]
+    assert receipts == block.receipts
+
+
+def test_orjson_and_json_parse_payloads_the_same():
+    block = load_test_block(12914944)
+
+    # orjson is a declared dependency, so the fast path is the one used
+    assert loads is orjson.loads
+
+    for raw_response, parse, expected in [
+        (to_raw_rpc_traces(block), parse_traces, block.traces),
+        (to_raw_rpc_receipts(block), parse_receipts, block.receipts),
+    ]:
+        orjson_payload = orjson.loads(raw_response)
+        json_payload = json.loads(raw_response)
+
+        assert orjson_payload == json_payload
+        assert parse(orjson_payload) == parse(json_payload) == expected
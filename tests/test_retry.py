@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+from aiohttp.client_exceptions import ClientResponseError
+
+from mev_inspect import retry
+from mev_inspect.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    RetryPolicy,
+    get_retry_after_seconds,
+    http_retry_with_backoff_request_middleware,
+)
+
+
+def _rate_limited_error(retry_after: str) -> ClientResponseError:
+    return ClientResponseError(
+        None, (), status=429, headers={"Retry-After": retry_after}  # type: ignore
+    )
+
+
+def test_get_retry_after_seconds():
+    assert get_retry_after_seconds(_rate_limited_error("2")) == 2
+    assert get_retry_after_seconds(_rate_limited_error("3600")) == 60
+    assert get_retry_after_seconds(_rate_limited_error("not a date")) is None
+    assert get_retry_after_seconds(ValueError()) is None
+
+
+def test_circuit_breaker_fails_fast_until_trial_succeeds():
+    circuit_breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0)
+
+    circuit_breaker.record_failure()
+    circuit_breaker.before_request()
+    circuit_breaker.record_failure()
+
+    # only one trial request is let through once the circuit resets
+    circuit_breaker.before_request()
+    with pytest.raises(CircuitOpenError):
+        circuit_breaker.before_request()
+
+    circuit_breaker.record_success()
+    circuit_breaker.before_request()
+
+
+def test_retries_are_capped_by_retry_budget():
+    requests = 0
+
+    async def make_request(method, params):  # pylint: disable=unused-argument
+        nonlocal requests
+        requests += 1
+        raise _rate_limited_error("0")
+
+    async def run():
+        retry_policy = RetryPolicy()
+        retry_policy.retry_budget = RetryBudget(initial_budget=1)
+
+        middleware = await http_retry_with_backoff_request_middleware(
+            make_request, None, retry_policy=retry_policy  # type: ignore
+        )
+
+        with pytest.raises(ClientResponseError):
+            await middleware("trace_block", ["0x1"])
+
+    asyncio.run(run())
+
+    # the first request, plus the one retry the budget allows
+    assert requests == 2
+
+
+def test_cancelled_trial_lets_another_request_be_the_trial():
+    async def make_request(method, params):  # pylint: disable=unused-argument
+        await asyncio.sleep(10)
+
+    async def run():
+        retry_policy = RetryPolicy()
+        retry_policy.circuit_breaker = CircuitBreaker(
+            failure_threshold=1, reset_seconds=0
+        )
+        retry_policy.circuit_breaker.record_failure()
+
+        middleware = await http_retry_with_backoff_request_middleware(
+            make_request, None, retry_policy=retry_policy  # type: ignore
+        )
+
+        trial = asyncio.ensure_future(middleware("eth_blockNumber", []))
+        await asyncio.sleep(0)
+        assert retry_policy.circuit_breaker.is_open()
+
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        assert not retry_policy.circuit_breaker.is_open()
+
+    asyncio.run(run())
+
+
+def test_retry_after_replaces_backoff(monkeypatch):
+    sleeps = []
+    responses = [_rate_limited_error("0"), {"result": "0x1"}]
+
+    async def make_request(method, params):  # pylint: disable=unused-argument
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    async def run():
+        middleware = await http_retry_with_backoff_request_middleware(
+            make_request, None, retry_policy=RetryPolicy()  # type: ignore
+        )
+
+        monkeypatch.setattr(retry.asyncio, "sleep", sleep)
+        return await middleware("trace_block", ["0x1"])
+
+    assert asyncio.run(run()) == {"result": "0x1"}
+    assert sleeps == []
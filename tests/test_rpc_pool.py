@@ -0,0 +1,165 @@
+import asyncio
+import time
+
+import pytest
+
+from mev_inspect.retry import CIRCUIT_BREAKER_FAILURE_THRESHOLD, CircuitOpenError
+from mev_inspect.rpc_pool import (
+    MAX_CONSECUTIVE_ERRORS,
+    NODE_UNAVAILABLE_ERROR_CODES,
+    RPCPoolProvider,
+)
+
+
+class _FakeProvider:
+    def __init__(
+        self,
+        latency_seconds: float = 0.0,
+        fail: bool = False,
+        error_code: int = min(NODE_UNAVAILABLE_ERROR_CODES),
+    ):
+        self.latency_seconds = latency_seconds
+        self.fail = fail
+        self.error_code = error_code
+        self.requests = 0
+
+    async def make_request(self, method, params):  # pylint: disable=unused-argument
+        self.requests += 1
+        await asyncio.sleep(self.latency_seconds)
+
+        if self.fail:
+            return {"jsonrpc": "2.0", "id": 1, "error": {"code": self.error_code}}
+
+        return {"jsonrpc": "2.0", "id": 1, "result": "0x1"}
+
+
+def _make_pool(*fake_providers: _FakeProvider) -> RPCPoolProvider:
+    pool = RPCPoolProvider(
+        [f"http://node-{i}:8545" for i in range(len(fake_providers))]
+    )
+
+    # pylint: disable=protected-access
+    for endpoint, fake_provider in zip(pool._endpoints, fake_providers):
+        endpoint.provider = fake_provider  # type: ignore
+
+    return pool
+
+
+def _make_requests(pool: RPCPoolProvider, count: int) -> None:
+    async def make_requests():
+        for _ in range(count):
+            await pool.make_request("eth_blockNumber", [])  # type: ignore
+
+    asyncio.run(make_requests())
+
+
+def test_requests_go_to_the_fastest_endpoint():
+    fast_provider = _FakeProvider(latency_seconds=0)
+    slow_provider = _FakeProvider(latency_seconds=0.05)
+    pool = _make_pool(slow_provider, fast_provider)
+
+    _make_requests(pool, 10)
+
+    # each is tried once before it has a latency to go on
+    assert slow_provider.requests == 1
+    assert fast_provider.requests == 9
+
+
+def test_error_responses_eject_an_endpoint_until_it_recovers():
+    failing_provider = _FakeProvider(fail=True)
+    healthy_provider = _FakeProvider(latency_seconds=0.01)
+    pool = _make_pool(failing_provider, healthy_provider)
+
+    _make_requests(pool, 20)
+
+    failing_stats, healthy_stats = pool.get_endpoint_stats()
+    assert failing_provider.requests == MAX_CONSECUTIVE_ERRORS
+    assert failing_stats.errors == MAX_CONSECUTIVE_ERRORS
+    assert failing_stats.is_ejected
+    assert healthy_stats.errors == 0
+
+    # once its ejection runs out, it's tried again
+    failing_provider.fail = False
+    failing_endpoint = pool._endpoints[0]  # pylint: disable=protected-access
+    failing_endpoint.ejected_until = time.monotonic()
+
+    _make_requests(pool, 20)
+
+    assert failing_provider.requests > MAX_CONSECUTIVE_ERRORS
+    assert not pool.get_endpoint_stats()[0].is_ejected
+    assert failing_endpoint.ejections == 0
+
+
+def test_ordinary_error_responses_dont_eject_an_endpoint():
+    # like a reverted call or a block the node hasn't seen
+    erroring_provider = _FakeProvider(fail=True, error_code=-32000)
+    pool = _make_pool(erroring_provider)
+
+    _make_requests(pool, 2 * MAX_CONSECUTIVE_ERRORS)
+
+    (stats,) = pool.get_endpoint_stats()
+    assert stats.errors == 0
+    assert not stats.is_ejected
+
+    async def post_batch():
+        return [
+            {"jsonrpc": "2.0", "id": 1, "result": "0x1"},
+            {"jsonrpc": "2.0", "id": 2, "error": {"code": -32000}},
+        ]
+
+    async def make_batch_requests():
+        # pylint: disable=protected-access
+        for _ in range(2 * MAX_CONSECUTIVE_ERRORS):
+            await pool._route(lambda endpoint: post_batch())
+
+    asyncio.run(make_batch_requests())
+
+    (stats,) = pool.get_endpoint_stats()
+    assert stats.errors == 0
+    assert not stats.is_ejected
+
+
+def test_endpoint_back_first_is_used_when_everything_is_ejected():
+    first_provider = _FakeProvider(fail=True)
+    second_provider = _FakeProvider(fail=True)
+    pool = _make_pool(first_provider, second_provider)
+
+    _make_requests(pool, 2 * MAX_CONSECUTIVE_ERRORS)
+
+    assert all(stats.is_ejected for stats in pool.get_endpoint_stats())
+
+    # pylint: disable=protected-access
+    first_endpoint, second_endpoint = pool._endpoints
+    second_endpoint.ejected_until = first_endpoint.ejected_until - 1
+
+    second_provider.fail = False
+    _make_requests(pool, 1)
+
+    assert first_provider.requests == MAX_CONSECUTIVE_ERRORS
+    assert second_provider.requests == MAX_CONSECUTIVE_ERRORS + 1
+
+
+def test_circuit_breakers_are_kept_per_endpoint():
+    first_provider = _FakeProvider()
+    second_provider = _FakeProvider()
+    pool = _make_pool(first_provider, second_provider)
+
+    # pylint: disable=protected-access
+    first_endpoint, second_endpoint = pool._endpoints
+    for _ in range(CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+        first_endpoint.circuit_breaker.record_failure()
+
+    _make_requests(pool, 5)
+
+    assert first_provider.requests == 0
+    assert second_provider.requests == 5
+    assert [stats.is_circuit_open for stats in pool.get_endpoint_stats()] == [
+        True,
+        False,
+    ]
+
+    for _ in range(CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+        second_endpoint.circuit_breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        _make_requests(pool, 1)
@@ -5,11 +5,11 @@ from mev_inspect.swaps import get_swaps
 from .utils import load_test_block, load_test_sandwiches
 
 
-def test_arbitrage_real_block():
+def test_arbitrage_real_block(registry_path):
     block = load_test_block(12775690)
     expected_sandwiches = load_test_sandwiches(12775690)
 
-    trace_classifier = TraceClassifier()
+    trace_classifier = TraceClassifier(registry_path=registry_path)
     classified_traces = trace_classifier.classify(block.traces)
 
     swaps = get_swaps(classified_traces)
@@ -0,0 +1,87 @@
+import json
+import struct
+
+from mev_inspect import trace_archive as trace_archive_module
+from mev_inspect.trace_archive import (
+    HEADER_LENGTH_FORMAT,
+    MAGIC,
+    TraceArchive,
+    write_trace_archive,
+)
+
+from .utils import load_test_block
+
+ARCHIVED_BLOCK_NUMBERS = [10921991, 11930296, 11931272, 12483198, 12775690]
+
+
+def test_trace_archive_round_trip(tmp_path):
+    blocks = [load_test_block(block_number) for block_number in ARCHIVED_BLOCK_NUMBERS]
+    archive_path = str(tmp_path / "blocks.arc")
+
+    write_trace_archive(archive_path, blocks)
+
+    with TraceArchive(archive_path) as trace_archive:
+        assert trace_archive.block_numbers == ARCHIVED_BLOCK_NUMBERS
+        assert trace_archive.find_block(ARCHIVED_BLOCK_NUMBERS[0] - 1) is None
+
+        for block in blocks:
+            assert trace_archive.find_block(block.block_number) == block
+
+
+def test_trace_archive_find_blocks_in_range(tmp_path):
+    block = load_test_block(12775690)
+    archive_path = str(tmp_path / "blocks.arc")
+
+    write_trace_archive(archive_path, [block])
+
+    with TraceArchive(archive_path) as trace_archive:
+        assert trace_archive.find_blocks(
+            block.block_number - 1, block.block_number + 2
+        ) == {block.block_number: block}
+
+
+def test_trace_archive_round_trips_a_missing_miner(tmp_path):
+    block = load_test_block(12775690).copy(update={"miner": None})
+    archive_path = str(tmp_path / "blocks.arc")
+
+    write_trace_archive(archive_path, [block])
+
+    with TraceArchive(archive_path) as trace_archive:
+        assert trace_archive.find_block(block.block_number) == block
+
+
+def test_trace_archive_columns_are_little_endian(tmp_path):
+    block = load_test_block(12775690)
+    archive_path = str(tmp_path / "blocks.arc")
+
+    write_trace_archive(archive_path, [block])
+
+    with open(archive_path, "rb") as archive_file:
+        data = archive_file.read()
+
+    header_start = len(MAGIC) + struct.calcsize(HEADER_LENGTH_FORMAT)
+    (header_length,) = struct.unpack_from(HEADER_LENGTH_FORMAT, data, len(MAGIC))
+    header = json.loads(data[header_start : header_start + header_length])
+    offset, length, _ = header["columns"]["blocks.block_number"]
+    column_start = header_start + header_length + offset
+
+    assert data[column_start : column_start + length] == struct.pack(
+        "<Q", block.block_number
+    )
+
+
+def test_trace_archive_round_trip_on_a_host_of_the_other_byte_order(
+    tmp_path, monkeypatch
+):
+    blocks = [load_test_block(block_number) for block_number in ARCHIVED_BLOCK_NUMBERS]
+    archive_path = str(tmp_path / "blocks.arc")
+
+    # columns are swapped on write and read, just as on a big-endian host
+    monkeypatch.setattr(trace_archive_module, "COLUMN_BYTE_ORDER", "big")
+    write_trace_archive(archive_path, blocks)
+
+    with TraceArchive(archive_path) as trace_archive:
+        assert trace_archive.block_numbers == ARCHIVED_BLOCK_NUMBERS
+
+        for block in blocks:
+            assert trace_archive.find_block(block.block_number) == block
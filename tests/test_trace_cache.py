@@ -0,0 +1,138 @@
+import asyncio
+import threading
+
+from mev_inspect import trace_cache
+from mev_inspect.trace_cache import (
+    WARM_BATCH_SIZE,
+    TraceCacheWriter,
+    warm_trace_cache,
+)
+
+from .utils import load_test_block
+
+
+class FailingSession:
+    def __init__(self):
+        self.rollbacks = 0
+
+    def execute(self, *args, **kwargs):
+        raise ConnectionError("Trace DB is down")
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class StubSession:
+    def __init__(self):
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_trace_cache_writer_counts_failed_blocks():
+    session = FailingSession()
+    trace_cache_writer = TraceCacheWriter(lambda: session, batch_size=1)
+
+    async def write_blocks():
+        trace_cache_writer.add([load_test_block(12775690)])
+        trace_cache_writer.add([load_test_block(12483198)])
+        await trace_cache_writer.flush()
+
+    asyncio.run(write_blocks())
+
+    assert trace_cache_writer.failed_blocks == 2
+    assert session.rollbacks == 2
+
+
+def test_warm_trace_cache(monkeypatch):
+    block = load_test_block(12775690).copy(update={"traces": [], "receipts": []})
+    before_block_number = 2 * WARM_BATCH_SIZE + 200
+    rpc_batch_size = 100
+    writer_session = StubSession()
+
+    find_cached_ranges = []
+    fetched_batches = []
+    written_block_numbers = []
+    second_batch_fetching = threading.Event()
+    first_write_overlapped = []
+
+    def find_cached_block_numbers(
+        trace_db_session, after_block_number, before_block_number
+    ):  # pylint: disable=unused-argument
+        find_cached_ranges.append((after_block_number, before_block_number))
+        return {
+            block_number
+            for block_number in range(after_block_number, before_block_number)
+            if block_number % 10 == 0
+        }
+
+    async def create_from_block_numbers(
+        w3, block_numbers, trace_db_session, rpc_batch_size
+    ):  # pylint: disable=unused-argument
+        fetched_batches.append(block_numbers)
+        if block_numbers[0] >= WARM_BATCH_SIZE:
+            second_batch_fetching.set()
+
+        await asyncio.sleep(0)
+        return [
+            block.copy(update={"block_number": block_number})
+            for block_number in block_numbers
+        ]
+
+    def write_raw_blocks(trace_db_session, blocks):  # pylint: disable=unused-argument
+        block_numbers = [block.block_number for block in blocks]
+
+        if block_numbers[0] < WARM_BATCH_SIZE:
+            # the first batch is written while the second is fetched
+            first_write_overlapped.append(second_batch_fetching.wait(timeout=5))
+        elif block_numbers[0] < 2 * WARM_BATCH_SIZE:
+            raise ConnectionError("Trace DB is down")
+
+        written_block_numbers.extend(block_numbers)
+
+    monkeypatch.setattr(
+        trace_cache, "find_cached_block_numbers", find_cached_block_numbers
+    )
+    monkeypatch.setattr(
+        trace_cache, "create_from_block_numbers", create_from_block_numbers
+    )
+    monkeypatch.setattr(trace_cache, "write_raw_blocks", write_raw_blocks)
+
+    failed_blocks = asyncio.run(
+        warm_trace_cache(
+            None,  # type: ignore
+            None,  # type: ignore
+            lambda: writer_session,
+            0,
+            before_block_number,
+            rpc_batch_size=rpc_batch_size,
+        )
+    )
+
+    assert find_cached_ranges == [
+        (0, WARM_BATCH_SIZE),
+        (WARM_BATCH_SIZE, 2 * WARM_BATCH_SIZE),
+        (2 * WARM_BATCH_SIZE, before_block_number),
+    ]
+
+    missing_block_numbers = [
+        block_number
+        for block_number in range(before_block_number)
+        if block_number % 10 != 0
+    ]
+    assert sorted(sum(fetched_batches, [])) == missing_block_numbers
+    assert all(
+        len(block_numbers) <= rpc_batch_size for block_numbers in fetched_batches
+    )
+
+    assert first_write_overlapped == [True]
+    assert sorted(written_block_numbers) == [
+        block_number
+        for block_number in missing_block_numbers
+        if not WARM_BATCH_SIZE <= block_number < 2 * WARM_BATCH_SIZE
+    ]
+
+    # the second batch failed to write
+    assert failed_blocks == WARM_BATCH_SIZE * 9 // 10
+    assert writer_session.rollbacks == 1
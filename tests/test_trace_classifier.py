@@ -0,0 +1,102 @@
+import os
+
+from mev_inspect.abi import get_abi
+from mev_inspect.classifiers.specs import ALL_CLASSIFIER_SPECS
+from mev_inspect.classifiers.trace import TraceClassifier
+from mev_inspect.decode import ABIDecoder
+from mev_inspect.schemas.blocks import CallAction
+from mev_inspect.schemas.traces import CallTrace, DecodedCallTrace, Trace, TraceType
+
+from .utils import TEST_BLOCKS_DIRECTORY, load_test_block
+
+
+def _find_first_decoding_spec(decoders_by_abi_name, action: CallAction):
+    for spec in ALL_CLASSIFIER_SPECS:
+        if spec.valid_contract_addresses is not None and action.to not in {
+            address.lower() for address in spec.valid_contract_addresses
+        }:
+            continue
+
+        if decoders_by_abi_name[spec.abi_name].decode(action.input) is not None:
+            return spec
+
+    return None
+
+
+def test_indexed_dispatch_matches_scanning_every_spec(trace_classifier):
+    decoders_by_abi_name = {
+        spec.abi_name: ABIDecoder(get_abi(spec.abi_name, spec.protocol))
+        for spec in ALL_CLASSIFIER_SPECS
+    }
+
+    for file_name in sorted(os.listdir(TEST_BLOCKS_DIRECTORY)):
+        block = load_test_block(int(file_name[: -len(".json")]))
+        call_traces = [trace for trace in block.traces if trace.type == TraceType.call]
+
+        for trace, classified_trace in zip(
+            call_traces, trace_classifier.classify(call_traces)
+        ):
+            spec = _find_first_decoding_spec(
+                decoders_by_abi_name, CallAction(**trace.action)
+            )
+
+            if spec is None:
+                assert not isinstance(classified_trace, DecodedCallTrace)
+            else:
+                assert isinstance(classified_trace, DecodedCallTrace)
+                assert classified_trace.abi_name == spec.abi_name
+                assert classified_trace.protocol == spec.protocol
+
+
+def test_constructed_traces_match_validated_traces(trace_classifier, registry_path):
+    validating_trace_classifier = TraceClassifier(
+        validate_traces=True, registry_path=registry_path
+    )
+
+    for file_name in sorted(os.listdir(TEST_BLOCKS_DIRECTORY)):
+        block = load_test_block(int(file_name[: -len(".json")]))
+
+        for validated_trace, constructed_trace in zip(
+            validating_trace_classifier.classify(block.traces),
+            trace_classifier.classify(block.traces),
+        ):
+            assert type(constructed_trace) is type(validated_trace)
+            assert constructed_trace.dict() == validated_trace.dict()
+            assert constructed_trace.__fields_set__ == validated_trace.__fields_set__
+
+
+def test_lazy_inputs_that_dont_decode_are_left_empty(registry_path):
+    # an approve whose spender has non-empty padding bytes
+    approve_input = "0x095ea7b3" + "ff" * 32 + "00" * 31 + "01"
+    trace = Trace(
+        action={
+            "from": "0x" + "01" * 20,
+            "to": "0x" + "02" * 20,
+            "input": approve_input,
+            "value": "0x0",
+            "gas": "0x0",
+        },
+        block_hash="0x",
+        block_number=0,
+        result={"gasUsed": "0x0", "output": "0x"},
+        subtraces=0,
+        trace_address=[],
+        transaction_hash="0x",
+        transaction_position=0,
+        type=TraceType.call,
+        error=None,
+    )
+
+    [eager_trace] = TraceClassifier(registry_path=registry_path).classify([trace])
+    [lazy_trace] = TraceClassifier(
+        lazy_inputs=True, registry_path=registry_path
+    ).classify([trace])
+
+    # no spec decodes it, so eagerly it's left as a plain call
+    assert type(eager_trace) is CallTrace
+
+    # lazily the first spec with the selector is taken on trust
+    assert isinstance(lazy_trace, DecodedCallTrace)
+    assert lazy_trace.abi_name == "ERC20"
+    assert lazy_trace.function_signature == "approve(address,uint256)"
+    assert lazy_trace.inputs == {}
@@ -0,0 +1,251 @@
+import asyncio
+
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from mev_inspect import block as block_module
+from mev_inspect.block import find_blocks, find_blocks_async
+from mev_inspect.schemas.utils import to_original_json_dict
+from mev_inspect.trace_db import TraceDBReader
+
+from .utils import load_test_block
+
+
+class InMemoryTraceDBReader(TraceDBReader):
+    def __init__(self, blocks):
+        super().__init__(None)  # type: ignore
+        self._blocks = {block.block_number: block for block in blocks}
+        self.concurrent_lookups = 0
+        self.max_concurrent_lookups = 0
+
+    async def find_block_timestamps(self, after_block_number, before_block_number):
+        await self._lookup()
+        return {n: block.block_timestamp for n, block in self._blocks.items()}
+
+    async def find_base_fees_per_gas(self, after_block_number, before_block_number):
+        await self._lookup()
+        return {n: block.base_fee_per_gas for n, block in self._blocks.items()}
+
+    async def find_blocks_receipts(self, after_block_number, before_block_number):
+        await self._lookup()
+
+        # the last block is missing its receipts
+        return {n: block.receipts for n, block in list(self._blocks.items())[:-1]}
+
+    async def stream_blocks_traces(self, after_block_number, before_block_number):
+        for block_number, block in self._blocks.items():
+            yield block_number, block.traces
+
+    async def _lookup(self):
+        self.concurrent_lookups += 1
+        self.max_concurrent_lookups = max(
+            self.max_concurrent_lookups, self.concurrent_lookups
+        )
+        await asyncio.sleep(0.01)
+        self.concurrent_lookups -= 1
+
+
+def test_find_blocks_async_skips_incomplete_blocks():
+    complete_block = load_test_block(12775690)
+    incomplete_block = load_test_block(12483198)
+    trace_db_reader = InMemoryTraceDBReader([complete_block, incomplete_block])
+
+    blocks = asyncio.run(find_blocks_async(trace_db_reader, 0, 20000000))
+
+    assert list(blocks) == [complete_block.block_number]
+
+    block = blocks[complete_block.block_number]
+    assert block.block_timestamp == complete_block.block_timestamp
+    assert block.base_fee_per_gas == complete_block.base_fee_per_gas
+    assert block.traces == complete_block.traces
+    assert block.receipts == complete_block.receipts
+    assert trace_db_reader.max_concurrent_lookups == 3
+
+
+class InMemoryResult:
+    def __init__(self, rows, yield_per_sizes):
+        self._rows = rows
+        self._yield_per_sizes = yield_per_sizes
+
+    def all(self):
+        return self._rows
+
+    def yield_per(self, size):
+        self._yield_per_sizes.append(size)
+        return iter(self._rows)
+
+
+class InMemoryTraceDBSession:
+    def __init__(self, blocks):
+        self._blocks = blocks
+        self.streamed_tables = []
+        self.yield_per_sizes = []
+
+    def execute(self, query, params, execution_options=None):
+        table_name = query.split(" FROM ")[1].split()[0]
+
+        if execution_options is not None and execution_options.get("stream_results"):
+            self.streamed_tables.append(table_name)
+
+        get_value = {
+            "block_timestamps": lambda block: block.block_timestamp,
+            "base_fee": lambda block: block.base_fee_per_gas,
+            "block_receipts": lambda block: [
+                to_original_json_dict(receipt) for receipt in block.receipts
+            ],
+            "block_traces": lambda block: [
+                to_original_json_dict(trace) for trace in block.traces
+            ],
+        }[table_name]
+
+        return InMemoryResult(
+            [
+                (block.block_number, get_value(block))
+                for block in self._blocks
+                if params["after_block_number"]
+                <= block.block_number
+                < params["before_block_number"]
+            ],
+            self.yield_per_sizes,
+        )
+
+
+def test_find_blocks_groups_streamed_rows_by_block(monkeypatch):
+    blocks = [
+        load_test_block(block_number) for block_number in (11930296, 12483198, 12775690)
+    ]
+    trace_db_session = InMemoryTraceDBSession(blocks)
+
+    monkeypatch.setattr(block_module, "TRACE_DB_STREAM_SIZE", 1)
+    found_blocks = find_blocks(
+        trace_db_session, blocks[0].block_number, blocks[-1].block_number + 1  # type: ignore
+    )
+
+    assert list(found_blocks) == [block.block_number for block in blocks]
+
+    for block in blocks:
+        found_block = found_blocks[block.block_number]
+        assert found_block.block_timestamp == block.block_timestamp
+        assert found_block.base_fee_per_gas == block.base_fee_per_gas
+        assert found_block.traces == block.traces
+        assert found_block.receipts == block.receipts
+
+    # raw traces and receipts are too big to load a range of at once
+    assert trace_db_session.streamed_tables == ["block_receipts", "block_traces"]
+    assert trace_db_session.yield_per_sizes == [1, 1]
+
+
+class RecordingResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def one_or_none(self):
+        return self._rows[0] if self._rows else None
+
+    def all(self):
+        return self._rows
+
+    async def partitions(self, size):
+        for start in range(0, len(self._rows), size):
+            yield self._rows[start : start + size]
+
+
+class RecordingConnection:
+    def __init__(self, engine):
+        self._engine = engine
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def execute(self, statement, params):
+        return self._engine.record(statement, params)
+
+    async def stream(self, statement, params):
+        return self._engine.record(statement, params)
+
+
+class RecordingEngine:
+    """Compiles each query the way asyncpg is sent it, and records it"""
+
+    def __init__(self):
+        self.rows = []
+        self.queries = []
+
+    def connect(self):
+        return RecordingConnection(self)
+
+    def record(self, statement, params):
+        compiled = statement.compile(dialect=asyncpg_dialect())
+        bound_params = compiled.construct_params(params)
+
+        self.queries.append(
+            (
+                " ".join(str(compiled).split()),
+                [bound_params[name] for name in compiled.positiontup],
+            )
+        )
+
+        return RecordingResult(self.rows)
+
+
+def test_trace_db_reader_queries():
+    block = load_test_block(12775690)
+    raw_traces = [to_original_json_dict(trace) for trace in block.traces]
+    engine = RecordingEngine()
+    trace_db_reader = TraceDBReader(engine)  # type: ignore
+
+    engine.rows = [(block.block_number, block.block_timestamp)]
+    assert asyncio.run(trace_db_reader.find_block_timestamps(10, 20)) == {
+        block.block_number: block.block_timestamp
+    }
+
+    engine.rows = [(block.block_number, raw_traces)]
+    assert asyncio.run(_collect(trace_db_reader.stream_blocks_traces(10, 20))) == [
+        (block.block_number, block.traces)
+    ]
+
+    engine.rows = [(raw_traces,)]
+    assert asyncio.run(trace_db_reader.find_block_traces(block.block_number)) == (
+        block.traces
+    )
+
+    engine.rows = []
+    assert asyncio.run(trace_db_reader.find_blocks_receipts(10, 20)) == {}
+    assert asyncio.run(trace_db_reader.find_base_fees_per_gas(10, 20)) == {}
+    assert asyncio.run(trace_db_reader.find_base_fee_per_gas(10)) is None
+
+    range_filter = "WHERE block_number >= %s AND block_number < %s"
+    block_filter = "WHERE block_number = %s"
+
+    assert engine.queries == [
+        (
+            f"SELECT block_number, block_timestamp FROM block_timestamps {range_filter}",
+            [10, 20],
+        ),
+        (
+            f"SELECT block_number, raw_traces FROM block_traces {range_filter}",
+            [10, 20],
+        ),
+        (
+            f"SELECT raw_traces FROM block_traces {block_filter}",
+            [block.block_number],
+        ),
+        (
+            f"SELECT block_number, raw_receipts FROM block_receipts {range_filter}",
+            [10, 20],
+        ),
+        (
+            f"SELECT block_number, base_fee_in_wei FROM base_fee {range_filter}",
+            [10, 20],
+        ),
+        (
+            f"SELECT base_fee_in_wei FROM base_fee {block_filter}",
+            [10],
+        ),
+    ]
+
+
+async def _collect(items):
+    return [item async for item in items]
@@ -1,9 +1,16 @@
 from typing import List
 
+from mev_inspect.classifiers.trace import TraceClassifier
 from mev_inspect.schemas.traces import ClassifiedTrace
-from mev_inspect.traces import get_child_traces, is_child_trace_address
+from mev_inspect.traces import (
+    TraceTree,
+    get_child_traces,
+    get_traces_by_transaction_hash,
+    is_child_trace_address,
+)
 
 from .helpers import make_many_unknown_traces
+from .utils import load_test_block
 
 
 def test_is_child_trace_address():
@@ -75,6 +82,33 @@ def test_get_child_traces(get_transaction_hashes):
     )
 
 
+def test_trace_tree_matches_scanning_every_trace(trace_classifier: TraceClassifier):
+    block = load_test_block(13666312)
+    classified_traces = trace_classifier.classify(block.traces)
+
+    for transaction_traces in get_traces_by_transaction_hash(
+        classified_traces
+    ).values():
+        trace_tree = TraceTree(transaction_traces)
+
+        for parent_trace in transaction_traces:
+            expected_child_traces = sorted(
+                (
+                    trace
+                    for trace in transaction_traces
+                    if is_child_trace_address(
+                        trace.trace_address, parent_trace.trace_address
+                    )
+                ),
+                key=lambda trace: trace.trace_address,
+            )
+
+            assert [
+                trace.trace_address
+                for trace in trace_tree.get_child_traces(parent_trace.trace_address)
+            ] == [trace.trace_address for trace in expected_child_traces]
+
+
 def has_expected_child_traces(
     transaction_hash: str,
     parent_trace_address: List[int],
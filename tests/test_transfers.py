@@ -1,5 +1,13 @@
+from mev_inspect.classifiers.trace import TraceClassifier
 from mev_inspect.schemas.transfers import Transfer
-from mev_inspect.transfers import remove_child_transfers_of_transfers
+from mev_inspect.transfers import (
+    TransferIndex,
+    get_transfer,
+    get_transfers,
+    remove_child_transfers_of_transfers,
+)
+
+from .utils import load_test_block
 
 
 def test_remove_child_transfers_of_transfers(get_transaction_hashes, get_addresses):
@@ -67,7 +75,44 @@ def test_remove_child_transfers_of_transfers(get_transaction_hashes, get_address
     assert _equal_ignoring_order(removed_transfers, expected_transfers)
 
 
+def test_transfer_index_matches_getting_each_transfer(
+    trace_classifier: TraceClassifier,
+):
+    block = load_test_block(13666312)
+    classified_traces = trace_classifier.classify(block.traces)
+
+    transfer_index = TransferIndex(classified_traces)
+
+    assert transfer_index.transfers == get_transfers(classified_traces)
+
+    for trace in classified_traces:
+        assert transfer_index.get_transfer(trace) == get_transfer(trace)
+
+
 def _equal_ignoring_order(first_list, second_list) -> bool:
     return all(first in second_list for first in first_list) and all(
         second in first_list for second in second_list
     )
+
+
+def test_transfers_compare_by_fields(get_transaction_hashes, get_addresses):
+    [transaction_hash] = get_transaction_hashes(1)
+    [alice_address, bob_address, token_address] = get_addresses(3)
+
+    transfer = Transfer(
+        block_number=123,
+        transaction_hash=transaction_hash,
+        trace_address=[0],
+        from_address=alice_address,
+        to_address=bob_address,
+        amount=10,
+        token_address=token_address,
+    )
+
+    constructed_transfer = Transfer.construct(**transfer.dict())
+    other_amount_transfer = Transfer(**{**transfer.dict(), **dict(amount=11)})
+
+    assert transfer == constructed_transfer
+    assert transfer == transfer.dict()
+    assert transfer != other_amount_transfer
+    assert transfer in [other_amount_transfer, constructed_transfer]
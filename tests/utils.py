@@ -6,6 +6,7 @@ from pydantic import parse_file_as
 
 from mev_inspect.schemas.blocks import Block
 from mev_inspect.schemas.sandwiches import Sandwich
+from mev_inspect.schemas.utils import to_original_json_dict
 
 THIS_FILE_DIRECTORY = os.path.dirname(__file__)
 TEST_BLOCKS_DIRECTORY = os.path.join(THIS_FILE_DIRECTORY, "blocks")
@@ -31,6 +32,26 @@ def load_test_block(block_number: int) -> Block:
         )
 
 
+def to_raw_rpc_traces(block: Block) -> bytes:
+    """Serializes traces the way trace_block returns them"""
+    return json.dumps([to_original_json_dict(trace) for trace in block.traces]).encode(
+        "utf-8"
+    )
+
+
+def to_raw_rpc_receipts(block: Block) -> bytes:
+    """Serializes receipts the way eth_getBlockReceipts returns them"""
+    return json.dumps(
+        [
+            {
+                key: hex(value) if isinstance(value, int) else value
+                for key, value in to_original_json_dict(receipt).items()
+            }
+            for receipt in block.receipts
+        ]
+    ).encode("utf-8")
+
+
 def load_comp_markets() -> Dict[str, str]:
     comp_markets_path = f"{THIS_FILE_DIRECTORY}/comp_markets.json"
     with open(comp_markets_path, "r") as markets_file: